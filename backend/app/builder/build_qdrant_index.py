@@ -0,0 +1,54 @@
+import sys
+import argparse
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from app.config import Settings
+from app.builder.data_loader import DataLoader
+from app.builder.database_manager import load_client
+from app.builder.qdrant_ingest import IngestStats, QdrantIngestor
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def build_qdrant_index(settings: Settings, dataloader: DataLoader, recreate: bool = False, batch_size: int = None, parallel: int = None) -> IngestStats:
+    """
+    Upserts the CLIP_FEATURES_PATH vectors into QDRANT_KEYFRAME_COLLECTION,
+    resuming from the checkpoint under CACHE_PATH/qdrant_ingest.
+    """
+    if not dataloader.keyframe_mappings:
+        dataloader.load_all()
+
+    feature_sources = {path.stem: path for path in sorted(Path(settings.CLIP_FEATURES_PATH).rglob('*.npy'))}
+    if not feature_sources:
+        raise FileNotFoundError(f'No .npy feature files found under {settings.CLIP_FEATURES_PATH}')
+
+    client = load_client(api_key_env="QDRANT_TOKEN_WRITE")
+    try:
+        ingestor = QdrantIngestor(
+            client,
+            collection_name=settings.QDRANT_KEYFRAME_COLLECTION,
+            checkpoint_path=settings.CACHE_PATH / 'qdrant_ingest' / f'{settings.QDRANT_KEYFRAME_COLLECTION}.json',
+            batch_size=batch_size or settings.QDRANT_INGEST_BATCH_SIZE,
+            parallel=parallel or settings.QDRANT_INGEST_PARALLEL
+        )
+        return ingestor.ingest(feature_sources, dataloader.keyframe_mappings, recreate=recreate)
+    finally:
+        client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Load the CLIP keyframe features into the Qdrant collection.")
+    parser.add_argument('--recreate', action='store_true', help="Drop the collection and its checkpoint first.")
+    parser.add_argument('--batch-size', type=int, default=None, help="Points per upsert. Defaults to QDRANT_INGEST_BATCH_SIZE.")
+    parser.add_argument('--parallel', type=int, default=None, help="Concurrent upserts. Defaults to QDRANT_INGEST_PARALLEL.")
+    args = parser.parse_args()
+
+    settings = Settings()
+    logger.info("Loading CLIP features into Qdrant...")
+    stats = build_qdrant_index(settings, DataLoader(settings), recreate=args.recreate, batch_size=args.batch_size, parallel=args.parallel)
+    logger.info(f"Qdrant ingestion complete: {stats.describe()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from app.config import Settings
+from app.builder.data_loader import DataLoader
+from app.builder.sprite_sheets import build_video_sprites, is_current
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def build_sprite_sheets(settings: Settings, dataloader: DataLoader, packs: Optional[List[str]] = None, force: bool = False, num_workers: int = 8) -> int:
+    """
+    Packs the keyframes of each video into sprite sheets under
+    SPRITE_SHEETS_PATH. Videos whose sheets already match their keyframe
+    mapping are skipped unless `force` is set. Returns the number built.
+    """
+    if not dataloader.keyframe_mappings:
+        dataloader.load_all()
+
+    video_ids = dataloader.get_videos_for_packs(packs) if packs else sorted(dataloader.keyframe_mappings.keys())
+
+    def build_one(video_id: str) -> bool:
+        keyframes = dataloader.get_keyframes_for_video(video_id)
+        keyframe_ids = [keyframe['keyframe_id'] for keyframe in keyframes]
+        frame_indices = [keyframe['frame_index'] for keyframe in keyframes]
+        if not keyframes or (not force and is_current(settings.SPRITE_SHEETS_PATH, video_id, keyframe_ids, frame_indices)):
+            return False
+        try:
+            index = build_video_sprites(
+                video_id, keyframe_ids, frame_indices,
+                keyframes_dir=settings.KEYFRAMES_PATH,
+                sprites_path=settings.SPRITE_SHEETS_PATH,
+                tile_width=settings.SPRITE_TILE_WIDTH,
+                columns=settings.SPRITE_COLUMNS,
+                rows=settings.SPRITE_ROWS,
+                quality=settings.SPRITE_QUALITY
+            )
+        except Exception as e:
+            logger.error(f"Failed to build sprite sheets for {video_id}: {e}", exc_info=True)
+            return False
+        if index is None:
+            logger.warning(f"No keyframe images for {video_id} in {settings.KEYFRAMES_PATH}; skipped.")
+        return index is not None
+
+    # Pillow releases the GIL while decoding and encoding, so threads scale here.
+    with ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="sprites") as executor:
+        built = sum(executor.map(build_one, video_ids))
+    logger.info(f"Sprite sheets: built {built} of {len(video_ids)} videos ({len(video_ids) - built} up to date or skipped).")
+    return built
+
+def main():
+    parser = argparse.ArgumentParser(description="Build per-video keyframe sprite sheets for the keyframe navigator.")
+    parser.add_argument('packs', nargs='*', help="Packs to build, e.g. L21 L22. Defaults to every video.")
+    parser.add_argument('--force', action='store_true', help="Rebuild sheets that are already up to date.")
+    parser.add_argument('--workers', type=int, default=8, help="Videos built concurrently.")
+    args = parser.parse_args()
+
+    settings = Settings()
+    build_sprite_sheets(settings, DataLoader(settings), packs=args.packs or None, force=args.force, num_workers=args.workers)
+
+if __name__ == "__main__":
+    main()
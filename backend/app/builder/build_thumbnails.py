@@ -0,0 +1,50 @@
+import sys
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from app.config import Settings
+from app.builder.data_loader import DataLoader
+from app.utils.thumbnails import ThumbnailCache, PregenerateReport
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def build_thumbnails(settings: Settings, dataloader: DataLoader, packs: List[str], widths: Optional[List[int]] = None, num_workers: int = 8) -> PregenerateReport:
+    """
+    Encodes the thumbnails of every keyframe in the given packs into
+    THUMBNAIL_CACHE_PATH, so result grids never wait on a first-time resize.
+    """
+    if not dataloader.video_metadata:
+        dataloader.load_all()
+
+    video_ids = dataloader.get_videos_for_packs(packs)
+    if not video_ids:
+        logger.warning(f"No videos found for packs: {packs}")
+    thumbnails = ThumbnailCache(
+        source_dir=settings.KEYFRAMES_PATH,
+        cache_dir=settings.THUMBNAIL_CACHE_PATH,
+        widths=settings.THUMBNAIL_WIDTHS,
+        max_bytes=settings.THUMBNAIL_CACHE_MAX_BYTES,
+        quality=settings.THUMBNAIL_QUALITY
+    )
+    report = thumbnails.pregenerate(video_ids, widths=widths, num_workers=num_workers)
+    logger.info(f"Thumbnails for {len(video_ids)} videos: {report.generated} encoded ({report.bytes / 1e6:.1f} MB), "
+                f"{report.cached} already cached, {report.failed} missing or failed.")
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate keyframe thumbnails for whole packs.")
+    parser.add_argument('packs', nargs='+', help="Packs to pre-generate, e.g. L21 L22.")
+    parser.add_argument('--widths', type=int, nargs='+', default=None, help="Defaults to THUMBNAIL_WIDTHS.")
+    parser.add_argument('--workers', type=int, default=8, help="Concurrent encodes.")
+    args = parser.parse_args()
+
+    settings = Settings()
+    build_thumbnails(settings, DataLoader(settings), args.packs, widths=args.widths, num_workers=args.workers)
+
+if __name__ == "__main__":
+    main()
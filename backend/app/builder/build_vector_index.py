@@ -0,0 +1,48 @@
+import sys
+import argparse
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from app.config import Settings
+from app.builder.data_loader import DataLoader
+from app.builder.local_index import LocalVectorIndex
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def build_vector_index(settings: Settings, dataloader: DataLoader, index_type: str = None, nlist: int = None) -> LocalVectorIndex:
+    """
+    Builds the local CLIP vector matrix from CLIP_FEATURES_PATH and, for
+    index_type='ivf', trains and persists the IVF lists on top of it.
+    """
+    index_type = index_type or settings.LOCAL_INDEX_TYPE
+    nlist = settings.IVF_NLIST if nlist is None else nlist
+
+    if not dataloader.keyframe_mappings:
+        dataloader.load_all()
+
+    index = LocalVectorIndex.build_from_directory(
+        index_dir=settings.LOCAL_INDEX_PATH,
+        features_dir=settings.CLIP_FEATURES_PATH,
+        keyframe_mappings=dataloader.keyframe_mappings,
+        dtype=settings.LOCAL_INDEX_DTYPE
+    )
+    if index_type == 'ivf':
+        index.build_ivf(nlist=nlist)
+    return index
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the local CLIP vector index offline.")
+    parser.add_argument('--index-type', choices=['flat', 'ivf'], default=None, help="Defaults to LOCAL_INDEX_TYPE.")
+    parser.add_argument('--nlist', type=int, default=None, help="Number of IVF lists (0 = ~4*sqrt(N)). Defaults to IVF_NLIST.")
+    args = parser.parse_args()
+
+    settings = Settings()
+    logger.info("Building local CLIP vector index...")
+    build_vector_index(settings, DataLoader(settings), index_type=args.index_type, nlist=args.nlist)
+    logger.info("Local CLIP vector index complete.")
+
+if __name__ == "__main__":
+    main()
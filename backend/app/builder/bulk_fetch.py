@@ -0,0 +1,121 @@
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+@dataclass
+class FetchStats:
+    files: int = 0
+    bytes: int = 0
+    failed: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.seconds if self.seconds else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes / 1e6 / self.seconds if self.seconds else 0.0
+
+    def describe(self) -> str:
+        return (f'{self.files} files, {self.bytes / 1e6:.1f} MB in {self.seconds:.1f}s '
+                f'({self.files_per_second:.1f} files/s, {self.mb_per_second:.2f} MB/s), '
+                f'{self.retries} retries, {self.failed} failed')
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, FileNotFoundError):
+        return False
+    # Client errors won't succeed on retry, except timeouts and rate limiting.
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status is not None and 400 <= status < 500 and status not in (408, 429):
+        return False
+    return True
+
+
+class BulkFetcher:
+    """
+    Downloads many small files on a bounded thread pool.
+
+    The work is I/O-bound, so threads (sharing keep-alive connections through
+    `fetch_fn`) replace worker processes and their pickling round-trips. At
+    most `max_workers * 4` fetches are in flight, and results are yielded to
+    the caller as they complete so it can parse them straight into its own
+    data structures. Failed fetches are retried with exponential backoff and
+    jitter; throughput is logged every `report_every_seconds`.
+    """
+
+    def __init__(self, fetch_fn: Callable[[str], bytes], max_workers: int = 32, retries: int = 4, backoff_seconds: float = 0.5, max_backoff_seconds: float = 30.0, report_every_seconds: float = 10.0, name: str = 'fetch'):
+        self.fetch_fn = fetch_fn
+        self.max_workers = max(1, max_workers)
+        self.retries = max(0, retries)
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.report_every_seconds = report_every_seconds
+        self.name = name
+        self.stats = FetchStats()
+        self._retry_lock = threading.Lock()
+
+    def _fetch_with_retry(self, key: str) -> bytes:
+        for attempt in range(self.retries + 1):
+            try:
+                return self.fetch_fn(key)
+            except Exception as e:
+                if attempt == self.retries or not _is_retryable(e):
+                    raise
+                delay = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** attempt)
+                with self._retry_lock:
+                    self.stats.retries += 1
+                logger.warning(f'{self.name}: {key} failed ({e}), retrying in {delay:.1f}s')
+                time.sleep(delay * random.uniform(0.5, 1.0))
+
+    def run(self, keys: Iterable[str]) -> Iterator[Tuple[str, Optional[bytes], Optional[Exception]]]:
+        """Yield (key, content, None) or (key, None, error) for every key, in completion order."""
+        self.stats = FetchStats()
+        start = last_report = time.perf_counter()
+        keys = iter(keys)
+        max_in_flight = self.max_workers * 4
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name) as executor:
+            in_flight = {}
+            exhausted = False
+            while in_flight or not exhausted:
+                while not exhausted and len(in_flight) < max_in_flight:
+                    key = next(keys, None)
+                    if key is None:
+                        exhausted = True
+                        break
+                    in_flight[executor.submit(self._fetch_with_retry, key)] = key
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = in_flight.pop(future)
+                    try:
+                        content = future.result()
+                    except Exception as e:
+                        self.stats.failed += 1
+                        yield key, None, e
+                        continue
+                    self.stats.files += 1
+                    self.stats.bytes += len(content)
+                    yield key, content, None
+
+                now = time.perf_counter()
+                self.stats.seconds = now - start
+                if now - last_report >= self.report_every_seconds:
+                    last_report = now
+                    logger.info(f'{self.name}: {self.stats.describe()}')
+
+        self.stats.seconds = time.perf_counter() - start
+        logger.info(f'{self.name} finished: {self.stats.describe()}')
@@ -6,50 +6,26 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parents[2]))
 import pickle
 from pathlib import Path
-from typing import Dict, List, Set, Tuple, Optional
-import pandas as pd
+from typing import TYPE_CHECKING, Dict, List, Mapping, Set, Tuple, Optional
+import numpy as np
 import os
 import json
+import hashlib
 from tqdm import tqdm
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import io
 import multiprocessing
 from app.config import Settings
-from app.utils.file_utils import load_csv, load_json
 from app.utils.logger import setup_logger
-from huggingface_hub import list_repo_files, hf_hub_download
-
-logger = setup_logger(__name__)
-
-def _download_and_load_json(repo_id: str, json_file: str) -> Optional[Tuple[str, dict]]:
-    """Worker function to download and load JSON metadata."""
-    try:
-        local_path = hf_hub_download(repo_id=repo_id, filename=json_file, repo_type="dataset")
-        with open(local_path, "r", encoding="utf-8") as f:
-            metadata = json.load(f)
-        os.remove(local_path)
-        if metadata is None:
-            return None
-        video_id = os.path.splitext(os.path.basename(json_file))[0]
-        return video_id, metadata
-    except Exception as e:
-        logger.error(f"Failed to load {json_file}: {e}")
-        return None
+from app.utils.lru_cache import LRUCache
+from app.builder.metadata_store import MetadataStore, KeyframeMappingView, VideoMetadataView, keyframes_to_array
+from app.builder.bulk_fetch import BulkFetcher
+from app.builder.dataset_sync import DatasetSync, HubSource, LocalDirectorySource, SyncReport
 
+if TYPE_CHECKING:
+    import pandas as pd
 
-def _download_and_load_csv(repo_id: str, csv_file: str) -> Optional[Tuple[str, pd.DataFrame]]:
-    """Worker function to download and load CSV keyframe mappings."""
-    try:
-        local_path = hf_hub_download(repo_id=repo_id, filename=csv_file, repo_type="dataset")
-        df = pd.read_csv(local_path, encoding="utf-8")
-        os.remove(local_path)
-        if df is None or df.empty:
-            return None
-        video_id = os.path.splitext(os.path.basename(csv_file))[0]
-        return video_id, df
-    except Exception as e:
-        logger.error(f"Failed to load {csv_file}: {e}")
-        return None
-
+logger = setup_logger(__name__)
 
 def _load_local_detection(json_file: Path) -> Optional[Tuple[str, str, dict]]:
     """Worker function to load object detections from local folder."""
@@ -68,16 +44,28 @@ def _load_local_detection(json_file: Path) -> Optional[Tuple[str, str, dict]]:
         return None
 
 
+def _format_keyframe_ids(rows: np.ndarray) -> List[str]:
+    """Zero-padded keyframe ids ('001', '002', ...) for a block of keyframe rows."""
+    return np.char.zfill(rows['n'].astype(str), 3).tolist()
+
+
+def _json_with_etag(payload) -> Tuple[bytes, str]:
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return body, f'"{hashlib.sha1(body).hexdigest()}"'
+
+
 class DataLoader:
     """Loads and caches all necessary data from the data/ directory."""
 
     def __init__(self, settings: Settings):
         self.settings = settings
         self.cache_dir = Path(settings.CACHE_PATH)
+        # Legacy pickle cache, only read once to migrate into the metadata store.
         self.cache_file = self.cache_dir / 'data_cache.pkl'
+        self.store_dir = self.cache_dir / 'metadata_store'
         self.cache_dir.mkdir(exist_ok=True)
         self.repo_id = self.settings.HF_ADDTIONAL_REPO_ID
-        # self.files = list_repo_files(self.repo_id, repo_type="dataset")
+        self._files: Optional[List[str]] = None
 
         # Configurable workers (default = 4 if not defined in settings)
         self.num_workers: int = getattr(settings, "NUM_WORKERS", 8)
@@ -85,74 +73,166 @@ class DataLoader:
             self.num_workers = multiprocessing.cpu_count()
 
 
-        self.video_metadata: Dict[str, dict] = {}
-        self.keyframe_mappings: Dict[str, pd.DataFrame] = {}
+        # After load_all these are read-only views over the memory-mapped store.
+        self.video_metadata: Mapping[str, dict] = {}
+        self.keyframe_mappings: Mapping[str, 'pd.DataFrame'] = {}
+        self.metadata_store: Optional[MetadataStore] = None
+        # Pre-serialized /api/video_keyframes bodies, filled on first request per video.
+        self._keyframes_json: Dict[str, bytes] = {}
+        # Pack index, rebuilt whenever video_metadata changes.
+        self.packs: List[str] = []
+        self.pack_videos: Dict[str, Tuple[str, ...]] = {}
+        self.video_pack: Dict[str, str] = {}
+        self._packs_json: Tuple[bytes, str] = _json_with_etag([])
+        self._videos_in_packs_json = LRUCache(max_items=256)
         # self.object_detections: Dict[str, dict] = {}
         # self.all_unique_objects: Set[str] = set()
 
+    @property
+    def files(self) -> List[str]:
+        """Files of the dataset repo, listed on first use only."""
+        if self._files is None:
+            from huggingface_hub import list_repo_files
+            self._files = list_repo_files(self.repo_id, repo_type="dataset")
+        return self._files
+
     def load_all(self, force_reload: bool = False) -> bool:
-        """Load all data, using cache if available."""
+        """Load all data, using the metadata store if available."""
+        if MetadataStore.exists(self.store_dir) and not force_reload:
+            logger.info(f'Opening metadata store: {self.store_dir}')
+            try:
+                self._open_store(MetadataStore(self.store_dir))
+                logger.info('Metadata store opened successfully.')
+                return True
+            except (OSError, ValueError) as e:
+                logger.warning(f'Could not open metadata store: {e}. Rebuilding it.')
+
         if self.cache_file.exists() and not force_reload:
-            logger.info(f'Loading data from cache: {self.cache_file}')
+            logger.info(f'Migrating legacy data cache: {self.cache_file}')
             try:
                 with open(self.cache_file, 'rb') as f:
                     cache_data = pickle.load(f)
-                    self.video_metadata = cache_data.get('video_metadata', {})
-                    self.keyframe_mappings = cache_data.get('keyframe_mappings', {})
-                    # self.object_detections = cache_data.get('object_detections', {})
-                    # self.all_unique_objects = cache_data.get('all_unique_objects', set())
-                logger.info('Data loaded from cache successfully.')
+                self.video_metadata = cache_data.get('video_metadata', {})
+                self.keyframe_mappings = cache_data.get('keyframe_mappings', {})
+                self._save_cache()
+                logger.info('Legacy data cache migrated successfully.')
                 return True
             except (OSError, pickle.UnpicklingError) as e:
                 logger.warning(f'Could not load cache file: {e}. Reloading from source.')
 
+        if self.settings.DATASET_SYNC:
+            try:
+                self.sync_dataset()
+                logger.info(f'Loaded metadata for {len(self.video_metadata)} videos.')
+                return True
+            except Exception as e:
+                logger.error(f'An unexpected error occurred during dataset sync: {e}', exc_info=True)
+                return False
+
         try:
             logger.info('Loading data from source files...')
+            self.video_metadata, self.keyframe_mappings = {}, {}
             self.load_video_metadata()
             self.load_keyframe_mappings()
             # self.load_object_detections(self.settings.OBJECTS_PATH)
+            self._save_cache()
             logger.info(f'Loaded metadata for {len(self.video_metadata)} videos.')
-            logger.info(f'Found {len(self.all_unique_objects)} unique objects.')
             return True
         except Exception as e:
             logger.error(f'An unexpected error occurred during data loading: {e}', exc_info=True)
             return False
 
+    def _source(self):
+        if self.settings.DATASET_SOURCE_DIR:
+            return LocalDirectorySource(self.settings.DATASET_SOURCE_DIR)
+        return HubSource(self.repo_id)
+
+    def _fetcher(self, source, name: str) -> BulkFetcher:
+        return BulkFetcher(
+            source.fetch,
+            max_workers=self.settings.FETCH_WORKERS,
+            retries=self.settings.FETCH_RETRIES,
+            backoff_seconds=self.settings.FETCH_BACKOFF_SECONDS,
+            name=name
+        )
+
+    def sync_dataset(self, source=None) -> SyncReport:
+        """Fetch only new or changed source files and merge them into the metadata store."""
+        sync = DatasetSync(
+            self.cache_dir / 'dataset_sync',
+            source or self._source(),
+            num_workers=self.settings.FETCH_WORKERS,
+            retries=self.settings.FETCH_RETRIES,
+            backoff_seconds=self.settings.FETCH_BACKOFF_SECONDS
+        )
+        report = sync.run(self.store_dir)
+        self._open_store(MetadataStore(self.store_dir))
+        return report
+
+    def prefetch(self) -> None:
+        """Warm the page cache for the metadata store; lookups already work lazily without it."""
+        if self.metadata_store is not None:
+            touched = self.metadata_store.prefetch()
+            logger.info(f'Prefetched {touched / 1e6:.1f} MB of keyframe mappings and video metadata.')
+
+    def _open_store(self, store: MetadataStore) -> None:
+        self.metadata_store = store
+        self._keyframes_json = {}
+        self.video_metadata = VideoMetadataView(store)
+        self.keyframe_mappings = KeyframeMappingView(store)
+        self._build_pack_index()
+
+    def _build_pack_index(self) -> None:
+        """Group video ids by pack once so the pack endpoints are dictionary lookups."""
+        grouped: Dict[str, List[str]] = {}
+        for video_id in self.video_metadata.keys():
+            if '_' in video_id:
+                grouped.setdefault(video_id.split('_')[0], []).append(video_id)
+
+        self.pack_videos = {pack: tuple(sorted(video_ids)) for pack, video_ids in grouped.items()}
+        self.video_pack = {video_id: pack for pack, video_ids in self.pack_videos.items() for video_id in video_ids}
+        self.packs = sorted(pack for pack in self.pack_videos if len(pack) > 1 and pack[1:].isdigit())
+        self._packs_json = _json_with_etag(self.get_available_packs())
+        self._videos_in_packs_json.clear()
+
     def _save_cache(self):
-        """Save all cached data atomically."""
-        cache_data = {
-            "video_metadata": self.video_metadata,
-            "keyframe_mappings": self.keyframe_mappings,
-            "all_unique_objects": self.all_unique_objects,
-        }
-        tmp_file = f"{self.cache_file}.tmp"
-        with open(tmp_file, "wb") as f:
-            pickle.dump(cache_data, f)
-        os.replace(tmp_file, self.cache_file)
+        """Write the loaded data to the metadata store and switch to reading from it."""
+        self._open_store(MetadataStore.write(self.store_dir, self.video_metadata, self.keyframe_mappings))
+
+    def _fetch_files(self, prefix: str, desc: str):
+        """Download every file under prefix, yielding (video_id, content) as each one arrives."""
+        source = self._source()
+        files = [f for f in self.files if f.startswith(prefix)] if isinstance(source, HubSource) else [f.path for f in source.list_files((prefix,))]
+        fetcher = self._fetcher(source, desc)
+        for path, content, error in tqdm(fetcher.run(files), total=len(files), desc=desc):
+            if error is not None:
+                logger.error(f"Failed to load {path}: {error}")
+                continue
+            yield os.path.splitext(os.path.basename(path))[0], content
 
     def load_video_metadata(self) -> None:
         logger.info("Loading video metadata...")
-        files = [f for f in self.files if f.startswith("media-info/")]
-        with ProcessPoolExecutor(max_workers=self.num_workers) as executor:
-            futures = [executor.submit(_download_and_load_json, self.repo_id, f) for f in files]
-            for future in tqdm(as_completed(futures), total=len(futures), desc="Video Metadata"):
-                result = future.result()
-                if result:
-                    video_id, metadata = result
-                    self.video_metadata[video_id] = metadata
-        self._save_cache()
+        for video_id, content in self._fetch_files("media-info/", "Video Metadata"):
+            try:
+                metadata = json.loads(content)
+            except ValueError as e:
+                logger.error(f"Failed to parse metadata for {video_id}: {e}")
+                continue
+            if metadata is not None:
+                self.video_metadata[video_id] = metadata
 
     def load_keyframe_mappings(self) -> None:
+        import pandas as pd
+
         logger.info("Loading keyframe mappings...")
-        files = [f for f in self.files if f.startswith("map-keyframes/")]
-        with ProcessPoolExecutor(max_workers=self.num_workers) as executor:
-            futures = [executor.submit(_download_and_load_csv, self.repo_id, f) for f in files]
-            for future in tqdm(as_completed(futures), total=len(futures), desc="Keyframe Mappings"):
-                result = future.result()
-                if result:
-                    video_id, df = result
-                    self.keyframe_mappings[video_id] = df
-        self._save_cache()
+        for video_id, content in self._fetch_files("map-keyframes/", "Keyframe Mappings"):
+            try:
+                df = pd.read_csv(io.BytesIO(content), encoding="utf-8")
+            except (ValueError, pd.errors.ParserError) as e:
+                logger.error(f"Failed to parse keyframe mapping for {video_id}: {e}")
+                continue
+            if not df.empty:
+                self.keyframe_mappings[video_id] = df
 
     def load_object_detections(self, local_objects_dir: str) -> None:
         """
@@ -161,7 +241,7 @@ class DataLoader:
         logger.info(f'Loading object detections from local: {local_objects_dir}')
         files = [f for f in self.files if f.startswith("objects/")]
 
-        with ProcessPoolExecutor(max_workers=self.num_workers) as executor:
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
             futures = [executor.submit(_load_local_detection, f) for f in files]
             for future in tqdm(as_completed(futures), total=len(futures), desc="Object Detections"):
                 result = future.result()
@@ -172,44 +252,60 @@ class DataLoader:
 
         self._save_cache()
 
+    def get_keyframe_rows(self, video_id: str) -> Optional[np.ndarray]:
+        """Structured keyframe rows (n, pts_time, fps, frame_idx) of one video, or None."""
+        if self.metadata_store is not None:
+            return self.metadata_store.keyframes_for(video_id)
+        mapping_df = self.keyframe_mappings.get(video_id)
+        return keyframes_to_array(mapping_df) if mapping_df is not None else None
+
     def get_all_keyframes(self) -> Set[Tuple[str, str]]:
         """Get all (video_id, keyframe_n) tuples in the dataset."""
-        keyframes = set()
-        for video_id, mappings in self.keyframe_mappings.items():
-            for _, row in mappings.iterrows():
-                try:
-                    keyframe_n = str(int(row['n'])).zfill(3)
-                    keyframes.add((video_id, keyframe_n))
-                except Exception as e:
-                    logger.warning(f"Invalid row in keyframe mapping for {video_id}: {e}")
-        return keyframes
+        if self.metadata_store is None:
+            return {
+                (video_id, keyframe_id)
+                for video_id in self.keyframe_mappings
+                for keyframe_id in _format_keyframe_ids(self.get_keyframe_rows(video_id))
+            }
+        # One pass over the whole keyframe column instead of a Python loop per row.
+        store = self.metadata_store
+        valid = store.keyframes['n'] >= 0
+        video_ids = np.repeat(np.asarray(store.keyframe_videos), np.diff(store.keyframe_offsets))[valid]
+        return set(zip(video_ids.tolist(), _format_keyframe_ids(store.keyframes[valid])))
 
     def get_keyframes_for_video(self, video_id: str) -> List[dict]:
         """Get all keyframes (id and index) for a specific video."""
-        mapping_df = self.keyframe_mappings.get(video_id)
-        if mapping_df is None or mapping_df.empty:
+        rows = self.get_keyframe_rows(video_id)
+        if rows is None or not len(rows):
             return []
+        rows = rows[rows['n'] >= 0]
         return [
-            {'keyframe_id': str(int(row['n'])).zfill(3), 'frame_index': int(row['frame_idx'])}
-            for _, row in mapping_df.iterrows()
+            {'keyframe_id': keyframe_id, 'frame_index': frame_index}
+            for keyframe_id, frame_index in zip(_format_keyframe_ids(rows), rows['frame_idx'].tolist())
         ]
 
+    def get_keyframes_json(self, video_id: str) -> Optional[bytes]:
+        """The /api/video_keyframes response body for a video, serialized once and cached."""
+        body = self._keyframes_json.get(video_id)
+        if body is None:
+            keyframes = self.get_keyframes_for_video(video_id)
+            if not keyframes:
+                return None
+            body = json.dumps({'keyframes': keyframes}, separators=(',', ':')).encode('utf-8')
+            self._keyframes_json[video_id] = body
+        return body
+
     def get_video_fps(self, video_id: str) -> Optional[float]:
         """Reads the FPS for a specific video from the cached keyframe mappings."""
-        mapping_df = self.keyframe_mappings.get(video_id)
-        if mapping_df is None or mapping_df.empty:
+        rows = self.get_keyframe_rows(video_id)
+        if rows is None or not len(rows):
             logger.warning(f'No keyframe mapping found for video_id: {video_id}')
             return None
-        try:
-            if 'fps' in mapping_df.columns:
-                fps_val = mapping_df['fps'].iloc[0]
-                if pd.notna(fps_val):
-                    return float(fps_val)
+        fps_val = float(rows['fps'][0])
+        if np.isnan(fps_val):
             logger.warning(f"'fps' column not found or invalid for {video_id}")
             return None
-        except (ValueError, IndexError) as e:
-            logger.error(f'Error extracting FPS for video {video_id}: {e}')
-            return None
+        return fps_val
 
     def get_available_packs(self) -> List[str]:
         """Returns a sorted list of unique pack identifiers from video metadata."""
@@ -217,18 +313,11 @@ class DataLoader:
             logger.warning("Video metadata is not loaded, cannot get packs.")
             return []
         
-        packs = set()
-        for video_id in self.video_metadata.keys():
-            if '_' in video_id:
-                pack_part = video_id.split('_')[0]
-                if len(pack_part) > 1 and pack_part[1:].isdigit():
-                    packs.add(pack_part)
-        
-        if not packs:
+        if not self.packs:
             logger.warning("No packs found in video metadata, returning hardcoded list.")
             return ["K01", "K02", "K03", "K04", "K05", "K06", "K07", "K08", "K09", "K10", "K11", "K12", "K13", "K14", "K15", "K16", "K17", "K18", "K19", "K20", "L21", "L22", "L23", "L24", "L25", "L26", "L27", "L28", "L29", "L30", "L31", "L32"]
             
-        return sorted(list(packs))
+        return list(self.packs)
 
     def get_videos_for_packs(self, packs: List[str]) -> List[str]:
         """Returns a sorted list of video IDs for the given packs."""
@@ -236,11 +325,18 @@ class DataLoader:
             logger.warning("Video metadata is not loaded, cannot get videos for packs.")
             return []
         
-        video_ids = set()
-        for video_id in self.video_metadata.keys():
-            if '_' in video_id:
-                pack_part = video_id.split('_')[0]
-                if pack_part in packs:
-                    video_ids.add(video_id)
-        
-        return sorted(list(video_ids))
\ No newline at end of file
+        video_ids = [video_id for pack in set(packs) for video_id in self.pack_videos.get(pack, ())]
+        return sorted(video_ids)
+
+    def get_packs_json(self) -> Tuple[bytes, str]:
+        """Pre-serialized /api/packs body and its ETag."""
+        return self._packs_json
+
+    def get_videos_for_packs_json(self, packs: List[str]) -> Tuple[bytes, str]:
+        """Serialized /api/videos_in_packs body and its ETag, cached per pack selection."""
+        key = frozenset(packs)
+        cached = self._videos_in_packs_json.get(key)
+        if cached is None:
+            cached = _json_with_etag(self.get_videos_for_packs(list(key)))
+            self._videos_in_packs_json.set(key, cached)
+        return cached
\ No newline at end of file
@@ -1,24 +1,20 @@
-from dataclasses import dataclass
 from typing import List, Set, Tuple, Optional
 import numpy as np
 from qdrant_client import QdrantClient, models
 from ..config import settings
+from .search_result import SearchResult
+from .video_ranges import group_videos_by_pack
 from ..utils.logger import setup_logger
 from dotenv import load_dotenv
 import os
 logger = setup_logger(__name__)
 
-@dataclass
-class SearchResult:
-    pack: str
-    video: str
-    frame: str
-    frame_index: int
-    similarity_score: float
-
-def load_client() -> QdrantClient:
+def load_client(api_key_env: str = "QDRANT_TOKEN_READ") -> QdrantClient:
     load_dotenv()
-    api_key = os.getenv("QDRANT_TOKEN_READ")
+    if settings.QDRANT_USE_LOCAL:
+        # Self-hosted instance, e.g. the `qdrant` service of docker-compose; no API key.
+        return QdrantClient(host=settings.QDRANT_HOST, port=settings.QDRANT_PORT, timeout=60)
+    api_key = os.getenv(api_key_env)
     client = QdrantClient(
         url=settings.QDRANT_CLOUD_URL,  # URL Qdrant Cloud
         api_key=api_key,
@@ -29,11 +25,15 @@ def load_client() -> QdrantClient:
 class QdrantManager:
     """Interface with the Qdrant vector database for searching."""
 
-    def __init__(self):
-        self.client = load_client()
-        self.keyframe_collection = settings.QDRANT_KEYFRAME_COLLECTION
+    def __init__(self, client: Optional[QdrantClient] = None, collection_name: Optional[str] = None):
+        self.client = client or load_client()
+        self.keyframe_collection = collection_name or settings.QDRANT_KEYFRAME_COLLECTION
 
     def _build_filter(self, packs: Optional[List[str]] = None, videos: Optional[List[str]] = None, excluded_videos: Optional[List[str]] = None) -> Optional[models.Filter]:
+        """
+        Build the payload filter. Videos are grouped by pack so the filter has one
+        (pack == p AND video IN [...]) clause per pack rather than one per video.
+        """
         must_conditions = []
         must_not_conditions = []
 
@@ -41,31 +41,31 @@ class QdrantManager:
             must_conditions.append(models.FieldCondition(key='pack', match=models.MatchAny(any=packs)))
         
         if videos:
-            video_conditions = []
-            for video_id in videos:
-                if '_' in video_id:
-                    pack, video = video_id.split('_', 1)
-                    video_conditions.append(models.Filter(must=[
-                        models.FieldCondition(key='pack', match=models.MatchValue(value=pack)),
-                        models.FieldCondition(key='video', match=models.MatchValue(value=video))
-                    ]))
+            video_conditions = [
+                self._pack_videos_condition(pack, pack_videos)
+                for pack, pack_videos in group_videos_by_pack(videos).items()
+            ]
             if video_conditions:
                 must_conditions.append(models.Filter(should=video_conditions))
 
         if excluded_videos:
-            for video_id in excluded_videos:
-                if '_' in video_id:
-                    pack, video = video_id.split('_', 1)
-                    must_not_conditions.append(models.Filter(must=[
-                        models.FieldCondition(key='pack', match=models.MatchValue(value=pack)),
-                        models.FieldCondition(key='video', match=models.MatchValue(value=video))
-                    ]))
+            must_not_conditions.extend(
+                self._pack_videos_condition(pack, pack_videos)
+                for pack, pack_videos in group_videos_by_pack(excluded_videos).items()
+            )
 
         if not must_conditions and not must_not_conditions:
             return None
         
         return models.Filter(must=must_conditions if must_conditions else None, must_not=must_not_conditions if must_not_conditions else None)
 
+    @staticmethod
+    def _pack_videos_condition(pack: str, videos: List[str]) -> models.Filter:
+        return models.Filter(must=[
+            models.FieldCondition(key='pack', match=models.MatchValue(value=pack)),
+            models.FieldCondition(key='video', match=models.MatchAny(any=videos))
+        ])
+
     def scroll_all(self, packs: Optional[List[str]] = None, videos: Optional[List[str]] = None, excluded_videos: Optional[List[str]] = None, limit: int = 100) -> List[SearchResult]:
         """Scroll through all vectors with an optional filter."""
         try:
@@ -92,8 +92,8 @@ class QdrantManager:
             logger.error(f'Error during Qdrant scroll: {e}', exc_info=True)
             return []
 
-    def search_similar(self, query_vector: np.ndarray, top_k: int=50, packs: Optional[List[str]] = None, videos: Optional[List[str]] = None, excluded_videos: Optional[List[str]] = None) -> List[SearchResult]:
-        """Search for similar vectors in the keyframe collection."""
+    def search_similar(self, query_vector: np.ndarray, top_k: int=50, packs: Optional[List[str]] = None, videos: Optional[List[str]] = None, excluded_videos: Optional[List[str]] = None, nprobe: Optional[int] = None) -> List[SearchResult]:
+        """Search for similar vectors in the keyframe collection. `nprobe` is forwarded as the HNSW `ef`."""
         try:
             query_filter = self._build_filter(packs, videos, excluded_videos)
 
@@ -101,6 +101,7 @@ class QdrantManager:
                 collection_name=self.keyframe_collection, 
                 query_vector=query_vector.tolist(), 
                 query_filter=query_filter, 
+                search_params=models.SearchParams(hnsw_ef=nprobe) if nprobe else None,
                 limit=top_k, 
                 with_payload=True
             )
@@ -108,4 +109,30 @@ class QdrantManager:
             return results
         except Exception as e:
             logger.error(f'Error during Qdrant search: {e}', exc_info=True)
-            return []
\ No newline at end of file
+            return []
+
+    def search_batch(self, query_vectors: np.ndarray, top_k: int=50, packs: Optional[List[str]] = None, videos: Optional[List[str]] = None, excluded_videos: Optional[List[str]] = None, nprobe: Optional[int] = None) -> List[List[SearchResult]]:
+        """Run several searches sharing the same filters in one Qdrant search_batch request."""
+        try:
+            query_filter = self._build_filter(packs, videos, excluded_videos)
+            search_params = models.SearchParams(hnsw_ef=nprobe) if nprobe else None
+
+            batch_hits = self.client.search_batch(
+                collection_name=self.keyframe_collection,
+                requests=[
+                    models.SearchRequest(
+                        vector=query_vector.tolist(),
+                        filter=query_filter,
+                        params=search_params,
+                        limit=top_k,
+                        with_payload=True
+                    ) for query_vector in query_vectors
+                ]
+            )
+            return [
+                [SearchResult(pack=hit.payload['pack'], video=hit.payload['video'], frame=hit.payload['frame'], frame_index=hit.payload['frame_index'], similarity_score=hit.score) for hit in search_hits]
+                for search_hits in batch_hits
+            ]
+        except Exception as e:
+            logger.error(f'Error during Qdrant batch search: {e}', exc_info=True)
+            return [[] for _ in query_vectors]
@@ -0,0 +1,267 @@
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .bulk_fetch import BulkFetcher, FetchStats
+from .metadata_store import MetadataStore, VideoMetadataView, keyframes_to_array
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+METADATA_PREFIX = 'media-info/'
+KEYFRAMES_PREFIX = 'map-keyframes/'
+SYNC_PREFIXES = (METADATA_PREFIX, KEYFRAMES_PREFIX)
+
+
+@dataclass
+class RemoteFile:
+    path: str
+    size: int
+    etag: str
+
+
+@dataclass
+class SyncReport:
+    listed: int = 0
+    fetched: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    failed: List[str] = field(default_factory=list)
+    applied_videos: int = 0
+    bytes_fetched: int = 0
+    seconds: float = 0.0
+    fetch_stats: Optional[FetchStats] = None
+
+
+class LocalDirectorySource:
+    """Serves a directory laid out like the dataset repo, standing in for the hub in tests and offline mirrors."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def list_files(self, prefixes: Tuple[str, ...] = SYNC_PREFIXES) -> List[RemoteFile]:
+        files = []
+        for prefix in prefixes:
+            base = self.root / prefix
+            if not base.is_dir():
+                continue
+            for path in sorted(base.rglob('*')):
+                if path.is_file():
+                    stat = path.stat()
+                    files.append(RemoteFile(path.relative_to(self.root).as_posix(), stat.st_size, f'{stat.st_mtime_ns:x}-{stat.st_size:x}'))
+        return files
+
+    def fetch(self, path: str) -> bytes:
+        return (self.root / path).read_bytes()
+
+
+class HubSource:
+    """A HuggingFace dataset repo, pinned to the commit it was listed at."""
+
+    def __init__(self, repo_id: str, revision: Optional[str] = None, token: Optional[str] = None):
+        self.repo_id = repo_id
+        self.revision = revision
+        self.token = token
+        self._local = threading.local()
+
+    def list_files(self, prefixes: Tuple[str, ...] = SYNC_PREFIXES) -> List[RemoteFile]:
+        from huggingface_hub import HfApi
+        from huggingface_hub.hf_api import RepoFile
+
+        api = HfApi(token=self.token)
+        # Pin every download to the listed commit so a push mid-sync can't mix revisions.
+        self.revision = api.dataset_info(self.repo_id, revision=self.revision).sha
+        files = []
+        for prefix in prefixes:
+            for entry in api.list_repo_tree(self.repo_id, path_in_repo=prefix.rstrip('/'), recursive=True, repo_type='dataset', revision=self.revision):
+                if isinstance(entry, RepoFile):
+                    etag = entry.lfs.sha256 if entry.lfs else entry.blob_id
+                    files.append(RemoteFile(entry.path, entry.size, etag))
+        return files
+
+    def _session(self):
+        # One keep-alive session per worker thread.
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            import requests
+            from huggingface_hub.utils import build_hf_headers
+
+            session = requests.Session()
+            session.headers.update(build_hf_headers(token=self.token))
+            self._local.session = session
+        return session
+
+    def fetch(self, path: str) -> bytes:
+        from huggingface_hub import hf_hub_url
+
+        url = hf_hub_url(self.repo_id, path, repo_type='dataset', revision=self.revision)
+        response = self._session().get(url, timeout=60)
+        response.raise_for_status()
+        return response.content
+
+
+def _video_id(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{path.name}.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+class DatasetSync:
+    """
+    Incremental, resumable sync of media-info/ and map-keyframes/ into the metadata store.
+
+    Fetched files are kept in a local mirror and recorded in a manifest with
+    their etag and size, so a rerun only transfers new or changed files. The
+    manifest is checkpointed while fetching and every entry stays pending until
+    its video has been merged into the MetadataStore, so an interrupted sync
+    resumes where it stopped.
+    """
+
+    def __init__(self, sync_dir: Path, source, num_workers: int = 32, retries: int = 4, backoff_seconds: float = 0.5, checkpoint_every: int = 200):
+        self.sync_dir = Path(sync_dir)
+        self.mirror_dir = self.sync_dir / 'files'
+        self.manifest_file = self.sync_dir / 'manifest.json'
+        self.source = source
+        self.fetcher = BulkFetcher(source.fetch, max_workers=num_workers, retries=retries, backoff_seconds=backoff_seconds, name='dataset-sync')
+        self.checkpoint_every = checkpoint_every
+        self.sync_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest: Dict[str, dict] = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, dict]:
+        if not self.manifest_file.exists():
+            return {}
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('files', {})
+        except (OSError, ValueError) as e:
+            logger.warning(f'Could not read sync manifest {self.manifest_file}: {e}. Starting a full sync.')
+            return {}
+
+    def _save_manifest(self) -> None:
+        content = json.dumps({'revision': getattr(self.source, 'revision', None), 'updated_at': time.time(), 'files': self.manifest})
+        _write_atomic(self.manifest_file, content.encode('utf-8'))
+
+    def plan(self, remote: List[RemoteFile]) -> Tuple[List[RemoteFile], List[str]]:
+        """Files to fetch (new, changed or missing from the mirror) and paths deleted upstream."""
+        remote_paths = {f.path for f in remote}
+        to_fetch = [
+            f for f in remote
+            if self.manifest.get(f.path, {}).get('etag') != f.etag or not (self.mirror_dir / f.path).exists()
+        ]
+        deleted = [path for path, entry in self.manifest.items() if path not in remote_paths and not entry.get('deleted')]
+        return to_fetch, deleted
+
+    def fetch(self, files: List[RemoteFile], report: SyncReport) -> None:
+        by_path = {f.path: f for f in files}
+        for done, (path, content, error) in enumerate(self.fetcher.run(by_path), start=1):
+            if error is not None:
+                logger.error(f'Failed to fetch {path}: {error}')
+                report.failed.append(path)
+                continue
+            remote_file = by_path[path]
+            _write_atomic(self.mirror_dir / path, content)
+            self.manifest[path] = {'etag': remote_file.etag, 'size': remote_file.size, 'applied': False}
+            report.fetched += 1
+            report.bytes_fetched += len(content)
+            if done % self.checkpoint_every == 0:
+                self._save_manifest()
+        report.fetch_stats = self.fetcher.stats
+        self._save_manifest()
+
+    def _parse(self, path: str):
+        local_path = self.mirror_dir / path
+        if path.startswith(METADATA_PREFIX):
+            with open(local_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        import pandas as pd
+
+        df = pd.read_csv(local_path, encoding='utf-8')
+        return keyframes_to_array(df) if not df.empty else None
+
+    def apply(self, store_dir: Path, report: SyncReport) -> None:
+        """
+        Merge pending manifest entries into the metadata store.
+
+        The store is columnar and sorted by video id, so this is a full
+        rewrite: the current store is read back, the pending videos are
+        replaced, and every file is written once. A file that fails to parse
+        keeps its video's previous entry and stays pending, so the next sync
+        retries it; its path is recorded in `report.failed`.
+        """
+        rebuild = not MetadataStore.exists(store_dir)
+        pending = [path for path, entry in self.manifest.items() if rebuild or not entry.get('applied')]
+        if not pending:
+            return
+
+        video_metadata: Dict[str, dict] = {}
+        keyframes: Dict[str, np.ndarray] = {}
+        if not rebuild:
+            store = MetadataStore(store_dir)
+            video_metadata = dict(VideoMetadataView(store))
+            keyframes = {str(video_id): np.array(store.keyframes_for(str(video_id))) for video_id in store.keyframe_videos}
+
+        applied = []
+        for path in pending:
+            entry = self.manifest[path]
+            target = video_metadata if path.startswith(METADATA_PREFIX) else keyframes
+            video_id = _video_id(path)
+            if entry.get('deleted'):
+                target.pop(video_id, None)
+                applied.append(path)
+                continue
+            try:
+                parsed = self._parse(path)
+            except (OSError, ValueError) as e:
+                logger.error(f'Failed to parse {path}: {e}')
+                report.failed.append(path)
+                continue
+            if parsed is None:
+                target.pop(video_id, None)
+            else:
+                target[video_id] = parsed
+            applied.append(path)
+
+        if not applied:
+            return
+        MetadataStore.write(store_dir, video_metadata, keyframes)
+        for path in applied:
+            if self.manifest[path].get('deleted'):
+                del self.manifest[path]
+            else:
+                self.manifest[path]['applied'] = True
+        self._save_manifest()
+        report.applied_videos = len({_video_id(path) for path in applied})
+
+    def run(self, store_dir: Path) -> SyncReport:
+        report = SyncReport()
+        start = time.perf_counter()
+        remote = self.source.list_files(SYNC_PREFIXES)
+        to_fetch, deleted = self.plan(remote)
+        report.listed = len(remote)
+        report.unchanged = len(remote) - len(to_fetch)
+        logger.info(f'Dataset sync: {len(remote)} files listed, {len(to_fetch)} to fetch, {len(deleted)} deleted upstream.')
+
+        if to_fetch:
+            self.fetch(to_fetch, report)
+        for path in deleted:
+            self.manifest[path] = {'deleted': True, 'applied': False}
+            (self.mirror_dir / path).unlink(missing_ok=True)
+        report.deleted = len(deleted)
+
+        self.apply(store_dir, report)
+        report.seconds = time.perf_counter() - start
+        logger.info(f'Dataset sync finished in {report.seconds:.1f}s: fetched {report.fetched} files ({report.bytes_fetched / 1e6:.1f} MB), '
+                    f'{report.deleted} deleted, {len(report.failed)} failed, {report.applied_videos} videos updated.')
+        return report
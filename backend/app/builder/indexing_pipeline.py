@@ -0,0 +1,166 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ..utils.logger import setup_logger
+from ..utils.text_processing import video_text_document
+
+logger = setup_logger(__name__)
+
+
+@dataclass
+class DocumentBatch:
+    video_ids: List[str]
+    documents: List[Dict[str, str]]  # video_text_document fields, in video_ids order
+    vectors: np.ndarray  # (len(video_ids), dim) embeddings of each document's `content`
+
+
+@dataclass
+class IndexingStats:
+    documents: int = 0
+    batches: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+    encode_seconds: float = 0.0
+    insert_seconds: float = 0.0
+    max_queue_depth: int = 0
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.documents / self.seconds if self.seconds else 0.0
+
+    def describe(self) -> str:
+        return (f'{self.documents} docs in {self.batches} batches, {self.seconds:.1f}s '
+                f'({self.docs_per_second:.1f} docs/s; encode {self.encode_seconds:.1f}s, insert {self.insert_seconds:.1f}s), '
+                f'{self.failed} failed')
+
+
+# A sink writes one batch and returns how many of its documents failed.
+Sink = Callable[[DocumentBatch], int]
+
+
+class CountingSink:
+    """Stand-in sink that only counts documents, optionally sleeping per batch to mimic a network insert."""
+
+    def __init__(self, delay_seconds: float = 0.0):
+        self.delay_seconds = delay_seconds
+        self.documents = 0
+        self.batches = 0
+
+    def __call__(self, batch: DocumentBatch) -> int:
+        if self.delay_seconds:
+            time.sleep(self.delay_seconds)
+        self.documents += len(batch.video_ids)
+        self.batches += 1
+        return 0
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _normalize_chunk(chunk: List[Tuple[str, dict]]) -> Tuple[List[str], List[Dict[str, str]]]:
+    return [video_id for video_id, _ in chunk], [video_text_document(metadata or {}) for _, metadata in chunk]
+
+
+class TextIndexingPipeline:
+    """
+    Streams video metadata into a text index in three overlapping stages:
+    a thread pool turns metadata into documents, the calling thread encodes
+    them `batch_size` at a time, and a writer thread hands encoded batches to
+    `sink` (e.g. a Weaviate insert).
+
+    Both hand-offs are bounded, at most `normalize_workers * 2` chunks being
+    normalised and `queue_batches` encoded batches waiting for the writer,
+    so memory stays flat however large the corpus is, and a slow sink
+    throttles encoding instead of piling up vectors. Throughput is logged
+    every `report_every_seconds`.
+    """
+
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], sink: Sink, batch_size: int = 256, normalize_workers: int = 4, queue_batches: int = 4, report_every_seconds: float = 10.0, name: str = 'text-index'):
+        self.encode = encode
+        self.sink = sink
+        self.batch_size = max(1, batch_size)
+        self.normalize_workers = max(1, normalize_workers)
+        self.queue_batches = max(1, queue_batches)
+        self.report_every_seconds = report_every_seconds
+        self.name = name
+        self.stats = IndexingStats()
+
+    def _write(self, batches: "queue.Queue[Optional[DocumentBatch]]", errors: List[Exception]) -> None:
+        while True:
+            batch = batches.get()
+            if batch is None:
+                return
+            if errors:
+                # Keep draining so the producer never blocks on a full queue after a failure.
+                continue
+            start = time.perf_counter()
+            try:
+                failed = self.sink(batch)
+            except Exception as e:
+                errors.append(e)
+                continue
+            self.stats.insert_seconds += time.perf_counter() - start
+            self.stats.failed += failed
+            self.stats.documents += len(batch.video_ids) - failed
+            self.stats.batches += 1
+
+    def run(self, items: Iterable[Tuple[str, dict]]) -> IndexingStats:
+        """Index (video_id, metadata) pairs; raises the first sink error after the pipeline drains."""
+        self.stats = IndexingStats()
+        start = last_report = time.perf_counter()
+        batches: "queue.Queue[Optional[DocumentBatch]]" = queue.Queue(maxsize=self.queue_batches)
+        errors: List[Exception] = []
+        writer = threading.Thread(target=self._write, args=(batches, errors), name=f'{self.name}-writer', daemon=True)
+        writer.start()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.normalize_workers, thread_name_prefix=f'{self.name}-normalize') as executor:
+                chunks = _chunks(items, self.batch_size)
+                pending = deque()
+                while True:
+                    while len(pending) < self.normalize_workers * 2:
+                        chunk = next(chunks, None)
+                        if chunk is None:
+                            break
+                        pending.append(executor.submit(_normalize_chunk, chunk))
+                    if not pending or errors:
+                        break
+
+                    video_ids, documents = pending.popleft().result()
+                    encode_start = time.perf_counter()
+                    vectors = np.asarray(self.encode([document['content'] for document in documents]), dtype=np.float32)
+                    self.stats.encode_seconds += time.perf_counter() - encode_start
+                    batches.put(DocumentBatch(video_ids, documents, vectors))
+                    self.stats.max_queue_depth = max(self.stats.max_queue_depth, batches.qsize())
+
+                    now = time.perf_counter()
+                    if now - last_report >= self.report_every_seconds:
+                        last_report = now
+                        self.stats.seconds = now - start
+                        logger.info(f'{self.name}: {self.stats.describe()}, {batches.qsize()} batches queued')
+                for future in pending:
+                    future.cancel()
+        finally:
+            batches.put(None)
+            writer.join()
+
+        self.stats.seconds = time.perf_counter() - start
+        if errors:
+            logger.error(f'{self.name} aborted: {self.stats.describe()}')
+            raise errors[0]
+        logger.info(f'{self.name} finished: {self.stats.describe()}')
+        return self.stats
@@ -0,0 +1,139 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from ..utils.logger import setup_logger
+from ..utils.vectors import l2_normalize
+
+logger = setup_logger(__name__)
+
+IVF_DIR = 'ivf'
+CENTROIDS_FILE = 'centroids.npy'
+LIST_OFFSETS_FILE = 'list_offsets.npy'
+LIST_ROWS_FILE = 'list_rows.npy'
+IVF_MANIFEST_FILE = 'manifest.json'
+
+# Rows assigned per matmul while training/assigning.
+ASSIGN_BLOCK_SIZE = 65536
+
+
+def default_nlist(count: int) -> int:
+    """Rule of thumb nlist ~ 4 * sqrt(N), clamped to something trainable."""
+    return int(max(1, min(count // 39 or 1, 4 * np.sqrt(max(count, 1)))))
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Nearest centroid (by inner product) for every row, computed in blocks."""
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_BLOCK_SIZE):
+        stop = min(start + ASSIGN_BLOCK_SIZE, len(vectors))
+        block = np.asarray(vectors[start:stop], dtype=np.float32)
+        assignments[start:stop] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+def train_centroids(vectors: np.ndarray, nlist: int, n_iter: int = 10, sample_size: int = 100_000, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on a random sample of the (normalised) vectors."""
+    rng = np.random.default_rng(seed)
+    sample_rows = np.sort(rng.choice(len(vectors), size=min(sample_size, len(vectors)), replace=False))
+    sample = np.asarray(vectors[sample_rows], dtype=np.float32)
+    nlist = min(nlist, len(sample))
+
+    centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+    for _ in range(n_iter):
+        assignments = _assign(sample, centroids)
+        order = np.argsort(assignments, kind='stable')
+        counts = np.bincount(assignments, minlength=nlist)
+        non_empty = np.flatnonzero(counts)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[non_empty]
+        centroids[non_empty] = np.add.reduceat(sample[order], starts, axis=0)
+
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            centroids[empty] = sample[rng.choice(len(sample), size=len(empty), replace=False)]
+        centroids = l2_normalize(centroids)
+    return centroids
+
+
+class IVFIndex:
+    """
+    Inverted-file (IVF-Flat) index over the rows of a LocalVectorIndex.
+
+    Rows are bucketed by their nearest k-means centroid; a search scores the
+    query against the centroids, then only scores rows of the `nprobe` closest
+    lists. Each list is stored as a sorted run of row ids so the vectors stay
+    in their original (video-contiguous) order on disk.
+    """
+
+    def __init__(self, ivf_dir: Path):
+        self.ivf_dir = Path(ivf_dir)
+        with open(self.ivf_dir / IVF_MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.centroids = np.load(self.ivf_dir / CENTROIDS_FILE)
+        self.list_offsets = np.load(self.ivf_dir / LIST_OFFSETS_FILE)
+        self.list_rows = np.load(self.ivf_dir / LIST_ROWS_FILE, mmap_mode='r')
+        logger.info(f'Loaded IVF index with {self.nlist} lists over {len(self.list_rows)} rows from {self.ivf_dir}')
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def exists(cls, index_dir: Path) -> bool:
+        return (Path(index_dir) / IVF_DIR / IVF_MANIFEST_FILE).exists()
+
+    @classmethod
+    def open(cls, index_dir: Path) -> 'IVFIndex':
+        return cls(Path(index_dir) / IVF_DIR)
+
+    @classmethod
+    def build(cls, index_dir: Path, vectors: np.ndarray, nlist: int = 0, n_iter: int = 10, built_for: Optional[str] = None) -> 'IVFIndex':
+        """
+        Train centroids and bucket every row of `vectors` (already normalised).
+
+        built_for records the version of the flat index the lists refer to, so a
+        stale IVF can be detected after the flat index is rebuilt.
+        """
+        ivf_dir = Path(index_dir) / IVF_DIR
+        ivf_dir.mkdir(parents=True, exist_ok=True)
+        nlist = nlist or default_nlist(len(vectors))
+
+        start_time = time.time()
+        centroids = train_centroids(vectors, nlist, n_iter=n_iter)
+        assignments = _assign(vectors, centroids)
+        list_rows = np.argsort(assignments, kind='stable').astype(np.int64)
+        counts = np.bincount(assignments, minlength=len(centroids))
+        list_offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+        for name, array in ((CENTROIDS_FILE, centroids), (LIST_OFFSETS_FILE, list_offsets), (LIST_ROWS_FILE, list_rows)):
+            tmp_path = ivf_dir / f'{name}.tmp.npy'
+            np.save(tmp_path, array)
+            os.replace(tmp_path, ivf_dir / name)
+
+        manifest = {
+            'nlist': len(centroids),
+            'count': len(vectors),
+            'built_for': built_for,
+            'built_at': time.time(),
+        }
+        manifest_tmp = ivf_dir / f'{IVF_MANIFEST_FILE}.tmp'
+        with open(manifest_tmp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(manifest_tmp, ivf_dir / IVF_MANIFEST_FILE)
+
+        logger.info(f'Built IVF index with {len(centroids)} lists over {len(vectors)} rows in {time.time() - start_time:.1f}s '
+                    f'(largest list: {counts.max() if len(counts) else 0} rows)')
+        return cls(ivf_dir)
+
+    def probe(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        """Sorted row ids belonging to the `nprobe` lists closest to `query`."""
+        nprobe = max(1, min(nprobe, self.nlist))
+        centroid_scores = self.centroids @ query
+        lists = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        rows = np.concatenate([self.list_rows[self.list_offsets[l]:self.list_offsets[l + 1]] for l in lists])
+        rows.sort()
+        return rows
@@ -0,0 +1,343 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .search_result import SearchResult
+from .ivf_index import IVFIndex
+from .video_ranges import VideoRangeIndex, VIDEO_TABLE_DTYPE
+from ..utils.logger import setup_logger
+from ..utils.vectors import l2_normalize
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = setup_logger(__name__)
+
+PAYLOAD_DTYPE = np.dtype([
+    ('pack', 'U8'),
+    ('video', 'U16'),
+    ('keyframe_n', '<i4'),
+    ('frame_index', '<i8'),
+])
+
+VECTORS_FILE = 'vectors.npy'
+PAYLOAD_FILE = 'payload.npy'
+VIDEO_TABLE_FILE = 'videos.npy'
+MANIFEST_FILE = 'manifest.json'
+
+# Rows scored per matmul; bounds the float32 copy made of a float16 matrix.
+SCORE_BLOCK_SIZE = 65536
+
+# Below this fraction of selected rows, a filtered exact search gathers and
+# scores only the selected ranges instead of masking a full scan.
+PREFILTER_MAX_FRACTION = 0.5
+
+
+def _split_video_id(video_id: str):
+    pack, _, video = video_id.partition('_')
+    return pack, video
+
+
+def _format_frame(keyframe_n: int) -> str:
+    return f"{int(keyframe_n):03d}.jpg"
+
+
+def keyframe_columns(mapping_df: Optional['pd.DataFrame'], count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (keyframe_n, frame_index) of the `count` feature rows of a video. Without a
+    mapping of matching length, row i is keyframe i+1 with frame_index -1.
+    """
+    if mapping_df is not None and len(mapping_df) == count:
+        return mapping_df['n'].to_numpy(dtype=np.int32), mapping_df['frame_idx'].to_numpy(dtype=np.int64)
+    return np.arange(1, count + 1, dtype=np.int32), np.full(count, -1, dtype=np.int64)
+
+
+def load_keyframe_mappings_from_dir(map_keyframes_dir: Path) -> Dict[str, 'pd.DataFrame']:
+    """Reads the local map-keyframes/*.csv files, keyed by video id."""
+    import pandas as pd
+
+    mappings = {}
+    map_keyframes_dir = Path(map_keyframes_dir)
+    if not map_keyframes_dir.is_dir():
+        return mappings
+    for csv_file in sorted(map_keyframes_dir.rglob('*.csv')):
+        try:
+            mappings[csv_file.stem] = pd.read_csv(csv_file, encoding='utf-8')
+        except Exception as e:
+            logger.warning(f'Could not read keyframe mapping {csv_file}: {e}')
+    return mappings
+
+
+class LocalVectorIndex:
+    """
+    In-process exact vector index over the CLIP keyframe features.
+
+    All feature vectors live in one contiguous, L2-normalised matrix that is
+    memory-mapped from disk, next to a structured payload array holding
+    (pack, video, keyframe_n, frame_index) for every row. Exposes the same
+    search_similar/scroll_all interface as QdrantManager.
+
+    With index_type='ivf' and a persisted IVF index next to the matrix,
+    searches only score the rows of the `nprobe` closest inverted lists;
+    nprobe=0 (or index_type='flat') forces exact search. Pack/video filters
+    are compiled to row ranges by VideoRangeIndex and applied while scoring.
+    """
+
+    def __init__(self, index_dir: Path, index_type: str = 'flat', default_nprobe: int = 16):
+        self.index_dir = Path(index_dir)
+        manifest_path = self.index_dir / MANIFEST_FILE
+        if not manifest_path.exists():
+            raise FileNotFoundError(f'No local vector index found at {self.index_dir}')
+
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+
+        self.vectors = np.load(self.index_dir / VECTORS_FILE, mmap_mode='r')
+        self.payload = np.load(self.index_dir / PAYLOAD_FILE, mmap_mode='r')
+        if len(self.vectors) != len(self.payload):
+            raise ValueError(f'Corrupt local vector index at {self.index_dir}: vectors and payload lengths differ.')
+
+        self.ranges = VideoRangeIndex(self._load_video_table(), total_rows=len(self.payload))
+        logger.info(f'Loaded local vector index with {len(self.vectors)} vectors ({self.vectors.dtype}) from {self.index_dir}')
+
+        self.default_nprobe = default_nprobe
+        self.ivf: Optional[IVFIndex] = None
+        if index_type == 'ivf':
+            self.ivf = self._open_ivf()
+        elif index_type != 'flat':
+            raise ValueError(f"Unknown local index type '{index_type}'. Expected 'flat' or 'ivf'.")
+
+    @property
+    def version(self) -> str:
+        return str(self.manifest.get('built_at', ''))
+
+    def _load_video_table(self) -> np.ndarray:
+        video_table_path = self.index_dir / VIDEO_TABLE_FILE
+        if video_table_path.exists():
+            return np.load(video_table_path)
+        logger.info('Video range table missing, deriving it from the payload.')
+        return VideoRangeIndex.table_from_payload(np.asarray(self.payload['pack']), np.asarray(self.payload['video']))
+
+    def _open_ivf(self) -> Optional[IVFIndex]:
+        if not IVFIndex.exists(self.index_dir):
+            logger.warning(f'No IVF index found at {self.index_dir}; falling back to exact search. Build it with app/builder/build_vector_index.py.')
+            return None
+        ivf = IVFIndex.open(self.index_dir)
+        if ivf.manifest.get('built_for') != self.version:
+            logger.warning('IVF index was built for a different version of the vector matrix; falling back to exact search.')
+            return None
+        return ivf
+
+    def build_ivf(self, nlist: int = 0, n_iter: int = 10) -> IVFIndex:
+        """Train and persist an IVF index for this matrix, then use it for searches."""
+        self.ivf = IVFIndex.build(self.index_dir, self.vectors, nlist=nlist, n_iter=n_iter, built_for=self.version)
+        return self.ivf
+
+    @classmethod
+    def build(cls, index_dir: Path, feature_sources: Dict[str, Union[Path, np.ndarray]], keyframe_mappings: Optional[Dict[str, 'pd.DataFrame']] = None, dtype: str = 'float32') -> 'LocalVectorIndex':
+        """
+        Build the index from per-video feature matrices.
+
+        feature_sources maps a video id (e.g. 'L21_V001') to either a .npy path
+        or an in-memory (n_keyframes, dim) array. Row i of a video's matrix is
+        keyframe n=i+1 unless its keyframe mapping says otherwise.
+        """
+        index_dir = Path(index_dir)
+        index_dir.mkdir(parents=True, exist_ok=True)
+        keyframe_mappings = keyframe_mappings or {}
+
+        def open_source(source):
+            if isinstance(source, (str, Path)):
+                return np.load(source, mmap_mode='r')
+            return source
+
+        video_ids = sorted(feature_sources)
+        shapes = {video_id: open_source(feature_sources[video_id]).shape for video_id in video_ids}
+        dims = {shape[1] for shape in shapes.values()}
+        if len(dims) > 1:
+            raise ValueError(f'Inconsistent feature dimensions across videos: {sorted(dims)}')
+        dim = dims.pop() if dims else 0
+        total = sum(shape[0] for shape in shapes.values())
+
+        vectors_tmp = index_dir / f'{VECTORS_FILE}.tmp'
+        payload_tmp = index_dir / f'{PAYLOAD_FILE}.tmp'
+        vectors = np.lib.format.open_memmap(vectors_tmp, mode='w+', dtype=np.dtype(dtype), shape=(total, dim))
+        payload = np.lib.format.open_memmap(payload_tmp, mode='w+', dtype=PAYLOAD_DTYPE, shape=(total,))
+
+        video_table = np.empty(len(video_ids), dtype=VIDEO_TABLE_DTYPE)
+        missing_mappings = 0
+        offset = 0
+        for position, video_id in enumerate(video_ids):
+            features = open_source(feature_sources[video_id])
+            count = len(features)
+            rows = slice(offset, offset + count)
+            video_table[position] = (video_id, offset, offset + count)
+            vectors[rows] = l2_normalize(features).astype(dtype, copy=False)
+
+            pack, video = _split_video_id(video_id)
+            payload['pack'][rows] = pack
+            payload['video'][rows] = video
+
+            mapping_df = keyframe_mappings.get(video_id)
+            if mapping_df is None or len(mapping_df) != count:
+                missing_mappings += 1
+            payload['keyframe_n'][rows], payload['frame_index'][rows] = keyframe_columns(mapping_df, count)
+            offset += count
+
+        vectors.flush()
+        payload.flush()
+        del vectors, payload
+        os.replace(vectors_tmp, index_dir / VECTORS_FILE)
+        os.replace(payload_tmp, index_dir / PAYLOAD_FILE)
+        video_table_tmp = index_dir / f'{VIDEO_TABLE_FILE}.tmp.npy'
+        np.save(video_table_tmp, video_table)
+        os.replace(video_table_tmp, index_dir / VIDEO_TABLE_FILE)
+
+        if missing_mappings:
+            logger.warning(f'{missing_mappings} videos had no matching keyframe mapping; their frame_index is set to -1.')
+
+        manifest = {
+            'count': total,
+            'dim': dim,
+            'dtype': str(np.dtype(dtype)),
+            'videos': len(video_ids),
+            'built_at': time.time(),
+        }
+        manifest_tmp = index_dir / f'{MANIFEST_FILE}.tmp'
+        with open(manifest_tmp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(manifest_tmp, index_dir / MANIFEST_FILE)
+
+        logger.info(f'Built local vector index with {total} vectors from {len(video_ids)} videos at {index_dir}')
+        return cls(index_dir)
+
+    @classmethod
+    def build_from_directory(cls, index_dir: Path, features_dir: Path, keyframe_mappings: Optional[Dict[str, 'pd.DataFrame']] = None, dtype: str = 'float32') -> 'LocalVectorIndex':
+        """Build the index from the clip-features-32 .npy files."""
+        feature_sources = {path.stem: path for path in sorted(Path(features_dir).rglob('*.npy'))}
+        if not feature_sources:
+            raise FileNotFoundError(f'No .npy feature files found under {features_dir}')
+        return cls.build(index_dir, feature_sources, keyframe_mappings, dtype)
+
+    @classmethod
+    def load_or_build(cls, index_dir: Path, features_dir: Path, keyframe_mappings: Optional[Dict[str, 'pd.DataFrame']] = None, dtype: str = 'float32', index_type: str = 'flat', default_nprobe: int = 16) -> 'LocalVectorIndex':
+        """Open the persisted index, building the flat matrix from features_dir on first use."""
+        if not (Path(index_dir) / MANIFEST_FILE).exists():
+            logger.info(f'Local vector index not found at {index_dir}, building from {features_dir}...')
+            cls.build_from_directory(index_dir, features_dir, keyframe_mappings, dtype)
+        return cls(index_dir, index_type=index_type, default_nprobe=default_nprobe)
+
+    def _score(self, query_vectors: np.ndarray) -> np.ndarray:
+        """Cosine similarity of every row against each query, shape (n_queries, n_rows)."""
+        queries = l2_normalize(np.atleast_2d(query_vectors))
+        total = len(self.vectors)
+        scores = np.empty((len(queries), total), dtype=np.float32)
+        for start in range(0, total, SCORE_BLOCK_SIZE):
+            stop = min(start + SCORE_BLOCK_SIZE, total)
+            block = np.asarray(self.vectors[start:stop], dtype=np.float32)
+            np.matmul(queries, block.T, out=scores[:, start:stop])
+        return scores
+
+    def _to_result(self, row: int, score: float) -> SearchResult:
+        record = self.payload[row]
+        return SearchResult(
+            pack=str(record['pack']),
+            video=str(record['video']),
+            frame=_format_frame(record['keyframe_n']),
+            frame_index=int(record['frame_index']),
+            similarity_score=float(score)
+        )
+
+    def scroll_all(self, packs: Optional[List[str]] = None, videos: Optional[List[str]] = None, excluded_videos: Optional[List[str]] = None, limit: int = 100) -> List[SearchResult]:
+        """Return the first `limit` keyframes matching the filters, in storage order."""
+        try:
+            row_filter = self.ranges.compile(packs, videos, excluded_videos)
+            rows = np.arange(min(limit, len(self.payload))) if row_filter is None else row_filter.row_ids(limit)
+            return [self._to_result(row, 1.0) for row in rows]
+        except Exception as e:
+            logger.error(f'Error during local index scroll: {e}', exc_info=True)
+            return []
+
+    def _score_rows(self, query_vectors: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Cosine similarity of the given (sorted) rows against each query, shape (n_queries, n_rows)."""
+        queries = l2_normalize(np.atleast_2d(query_vectors))
+        return queries @ np.asarray(self.vectors[rows], dtype=np.float32).T
+
+    def _candidate_scores(self, query_vectors: np.ndarray, row_filter, nprobe: int) -> Tuple[Optional[np.ndarray], np.ndarray]:
+        """
+        Score every query against one shared candidate set in a single matmul.
+        Returns (rows, scores); rows is None when all rows were scored in order.
+        """
+        if self.ivf is not None and nprobe > 0:
+            # Union of each query's probed lists: one gather and one matmul for the batch.
+            rows = np.unique(np.concatenate([self.ivf.probe(query, nprobe) for query in l2_normalize(query_vectors)]))
+            if row_filter is not None:
+                rows = rows[row_filter.contains(rows)]
+            return rows, self._score_rows(query_vectors, rows)
+        if row_filter is not None and row_filter.count <= PREFILTER_MAX_FRACTION * len(self.vectors):
+            rows = row_filter.row_ids()
+            return rows, self._score_rows(query_vectors, rows)
+
+        scores = self._score(query_vectors)
+        if row_filter is not None:
+            scores[:, ~row_filter.to_mask()] = -np.inf
+        return None, scores
+
+    def _top_k_results(self, scores: np.ndarray, rows: Optional[np.ndarray], top_k: int) -> List[SearchResult]:
+        k = min(top_k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        top = top[np.isfinite(scores[top])]
+        top_rows = top if rows is None else rows[top]
+        return [self._to_result(row, score) for row, score in zip(top_rows, scores[top])]
+
+    def search_batch(self, query_vectors: np.ndarray, top_k: int = 50, packs: Optional[List[str]] = None, videos: Optional[List[str]] = None, excluded_videos: Optional[List[str]] = None, nprobe: Optional[int] = None) -> List[List[SearchResult]]:
+        """
+        Top-k cosine search for several queries sharing the same filters, with
+        one pass over the matrix (one matmul) for the whole batch.
+        Exact unless an IVF index is loaded, in which case `nprobe`
+        (default: default_nprobe) lists are scanned per query; nprobe=0 is exact.
+        """
+        query_vectors = np.atleast_2d(query_vectors)
+        try:
+            if top_k <= 0 or len(self.vectors) == 0:
+                return [[] for _ in query_vectors]
+            nprobe = self.default_nprobe if nprobe is None else nprobe
+            row_filter = self.ranges.compile(packs, videos, excluded_videos)
+            rows, scores = self._candidate_scores(query_vectors, row_filter, nprobe)
+            return [self._top_k_results(query_scores, rows, top_k) for query_scores in scores]
+        except Exception as e:
+            logger.error(f'Error during local index search: {e}', exc_info=True)
+            return [[] for _ in query_vectors]
+
+    def score_videos(self, query_vectors: np.ndarray, video_ids: List[str]) -> Dict[str, Tuple[List[str], np.ndarray, np.ndarray]]:
+        """
+        Full per-keyframe similarity matrices for the given videos:
+        {video_id: (frames, frame_indices, scores of shape (n_queries, n_keyframes))}.
+        All videos are gathered and scored with one matmul.
+        """
+        slices = [(video_id, self.ranges.rows_for_video(video_id)) for video_id in video_ids]
+        slices = [(video_id, rows) for video_id, rows in slices if rows is not None]
+        if not slices:
+            return {}
+        rows = np.concatenate([np.arange(rows.start, rows.stop) for _, rows in slices])
+        scores = self._score_rows(query_vectors, rows)
+
+        matrices, offset = {}, 0
+        for video_id, video_rows in slices:
+            count = video_rows.stop - video_rows.start
+            payload = self.payload[video_rows]
+            frames = [_format_frame(n) for n in payload['keyframe_n']]
+            matrices[video_id] = (frames, np.asarray(payload['frame_index']), scores[:, offset:offset + count])
+            offset += count
+        return matrices
+
+    def search_similar(self, query_vector: np.ndarray, top_k: int = 50, packs: Optional[List[str]] = None, videos: Optional[List[str]] = None, excluded_videos: Optional[List[str]] = None, nprobe: Optional[int] = None) -> List[SearchResult]:
+        """Top-k cosine search for a single query; see search_batch."""
+        return self.search_batch(query_vector, top_k, packs, videos, excluded_videos, nprobe)[0]
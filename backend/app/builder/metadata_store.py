@@ -0,0 +1,197 @@
+import json
+import os
+import shutil
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+KEYFRAME_DTYPE = np.dtype([
+    ('n', '<i4'),
+    ('pts_time', '<f8'),
+    ('fps', '<f4'),
+    ('frame_idx', '<i8'),
+])
+
+MANIFEST_FILE = 'manifest.json'
+KEYFRAME_VIDEOS_FILE = 'keyframe_videos.npy'
+KEYFRAME_OFFSETS_FILE = 'keyframe_offsets.npy'
+KEYFRAMES_FILE = 'keyframes.npy'
+METADATA_VIDEOS_FILE = 'metadata_videos.npy'
+METADATA_OFFSETS_FILE = 'metadata_offsets.npy'
+METADATA_FILE = 'metadata.bin'
+
+
+def keyframes_to_array(df: 'pd.DataFrame') -> np.ndarray:
+    """Project a map-keyframes DataFrame onto the fixed keyframe columns."""
+    import pandas as pd
+
+    records = np.zeros(len(df), dtype=KEYFRAME_DTYPE)
+    for name in KEYFRAME_DTYPE.names:
+        if name not in df.columns:
+            records[name] = np.nan if name == 'fps' else -1
+            continue
+        values = pd.to_numeric(df[name], errors='coerce')
+        # Missing fps stays NaN so get_video_fps can report it as unknown.
+        records[name] = (values if name == 'fps' else values.fillna(-1)).to_numpy()
+    return records
+
+
+class MetadataStore:
+    """
+    Columnar, memory-mapped store for keyframe mappings and video metadata.
+
+    Keyframes of every video are one structured NumPy array, sliced per video
+    through an offsets index; video metadata is a blob of per-video JSON
+    documents with its own offsets. Files are opened with mmap, so uvicorn
+    workers share pages, and reading one video only touches that video's slice.
+    """
+
+    def __init__(self, store_dir: Path):
+        self.store_dir = Path(store_dir)
+        with open(self.store_dir / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+
+        self.keyframe_videos = np.load(self.store_dir / KEYFRAME_VIDEOS_FILE, mmap_mode='r')
+        self.keyframe_offsets = np.load(self.store_dir / KEYFRAME_OFFSETS_FILE, mmap_mode='r')
+        self.keyframes = np.load(self.store_dir / KEYFRAMES_FILE, mmap_mode='r')
+        self.metadata_videos = np.load(self.store_dir / METADATA_VIDEOS_FILE, mmap_mode='r')
+        self.metadata_offsets = np.load(self.store_dir / METADATA_OFFSETS_FILE, mmap_mode='r')
+        metadata_path = self.store_dir / METADATA_FILE
+        self.metadata_blob = np.memmap(metadata_path, dtype=np.uint8, mode='r') if metadata_path.stat().st_size else np.empty(0, dtype=np.uint8)
+
+    @classmethod
+    def exists(cls, store_dir: Path) -> bool:
+        return (Path(store_dir) / MANIFEST_FILE).exists()
+
+    @classmethod
+    def write(cls, store_dir: Path, video_metadata: Dict[str, dict], keyframe_mappings: Dict[str, 'pd.DataFrame']) -> 'MetadataStore':
+        """Write a new store next to the old one and swap it in atomically."""
+        store_dir = Path(store_dir)
+        tmp_dir = store_dir.with_name(f'{store_dir.name}.tmp')
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+
+        keyframe_videos = sorted(keyframe_mappings)
+        arrays = [keyframe_mappings[video_id] if isinstance(keyframe_mappings[video_id], np.ndarray) else keyframes_to_array(keyframe_mappings[video_id]) for video_id in keyframe_videos]
+        lengths = [len(array) for array in arrays]
+        np.save(tmp_dir / KEYFRAME_VIDEOS_FILE, np.array(keyframe_videos, dtype='U24'))
+        np.save(tmp_dir / KEYFRAME_OFFSETS_FILE, np.concatenate(([0], np.cumsum(lengths))).astype(np.int64))
+        np.save(tmp_dir / KEYFRAMES_FILE, np.concatenate(arrays) if arrays else np.empty(0, dtype=KEYFRAME_DTYPE))
+
+        metadata_videos = sorted(video_metadata)
+        offsets = [0]
+        with open(tmp_dir / METADATA_FILE, 'wb') as f:
+            for video_id in metadata_videos:
+                document = json.dumps(video_metadata[video_id], ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                f.write(document)
+                offsets.append(offsets[-1] + len(document))
+        np.save(tmp_dir / METADATA_VIDEOS_FILE, np.array(metadata_videos, dtype='U24'))
+        np.save(tmp_dir / METADATA_OFFSETS_FILE, np.array(offsets, dtype=np.int64))
+
+        with open(tmp_dir / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump({
+                'keyframe_videos': len(keyframe_videos),
+                'keyframes': int(sum(lengths)),
+                'metadata_videos': len(metadata_videos),
+                'built_at': time.time(),
+            }, f)
+
+        old_dir = store_dir.with_name(f'{store_dir.name}.old')
+        if store_dir.exists():
+            if old_dir.exists():
+                shutil.rmtree(old_dir)
+            os.replace(store_dir, old_dir)
+        os.replace(tmp_dir, store_dir)
+        if old_dir.exists():
+            # Safe on POSIX even if another process still has the old files mapped.
+            shutil.rmtree(old_dir, ignore_errors=True)
+        logger.info(f'Wrote metadata store with {len(keyframe_videos)} keyframe mappings and {len(metadata_videos)} metadata documents to {store_dir}')
+        return cls(store_dir)
+
+    def prefetch(self) -> int:
+        """Touch every page of the keyframe and metadata files so later lookups don't fault."""
+        touched = 0
+        for array in (self.keyframes, self.metadata_blob):
+            data = np.asarray(array).reshape(-1).view(np.uint8)
+            # Reading one byte per page is enough to fault the whole page in.
+            data[::4096].sum(dtype=np.int64)
+            touched += data.nbytes
+        return touched
+
+    @staticmethod
+    def _position(sorted_ids: np.ndarray, video_id: str) -> Optional[int]:
+        position = int(np.searchsorted(sorted_ids, video_id))
+        if position < len(sorted_ids) and sorted_ids[position] == video_id:
+            return position
+        return None
+
+    def keyframes_for(self, video_id: str) -> Optional[np.ndarray]:
+        """Structured keyframe rows (n, pts_time, fps, frame_idx) of one video, as a view."""
+        position = self._position(self.keyframe_videos, video_id)
+        if position is None:
+            return None
+        return self.keyframes[self.keyframe_offsets[position]:self.keyframe_offsets[position + 1]]
+
+    def metadata_for(self, video_id: str) -> Optional[dict]:
+        position = self._position(self.metadata_videos, video_id)
+        if position is None:
+            return None
+        start, stop = self.metadata_offsets[position], self.metadata_offsets[position + 1]
+        return json.loads(self.metadata_blob[start:stop].tobytes().decode('utf-8'))
+
+
+class KeyframeMappingView(Mapping):
+    """Read-only dict-like view of a MetadataStore: video_id -> keyframe DataFrame."""
+
+    def __init__(self, store: MetadataStore):
+        self.store = store
+
+    def __getitem__(self, video_id: str) -> 'pd.DataFrame':
+        import pandas as pd
+
+        rows = self.store.keyframes_for(video_id)
+        if rows is None:
+            raise KeyError(video_id)
+        return pd.DataFrame(np.asarray(rows))
+
+    def __iter__(self) -> Iterator[str]:
+        return (str(video_id) for video_id in self.store.keyframe_videos)
+
+    def __len__(self) -> int:
+        return len(self.store.keyframe_videos)
+
+    def __contains__(self, video_id) -> bool:
+        return self.store._position(self.store.keyframe_videos, video_id) is not None
+
+
+class VideoMetadataView(Mapping):
+    """Read-only dict-like view of a MetadataStore: video_id -> metadata dict."""
+
+    def __init__(self, store: MetadataStore):
+        self.store = store
+
+    def __getitem__(self, video_id: str) -> dict:
+        metadata = self.store.metadata_for(video_id)
+        if metadata is None:
+            raise KeyError(video_id)
+        return metadata
+
+    def __iter__(self) -> Iterator[str]:
+        return (str(video_id) for video_id in self.store.metadata_videos)
+
+    def __len__(self) -> int:
+        return len(self.store.metadata_videos)
+
+    def __contains__(self, video_id) -> bool:
+        return self.store._position(self.store.metadata_videos, video_id) is not None
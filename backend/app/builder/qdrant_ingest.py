@@ -0,0 +1,285 @@
+import json
+import os
+import random
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, Mapping, Optional, Tuple
+
+import numpy as np
+from qdrant_client import QdrantClient, models
+
+from .local_index import keyframe_columns
+from ..utils.index_stamp import bump_index_stamp
+from ..utils.logger import setup_logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = setup_logger(__name__)
+
+# Namespace of the uuid5 point ids, so re-running the ingestion overwrites points instead of duplicating them.
+POINT_ID_NAMESPACE = uuid.UUID('6f0f6f3e-52a4-4c36-9d2c-0c1f4b9a4e51')
+
+# Payload fields QdrantManager filters on, with the index type each needs.
+PAYLOAD_INDEXES = {
+    'pack': models.PayloadSchemaType.KEYWORD,
+    'video': models.PayloadSchemaType.KEYWORD,
+    'frame_index': models.PayloadSchemaType.INTEGER,
+}
+
+
+def point_id(video_id: str, keyframe_n: int) -> str:
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, f'{video_id}/{int(keyframe_n)}'))
+
+
+def feature_fingerprint(path: Path) -> str:
+    """Changes whenever the feature file is rewritten."""
+    stat = path.stat()
+    return f'{stat.st_size}:{stat.st_mtime_ns}'
+
+
+@dataclass
+class IngestStats:
+    videos: int = 0
+    points: int = 0
+    skipped_videos: int = 0
+    failed_videos: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def points_per_second(self) -> float:
+        return self.points / self.seconds if self.seconds else 0.0
+
+    def describe(self) -> str:
+        return (f'{self.points} points from {self.videos} videos in {self.seconds:.1f}s '
+                f'({self.points_per_second:.0f} points/s), {self.skipped_videos} already ingested, '
+                f'{self.retries} retries, {self.failed_videos} failed')
+
+
+class IngestCheckpoint:
+    """
+    Videos already upserted into a collection, with the fingerprint of the
+    feature file they came from. Saved atomically as JSON, so an interrupted
+    ingestion resumes after the last recorded video.
+    """
+
+    def __init__(self, path: Path, collection_name: str, dim: int):
+        self.path = Path(path)
+        self.collection_name = collection_name
+        self.dim = dim
+        self.videos: Dict[str, str] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                if state.get('collection') == collection_name and state.get('dim') == dim:
+                    self.videos = state.get('videos', {})
+            except (OSError, ValueError) as e:
+                logger.warning(f'Ignoring unreadable ingestion checkpoint {self.path}: {e}')
+
+    def is_done(self, video_id: str, fingerprint: str) -> bool:
+        return self.videos.get(video_id) == fingerprint
+
+    def mark_done(self, video_id: str, fingerprint: str) -> None:
+        self.videos[video_id] = fingerprint
+
+    def reset(self) -> None:
+        self.videos = {}
+        self.save()
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f'{self.path.name}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'collection': self.collection_name, 'dim': self.dim, 'videos': self.videos}, f)
+        os.replace(tmp_path, self.path)
+
+
+class QdrantIngestor:
+    """
+    Loads clip-features-32 into a Qdrant collection with the payload
+    QdrantManager searches on: pack, video, frame ('001.jpg') and
+    frame_index, joined from the keyframe mappings.
+
+    Feature files are memory-mapped and cut into `batch_size` point batches,
+    which are upserted on `parallel` threads with at most `parallel * 2`
+    batches in flight, so memory does not grow with the corpus. Point ids
+    are derived from (video, keyframe), making upserts idempotent; a video
+    is recorded in the checkpoint once all its batches are acknowledged, and
+    a rerun skips recorded videos whose feature file has not changed.
+    """
+
+    def __init__(self, client: QdrantClient, collection_name: str, checkpoint_path: Path, batch_size: int = 256, parallel: int = 4, retries: int = 3, backoff_seconds: float = 1.0, checkpoint_every_seconds: float = 5.0, report_every_seconds: float = 10.0):
+        self.client = client
+        self.collection_name = collection_name
+        self.checkpoint_path = Path(checkpoint_path)
+        self.batch_size = max(1, batch_size)
+        self.parallel = max(1, parallel)
+        self.retries = max(0, retries)
+        self.backoff_seconds = backoff_seconds
+        self.checkpoint_every_seconds = checkpoint_every_seconds
+        self.report_every_seconds = report_every_seconds
+        self.stats = IngestStats()
+
+    def ensure_collection(self, dim: int, recreate: bool = False) -> bool:
+        """Create the collection and its payload indexes if needed; returns True if it was (re)created."""
+        # Listing rather than collection_exists(), which the v1.7 server in docker-compose lacks.
+        exists = self.collection_name in {collection.name for collection in self.client.get_collections().collections}
+        if exists and recreate:
+            logger.warning(f"Deleting Qdrant collection '{self.collection_name}' before ingestion.")
+            self.client.delete_collection(self.collection_name)
+            exists = False
+        if exists:
+            size = self.client.get_collection(self.collection_name).config.params.vectors.size
+            if size != dim:
+                raise ValueError(f"Collection '{self.collection_name}' holds {size}-d vectors, features are {dim}-d; rerun with recreate.")
+        else:
+            logger.info(f"Creating Qdrant collection '{self.collection_name}' ({dim}-d, cosine).")
+            self.client.create_collection(
+                collection_name=self.collection_name,
+                vectors_config=models.VectorParams(size=dim, distance=models.Distance.COSINE)
+            )
+
+        indexed = self.client.get_collection(self.collection_name).payload_schema or {}
+        for field, schema in PAYLOAD_INDEXES.items():
+            if field not in indexed:
+                logger.info(f"Creating payload index on '{field}'.")
+                self.client.create_payload_index(self.collection_name, field_name=field, field_schema=schema, wait=True)
+        return not exists
+
+    def _batches(self, video_id: str, path: Path, mapping_df: Optional['pd.DataFrame']) -> Iterator[models.Batch]:
+        features = np.load(path, mmap_mode='r')
+        keyframe_n, frame_index = keyframe_columns(mapping_df, len(features))
+        pack, _, video = video_id.partition('_')
+        for start in range(0, len(features), self.batch_size):
+            stop = min(start + self.batch_size, len(features))
+            yield models.Batch(
+                ids=[point_id(video_id, n) for n in keyframe_n[start:stop]],
+                vectors=np.asarray(features[start:stop], dtype=np.float32).tolist(),
+                payloads=[
+                    {'pack': pack, 'video': video, 'frame': f'{int(n):03d}.jpg', 'frame_index': int(index)}
+                    for n, index in zip(keyframe_n[start:stop], frame_index[start:stop])
+                ]
+            )
+
+    def _upsert(self, batch: models.Batch) -> int:
+        for attempt in range(self.retries + 1):
+            try:
+                self.client.upsert(collection_name=self.collection_name, points=batch, wait=True)
+                return len(batch.ids)
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff_seconds * 2 ** attempt
+                self.stats.retries += 1
+                logger.warning(f'Qdrant upsert failed ({e}), retrying in {delay:.1f}s')
+                time.sleep(delay * random.uniform(0.5, 1.0))
+
+    def ingest(self, feature_sources: Mapping[str, Path], keyframe_mappings: Optional[Mapping[str, 'pd.DataFrame']] = None, recreate: bool = False) -> IngestStats:
+        """Upsert every video of `feature_sources` (video id -> .npy path) not already in the checkpoint."""
+        self.stats = IngestStats()
+        keyframe_mappings = keyframe_mappings or {}
+        video_ids = sorted(feature_sources)
+        if not video_ids:
+            logger.warning('No feature files to ingest.')
+            return self.stats
+
+        dim = int(np.load(feature_sources[video_ids[0]], mmap_mode='r').shape[1])
+        checkpoint = IngestCheckpoint(self.checkpoint_path, self.collection_name, dim)
+        created = self.ensure_collection(dim, recreate=recreate)
+        if created and checkpoint.videos:
+            logger.info('Collection was (re)created; discarding the ingestion checkpoint.')
+            checkpoint.reset()
+
+        pending_videos = []
+        for video_id in video_ids:
+            fingerprint = feature_fingerprint(Path(feature_sources[video_id]))
+            if checkpoint.is_done(video_id, fingerprint):
+                self.stats.skipped_videos += 1
+            else:
+                pending_videos.append((video_id, fingerprint))
+        logger.info(f'Ingesting {len(pending_videos)} of {len(video_ids)} videos into {self.collection_name} ({self.stats.skipped_videos} already done).')
+
+        def batches() -> Iterator[Tuple[str, models.Batch, bool]]:
+            """(video_id, batch, is the video's last batch); one video's batches are built at a time."""
+            for video_id, fingerprint in pending_videos:
+                try:
+                    video_batches = list(self._batches(video_id, Path(feature_sources[video_id]), keyframe_mappings.get(video_id)))
+                except (OSError, ValueError) as e:
+                    logger.error(f'Could not read features of {video_id}: {e}')
+                    self.stats.failed_videos += 1
+                    continue
+                if not video_batches:
+                    # No keyframes means nothing to upsert; without this it would stay pending on every run.
+                    logger.warning(f'{video_id} has no feature rows; marking it done.')
+                    checkpoint.mark_done(video_id, fingerprint)
+                    self.stats.videos += 1
+                    continue
+                for i, batch in enumerate(video_batches):
+                    yield video_id, batch, i == len(video_batches) - 1
+
+        fingerprints = dict(pending_videos)
+        start = time.perf_counter()
+        try:
+            self._run(batches(), fingerprints, checkpoint, start)
+        finally:
+            # Also on failure or Ctrl-C, so the next run resumes after the videos that made it.
+            checkpoint.save()
+            if created or self.stats.points:
+                bump_index_stamp(f'qdrant-ingest:{self.collection_name}')
+        self.stats.seconds = time.perf_counter() - start
+        logger.info(f'qdrant-ingest finished: {self.stats.describe()}')
+        return self.stats
+
+    def _run(self, source: Iterator[Tuple[str, models.Batch, bool]], fingerprints: Dict[str, str], checkpoint: IngestCheckpoint, start: float) -> None:
+        outstanding: Dict[str, int] = {}  # in-flight batches per video
+        finished: set = set()  # videos whose last batch has been submitted
+        failed: set = set()
+        last_report = last_checkpoint = start
+        with ThreadPoolExecutor(max_workers=self.parallel, thread_name_prefix='qdrant-ingest') as executor:
+            in_flight = {}
+            exhausted = False
+            while in_flight or not exhausted:
+                while not exhausted and len(in_flight) < self.parallel * 2:
+                    item = next(source, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    video_id, batch, is_last = item
+                    outstanding[video_id] = outstanding.get(video_id, 0) + 1
+                    if is_last:
+                        finished.add(video_id)
+                    in_flight[executor.submit(self._upsert, batch)] = video_id
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    video_id = in_flight.pop(future)
+                    outstanding[video_id] -= 1
+                    try:
+                        self.stats.points += future.result()
+                    except Exception as e:
+                        if video_id not in failed:
+                            logger.error(f'Failed to ingest {video_id}: {e}')
+                        failed.add(video_id)
+                    if outstanding[video_id] == 0 and video_id in finished:
+                        del outstanding[video_id]
+                        if video_id in failed:
+                            self.stats.failed_videos += 1
+                        else:
+                            checkpoint.mark_done(video_id, fingerprints[video_id])
+                            self.stats.videos += 1
+
+                now = time.perf_counter()
+                self.stats.seconds = now - start
+                if now - last_checkpoint >= self.checkpoint_every_seconds:
+                    last_checkpoint = now
+                    checkpoint.save()
+                if now - last_report >= self.report_every_seconds:
+                    last_report = now
+                    logger.info(f'qdrant-ingest: {self.stats.describe()}')
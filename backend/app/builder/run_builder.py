@@ -7,6 +7,9 @@ sys.path.append(str(Path(__file__).resolve().parents[2]))
 from app.config import Settings
 from app.builder.data_loader import DataLoader
 from app.builder.weaviate_indexer import WeaviateIndexer
+from app.builder.build_vector_index import build_vector_index
+from app.builder.build_qdrant_index import build_qdrant_index
+from app.builder.build_sprite_sheets import build_sprite_sheets
 from app.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -27,11 +30,30 @@ def main():
         dataloader.load_all(force_reload=True) # Set force_reload to True to ensure fresh data
         logger.info("--- Step 1: Data loading complete ---")
 
-        # 2. Index data into Weaviate
+        # 2. Index data into Weaviate; the CLIP stages below do not depend on it
         logger.info("--- Step 2: Indexing data into Weaviate ---")
-        indexer = WeaviateIndexer(settings=settings, dataloader=dataloader)
-        indexer.index_videos(force_reload=False, recreate_collection=True) # force_reload is False here as data is already loaded
-        logger.info("--- Step 2: Indexing complete ---")
+        try:
+            indexer = WeaviateIndexer(settings=settings, dataloader=dataloader)
+            indexer.index_videos(force_reload=False, recreate_collection=False) # only new/changed videos are re-encoded and upserted
+            logger.info("--- Step 2: Indexing complete ---")
+        except Exception as e:
+            logger.error(f"--- Step 2: Weaviate indexing failed, continuing without it: {e}", exc_info=True)
+
+        # 3. Load the CLIP features into the configured vector index backend
+        if settings.VECTOR_INDEX_BACKEND == 'local':
+            logger.info("--- Step 3: Building local CLIP vector index ---")
+            build_vector_index(settings, dataloader)
+            logger.info("--- Step 3: Local CLIP vector index complete ---")
+        elif settings.CLIP_FEATURES_PATH.is_dir():
+            logger.info("--- Step 3: Loading CLIP features into Qdrant ---")
+            build_qdrant_index(settings, dataloader)
+            logger.info("--- Step 3: Qdrant ingestion complete ---")
+
+        # 4. Pack keyframes into per-video sprite sheets when the images are available locally
+        if settings.KEYFRAMES_PATH.is_dir():
+            logger.info("--- Step 4: Building keyframe sprite sheets ---")
+            build_sprite_sheets(settings, dataloader)
+            logger.info("--- Step 4: Sprite sheets complete ---")
 
         logger.info("Pipeline finished successfully!")
 
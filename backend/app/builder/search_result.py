@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class SearchResult:
+    pack: str
+    video: str
+    frame: str
+    frame_index: int
+    similarity_score: float
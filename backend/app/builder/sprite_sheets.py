@@ -0,0 +1,144 @@
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+INDEX_FILE = 'index.json'
+_VIDEO_ID = re.compile(r'^[A-Za-z0-9_-]+$')
+_SHEET_NAME = re.compile(r'^sheet_\d+_[0-9a-f]+\.jpg$')
+
+
+def sprite_dir(sprites_path: Path, video_id: str) -> Optional[Path]:
+    """Directory holding one video's sheets and index, or None for an unsafe id."""
+    if not _VIDEO_ID.match(video_id):
+        return None
+    return Path(sprites_path) / video_id
+
+
+def sheet_path(sprites_path: Path, video_id: str, sheet_name: str) -> Optional[Path]:
+    directory = sprite_dir(sprites_path, video_id)
+    if directory is None or not _SHEET_NAME.match(sheet_name):
+        return None
+    return directory / sheet_name
+
+
+def build_video_sprites(
+    video_id: str,
+    keyframe_ids: Sequence[str],
+    frame_indices: Sequence[int],
+    keyframes_dir: Path,
+    sprites_path: Path,
+    tile_width: int = 160,
+    columns: int = 10,
+    rows: int = 10,
+    quality: int = 75,
+) -> Optional[Dict]:
+    """
+    Tile every keyframe of a video, in `keyframe_ids` order, into sheets of
+    `columns` x `rows` tiles and write them with an index.json mapping each
+    tile to its sheet, pixel offset, keyframe id and frame_index.
+
+    Sheet names carry a content hash, so they can be cached forever; the
+    video's directory is replaced atomically. Keyframes missing on disk
+    keep their tile (left grey) so tile order always matches the mapping.
+    Returns the index, or None if no keyframe image exists.
+    """
+    from PIL import Image
+
+    keyframes_dir = Path(keyframes_dir) / video_id
+    sources = [keyframes_dir / f'{keyframe_id}.jpg' for keyframe_id in keyframe_ids]
+    first = next((path for path in sources if path.is_file()), None)
+    if first is None:
+        return None
+    with Image.open(first) as image:
+        tile_height = max(1, round(image.height * tile_width / image.width))
+
+    target_dir = sprite_dir(sprites_path, video_id)
+    if target_dir is None:
+        return None
+    tmp_dir = target_dir.with_name(f'{target_dir.name}.tmp')
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    per_sheet = columns * rows
+    sheets, tiles = [], []
+    missing = 0
+    for sheet_number, offset in enumerate(range(0, len(sources), per_sheet)):
+        batch = sources[offset:offset + per_sheet]
+        sheet_rows = (len(batch) + columns - 1) // columns
+        sheet_columns = min(columns, len(batch))
+        sheet = Image.new('RGB', (sheet_columns * tile_width, sheet_rows * tile_height), (64, 64, 64))
+        for i, source in enumerate(batch):
+            x, y = (i % columns) * tile_width, (i // columns) * tile_height
+            position = offset + i
+            tiles.append({
+                'keyframe_id': keyframe_ids[position],
+                'frame_index': int(frame_indices[position]),
+                'sheet': sheet_number,
+                'x': x,
+                'y': y,
+            })
+            try:
+                with Image.open(source) as image:
+                    image.draft('RGB', (tile_width, tile_height))
+                    sheet.paste(image.convert('RGB').resize((tile_width, tile_height), Image.LANCZOS, reducing_gap=2.0), (x, y))
+            except (OSError, ValueError):
+                missing += 1
+
+        buffer = io.BytesIO()
+        sheet.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+        data = buffer.getvalue()
+        name = f'sheet_{sheet_number:03d}_{hashlib.sha1(data).hexdigest()[:10]}.jpg'
+        (tmp_dir / name).write_bytes(data)
+        sheets.append({'name': name, 'columns': sheet_columns, 'rows': sheet_rows})
+
+    index = {
+        'video': video_id,
+        'tile_width': tile_width,
+        'tile_height': tile_height,
+        'sheets': sheets,
+        'tiles': tiles,
+    }
+    with open(tmp_dir / INDEX_FILE, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'))
+
+    old_dir = target_dir.with_name(f'{target_dir.name}.old')
+    if target_dir.exists():
+        if old_dir.exists():
+            shutil.rmtree(old_dir)
+        os.replace(target_dir, old_dir)
+    os.replace(tmp_dir, target_dir)
+    if old_dir.exists():
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    if missing:
+        logger.warning(f'{video_id}: {missing} of {len(sources)} keyframes missing from the sprite sheets.')
+    return index
+
+
+def is_current(sprites_path: Path, video_id: str, keyframe_ids: Sequence[str], frame_indices: Sequence[int]) -> bool:
+    """True if the video's sheets were built from exactly these keyframes, in this order."""
+    directory = sprite_dir(sprites_path, video_id)
+    try:
+        with open(directory / INDEX_FILE, encoding='utf-8') as f:
+            tiles = json.load(f)['tiles']
+    except (TypeError, OSError, ValueError, KeyError):
+        return False
+    return [(tile['keyframe_id'], tile['frame_index']) for tile in tiles] == list(zip(keyframe_ids, map(int, frame_indices)))
+
+
+def built_videos(sprites_path: Path) -> List[str]:
+    """Videos that already have a complete set of sprite sheets."""
+    sprites_path = Path(sprites_path)
+    if not sprites_path.is_dir():
+        return []
+    return sorted(entry.name for entry in os.scandir(sprites_path) if _VIDEO_ID.match(entry.name) and (Path(entry.path) / INDEX_FILE).is_file())
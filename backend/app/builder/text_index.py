@@ -0,0 +1,225 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from ..utils.logger import setup_logger
+from ..utils.text_processing import tokenize, video_text_document
+from ..utils.vectors import l2_normalize, min_max
+
+logger = setup_logger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+VOCAB_FILE = 'vocab.json'
+VIDEO_IDS_FILE = 'video_ids.npy'
+POSTINGS_INDPTR_FILE = 'postings_indptr.npy'
+POSTINGS_DOCS_FILE = 'postings_docs.npy'
+POSTINGS_WEIGHTS_FILE = 'postings_weights.npy'
+IDF_FILE = 'idf.npy'
+VECTORS_FILE = 'vectors.npy'
+
+# Fields searched by BM25, matching `query_properties` of the Weaviate hybrid query.
+TEXT_FIELDS = ('title', 'description', 'keywords', 'content')
+
+
+def corpus_fingerprint(documents: Iterable[Tuple[str, str]], model_name: str, k1: float, b: float) -> str:
+    digest = hashlib.sha1(f'{model_name}\x00{k1}\x00{b}'.encode('utf-8'))
+    for video_id, content in documents:
+        digest.update(f'\x00{video_id}\x00{content}'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class LocalTextIndex:
+    """
+    In-process hybrid (BM25 + dense) index over the video metadata text, a
+    local stand-in for the Weaviate `VideoText` collection.
+
+    One document per video, built from the same fields WeaviateIndexer
+    writes. BM25 uses an inverted index stored as CSR arrays (term ->
+    postings of document rows with precomputed tf weights), so a query only
+    touches the postings of its terms. The MiniLM embeddings of each
+    document's `content` form one L2-normalised matrix. Both parts are
+    memory-mapped from `index_dir`.
+
+    Search follows Weaviate's relativeScoreFusion: keyword and vector scores
+    are each min-max scaled over the candidate set and mixed with `alpha`
+    (1 = pure vector, 0 = pure BM25).
+    """
+
+    def __init__(self, index_dir: Path):
+        self.index_dir = Path(index_dir)
+        manifest_path = self.index_dir / MANIFEST_FILE
+        if not manifest_path.exists():
+            raise FileNotFoundError(f'No local text index found at {self.index_dir}')
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        with open(self.index_dir / VOCAB_FILE, 'r', encoding='utf-8') as f:
+            self.vocab: Dict[str, int] = {term: i for i, term in enumerate(json.load(f))}
+
+        self.video_ids = np.load(self.index_dir / VIDEO_IDS_FILE)
+        self.video_rows: Dict[str, int] = {video_id: row for row, video_id in enumerate(self.video_ids.tolist())}
+        self.indptr = np.load(self.index_dir / POSTINGS_INDPTR_FILE, mmap_mode='r')
+        self.docs = np.load(self.index_dir / POSTINGS_DOCS_FILE, mmap_mode='r')
+        self.weights = np.load(self.index_dir / POSTINGS_WEIGHTS_FILE, mmap_mode='r')
+        self.idf = np.load(self.index_dir / IDF_FILE)
+        self.vectors = np.load(self.index_dir / VECTORS_FILE, mmap_mode='r')
+        logger.info(f'Loaded local text index: {len(self.video_ids)} videos, {len(self.vocab)} terms from {self.index_dir}')
+
+    @property
+    def fingerprint(self) -> str:
+        return self.manifest.get('fingerprint', '')
+
+    @classmethod
+    def build(
+        cls,
+        index_dir: Path,
+        video_metadata: Mapping[str, dict],
+        encode_documents: Callable[[List[str]], np.ndarray],
+        model_name: str,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> 'LocalTextIndex':
+        """Build the BM25 postings and the embedding matrix, then swap them into `index_dir` atomically."""
+        index_dir = Path(index_dir)
+        video_ids = sorted(video_metadata.keys())
+        documents = [video_text_document(video_metadata[video_id] or {}) for video_id in video_ids]
+
+        # term -> {row: tf}, with each field contributing its own occurrences.
+        postings: Dict[str, Dict[int, int]] = {}
+        doc_lengths = np.zeros(len(video_ids), dtype=np.float32)
+        for row, document in enumerate(documents):
+            for field in TEXT_FIELDS:
+                tokens = tokenize(document[field])
+                doc_lengths[row] += len(tokens)
+                for token in tokens:
+                    term_postings = postings.setdefault(token, {})
+                    term_postings[row] = term_postings.get(row, 0) + 1
+
+        terms = sorted(postings)
+        n_docs = max(len(video_ids), 1)
+        avg_length = float(doc_lengths.mean()) if len(doc_lengths) and doc_lengths.mean() > 0 else 1.0
+        indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(postings[term]) for term in terms])
+        docs = np.empty(indptr[-1], dtype=np.int32)
+        tfs = np.empty(indptr[-1], dtype=np.float32)
+        for i, term in enumerate(terms):
+            rows = postings[term]
+            docs[indptr[i]:indptr[i + 1]] = list(rows.keys())
+            tfs[indptr[i]:indptr[i + 1]] = list(rows.values())
+        # BM25 term weight without the idf factor, which is applied per query term.
+        norm = k1 * (1 - b + b * doc_lengths[docs] / avg_length)
+        weights = (tfs * (k1 + 1) / (tfs + norm)).astype(np.float32)
+        df = np.diff(indptr).astype(np.float64)
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+        start = time.perf_counter()
+        vectors = l2_normalize(encode_documents([document['content'] for document in documents]))
+        logger.info(f'Encoded {len(documents)} video documents in {time.perf_counter() - start:.1f}s')
+
+        tmp_dir = index_dir.with_name(f'{index_dir.name}.tmp')
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+        with open(tmp_dir / VOCAB_FILE, 'w', encoding='utf-8') as f:
+            json.dump(terms, f, ensure_ascii=False)
+        np.save(tmp_dir / VIDEO_IDS_FILE, np.array(video_ids, dtype='U24'))
+        np.save(tmp_dir / POSTINGS_INDPTR_FILE, indptr)
+        np.save(tmp_dir / POSTINGS_DOCS_FILE, docs)
+        np.save(tmp_dir / POSTINGS_WEIGHTS_FILE, weights)
+        np.save(tmp_dir / IDF_FILE, idf)
+        np.save(tmp_dir / VECTORS_FILE, vectors)
+        with open(tmp_dir / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump({
+                'videos': len(video_ids),
+                'terms': len(terms),
+                'postings': int(indptr[-1]),
+                'dim': int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+                'k1': k1,
+                'b': b,
+                'model': model_name,
+                'fingerprint': corpus_fingerprint(zip(video_ids, (d['content'] for d in documents)), model_name, k1, b),
+                'built_at': time.time(),
+            }, f)
+
+        old_dir = index_dir.with_name(f'{index_dir.name}.old')
+        if index_dir.exists():
+            if old_dir.exists():
+                shutil.rmtree(old_dir)
+            os.replace(index_dir, old_dir)
+        os.replace(tmp_dir, index_dir)
+        if old_dir.exists():
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+        logger.info(f'Built local text index with {len(video_ids)} videos and {len(terms)} terms at {index_dir}')
+        return cls(index_dir)
+
+    @classmethod
+    def load_or_build(
+        cls,
+        index_dir: Path,
+        video_metadata: Mapping[str, dict],
+        encode_documents: Callable[[List[str]], np.ndarray],
+        model_name: str,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> 'LocalTextIndex':
+        """Open the persisted index if it was built from this metadata and model, otherwise rebuild it."""
+        video_ids = sorted(video_metadata.keys())
+        fingerprint = corpus_fingerprint(
+            ((video_id, video_text_document(video_metadata[video_id] or {})['content']) for video_id in video_ids),
+            model_name, k1, b
+        )
+        if (Path(index_dir) / MANIFEST_FILE).exists():
+            index = cls(index_dir)
+            if index.fingerprint == fingerprint:
+                return index
+            logger.info('Video metadata or keyword model changed since the local text index was built; rebuilding.')
+        return cls.build(index_dir, video_metadata, encode_documents, model_name, k1, b)
+
+    def candidate_rows(self, video_ids: Optional[Iterable[str]]) -> np.ndarray:
+        """Sorted rows of the given videos (all rows for None); unknown ids are ignored."""
+        if video_ids is None:
+            return np.arange(len(self.video_ids))
+        mask = np.zeros(len(self.video_ids), dtype=bool)
+        rows = [self.video_rows[video_id] for video_id in video_ids if video_id in self.video_rows]
+        mask[rows] = True
+        return np.flatnonzero(mask)
+
+    def bm25(self, query: str) -> np.ndarray:
+        """BM25 score of every document; zero for documents sharing no term with the query."""
+        scores = np.zeros(len(self.video_ids), dtype=np.float32)
+        for term in set(tokenize(query)):
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            # A term's postings hold each document once, so plain fancy-index addition is safe.
+            scores[self.docs[start:end]] += self.idf[term_id] * self.weights[start:end]
+        return scores
+
+    def search(self, query: str, query_vector: np.ndarray, video_ids: Optional[Iterable[str]] = None, alpha: float = 0.5, top_k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """(video_id, fused score) pairs among `video_ids`, best first."""
+        rows = self.candidate_rows(video_ids)
+        if not len(rows):
+            return []
+
+        keyword = self.bm25(query)[rows]
+        matched = keyword > 0
+        keyword_scores = np.zeros(len(rows), dtype=np.float32)
+        keyword_scores[matched] = min_max(keyword[matched])
+
+        query_vector = l2_normalize(np.asarray(query_vector).reshape(-1))
+        vector_scores = min_max(np.asarray(self.vectors[rows], dtype=np.float32) @ query_vector)
+
+        fused = alpha * vector_scores + (1 - alpha) * keyword_scores
+        if top_k is not None and top_k < len(fused):
+            order = np.argpartition(-fused, top_k - 1)[:top_k]
+            order = order[np.argsort(-fused[order], kind='stable')]
+        else:
+            order = np.argsort(-fused, kind='stable')
+        return list(zip(self.video_ids[rows[order]].tolist(), fused[order].astype(float).tolist()))
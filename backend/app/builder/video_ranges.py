@@ -0,0 +1,151 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+VIDEO_TABLE_DTYPE = np.dtype([
+    ('video_id', 'U24'),
+    ('start', '<i8'),
+    ('stop', '<i8'),
+])
+
+
+def group_videos_by_pack(video_ids: List[str]) -> Dict[str, List[str]]:
+    """Split 'L21_V001'-style ids into {pack: [video, ...]}; ids without a pack are skipped."""
+    grouped = defaultdict(list)
+    for video_id in video_ids:
+        if '_' in video_id:
+            pack, video = video_id.split('_', 1)
+            grouped[pack].append(video)
+    return dict(grouped)
+
+
+@dataclass
+class RowRanges:
+    """Sorted, disjoint half-open row ranges [starts[i], stops[i]) selected by a filter."""
+    starts: np.ndarray
+    stops: np.ndarray
+    total_rows: int
+
+    @property
+    def count(self) -> int:
+        return int((self.stops - self.starts).sum())
+
+    def row_ids(self, limit: Optional[int] = None) -> np.ndarray:
+        """Concatenated row ids of all ranges (optionally only the first `limit`)."""
+        lengths = self.stops - self.starts
+        if limit is not None:
+            cutoff = np.searchsorted(np.cumsum(lengths), limit, side='left') + 1
+            lengths, starts = lengths[:cutoff], self.starts[:cutoff]
+        else:
+            starts = self.starts
+        if not len(lengths):
+            return np.empty(0, dtype=np.int64)
+        # Each row is its range start plus its offset inside that range.
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        rows = np.repeat(starts, lengths) + offsets
+        return rows[:limit] if limit is not None else rows
+
+    def contains(self, rows: np.ndarray) -> np.ndarray:
+        """Boolean membership of (any order) row ids, via binary search over the ranges."""
+        idx = np.searchsorted(self.starts, rows, side='right') - 1
+        valid = idx >= 0
+        inside = np.zeros(len(rows), dtype=bool)
+        inside[valid] = rows[valid] < self.stops[idx[valid]]
+        return inside
+
+    def to_mask(self) -> np.ndarray:
+        """Dense row bitmask, built with one cumulative sum rather than per-range writes."""
+        delta = np.zeros(self.total_rows + 1, dtype=np.int32)
+        np.add.at(delta, self.starts, 1)
+        np.add.at(delta, self.stops, -1)
+        return np.cumsum(delta[:-1]) > 0
+
+
+class VideoRangeIndex:
+    """
+    Columnar pack -> video -> row-range index over a video-contiguous matrix.
+
+    Rows of the local vector index are stored video by video in sorted id
+    order, so every video is one contiguous row range and every pack is one
+    contiguous run of videos. Pack/video include and exclude filters compile
+    to a RowRanges in O(#videos) without touching per-row payload.
+    """
+
+    def __init__(self, video_table: np.ndarray, total_rows: int):
+        self.video_ids = video_table['video_id']
+        self.starts = np.asarray(video_table['start'], dtype=np.int64)
+        self.stops = np.asarray(video_table['stop'], dtype=np.int64)
+        self.total_rows = total_rows
+        self.video_position: Dict[str, int] = {str(video_id): i for i, video_id in enumerate(self.video_ids)}
+
+        self.pack_positions: Dict[str, slice] = {}
+        packs = [video_id.split('_', 1)[0] for video_id in self.video_position]
+        for i, pack in enumerate(packs):
+            if pack not in self.pack_positions:
+                self.pack_positions[pack] = slice(i, i + 1)
+            else:
+                self.pack_positions[pack] = slice(self.pack_positions[pack].start, i + 1)
+
+    @staticmethod
+    def table_from_payload(packs: np.ndarray, videos: np.ndarray) -> np.ndarray:
+        """Derive the per-video row ranges from the row payload columns."""
+        total = len(packs)
+        if total == 0:
+            return np.empty(0, dtype=VIDEO_TABLE_DTYPE)
+        changed = np.flatnonzero((packs[1:] != packs[:-1]) | (videos[1:] != videos[:-1])) + 1
+        starts = np.concatenate(([0], changed))
+        stops = np.concatenate((changed, [total]))
+        table = np.empty(len(starts), dtype=VIDEO_TABLE_DTYPE)
+        table['video_id'] = np.char.add(np.char.add(packs[starts], '_'), videos[starts])
+        table['start'] = starts
+        table['stop'] = stops
+        return table
+
+    def rows_for_video(self, video_id: str) -> Optional[slice]:
+        position = self.video_position.get(video_id)
+        if position is None:
+            return None
+        return slice(int(self.starts[position]), int(self.stops[position]))
+
+    def compile(self, packs: Optional[List[str]] = None, videos: Optional[List[str]] = None, excluded_videos: Optional[List[str]] = None) -> Optional[RowRanges]:
+        """
+        Compile pack/video filters into row ranges, or None when nothing is filtered.
+
+        Semantics match QdrantManager._build_filter: a row must belong to one of
+        `packs` (if given) AND one of `videos` (if given) AND none of
+        `excluded_videos`.
+        """
+        if not packs and not videos and not excluded_videos:
+            return None
+
+        selected = np.zeros(len(self.video_ids), dtype=bool)
+        if videos:
+            positions = [self.video_position[v] for v in videos if v in self.video_position]
+            selected[positions] = True
+            if packs:
+                in_packs = np.zeros_like(selected)
+                for pack in packs:
+                    if pack in self.pack_positions:
+                        in_packs[self.pack_positions[pack]] = True
+                selected &= in_packs
+        elif packs:
+            for pack in packs:
+                if pack in self.pack_positions:
+                    selected[self.pack_positions[pack]] = True
+        else:
+            selected[:] = True
+
+        if excluded_videos:
+            positions = [self.video_position[v] for v in excluded_videos if v in self.video_position]
+            selected[positions] = False
+
+        chosen = np.flatnonzero(selected)
+        starts, stops = self.starts[chosen], self.stops[chosen]
+        # Merge neighbouring videos into single ranges (e.g. a whole pack becomes one range).
+        if len(starts) > 1:
+            breaks = np.flatnonzero(starts[1:] != stops[:-1]) + 1
+            starts = starts[np.concatenate(([0], breaks))]
+            stops = stops[np.concatenate((breaks - 1, [len(stops) - 1]))]
+        return RowRanges(starts=starts, stops=stops, total_rows=self.total_rows)
@@ -1,26 +1,39 @@
 import sys
 import os
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 import weaviate
 from weaviate.classes.init import Auth
-from sentence_transformers import SentenceTransformer
 import weaviate.classes.config as wvc
 from weaviate.collections import Collection
 from weaviate.classes.data import DataObject
-from tqdm import tqdm
+from weaviate.util import generate_uuid5
 
 # Add the project root to the Python path
 sys.path.append(str(Path(__file__).resolve().parents[2]))
 
 from app.config import Settings
 from app.builder.data_loader import DataLoader
+from app.utils.index_stamp import bump_index_stamp
 from app.utils.logger import setup_logger
-from app.utils.text_processing import normalize_text
+from app.builder.indexing_pipeline import DocumentBatch, IndexingStats, TextIndexingPipeline
+from app.embedding.embedding_manager import KeyWordEmbeddingManager
+from app.embedding.embedding_store import content_key
+from app.utils.text_processing import normalize_text, video_text_document
 from dotenv import load_dotenv
 
 load_dotenv()
 logger = setup_logger(__name__)
 
+# Hash of the embedded text, compared on rebuild to find the videos whose text changed.
+CONTENT_HASH_PROPERTY = wvc.Property(
+    name="content_hash",
+    data_type=wvc.DataType.TEXT,
+    tokenization=wvc.Tokenization.FIELD,
+    index_searchable=False
+)
+DELETE_BATCH_SIZE = 1000
+
 class WeaviateIndexer:
     """Handles indexing data into Weaviate with client-side Hugging Face embeddings."""
 
@@ -30,8 +43,8 @@ class WeaviateIndexer:
         self.class_name = "VideoText"
         self.WEAVIATE_API_KEY = os.getenv("WEAVIATE_API_KEY")
 
-        # Hugging Face model
-        self.embedding_model = SentenceTransformer(self.settings.KEYWORD_EMBEDDING_MODEL)
+        # Hugging Face model, batched and backed by the shared embedding store
+        self.embedding_model = KeyWordEmbeddingManager()
 
         # Connect Weaviate
         self.client = weaviate.connect_to_weaviate_cloud(
@@ -54,6 +67,11 @@ class WeaviateIndexer:
         """Create the collection with proper schema for hybrid search."""
         if self.class_name in self.client.collections.list_all():
             logger.info(f"Collection '{self.class_name}' already exists. Skipping creation.")
+            collection = self.client.collections.get(self.class_name)
+            if CONTENT_HASH_PROPERTY.name not in {prop.name for prop in collection.config.get().properties}:
+                # Collections built before incremental indexing: every object will be re-upserted with its hash.
+                logger.info(f"Adding '{CONTENT_HASH_PROPERTY.name}' to the existing '{self.class_name}' schema.")
+                collection.config.add_property(CONTENT_HASH_PROPERTY)
             return
 
         logger.info(f"Creating collection '{self.class_name}' in Weaviate with proper schema.")
@@ -93,12 +111,59 @@ class WeaviateIndexer:
                     tokenization=wvc.Tokenization.WORD,
                     index_searchable=True
                 ),
+                CONTENT_HASH_PROPERTY,
             ],
         )
         logger.info(f"Successfully created collection '{self.class_name}' with proper schema.")
 
-    def index_videos(self, force_reload: bool = False, recreate_collection: bool = True):
-        """Index video metadata with Hugging Face embeddings."""
+    def _document_hash(self, document: dict) -> str:
+        """Same key the embedding store uses, so a changed hash is exactly a document needing a new vector."""
+        return content_key(self.embedding_model.model_name, normalize_text(document["content"]))
+
+    def _indexed_videos(self, collection: Collection) -> Dict[str, List[Tuple[str, Optional[str]]]]:
+        """video_id -> [(uuid, content_hash)] of every object in the collection, read without vectors."""
+        indexed: Dict[str, List[Tuple[str, Optional[str]]]] = {}
+        for obj in collection.iterator(return_properties=["video_id", CONTENT_HASH_PROPERTY.name]):
+            video_id = obj.properties.get("video_id")
+            if video_id:
+                indexed.setdefault(video_id, []).append((str(obj.uuid), obj.properties.get(CONTENT_HASH_PROPERTY.name)))
+        return indexed
+
+    def _plan_changes(self, indexed: Dict[str, List[Tuple[str, Optional[str]]]]) -> Tuple[Dict[str, dict], List[str]]:
+        """
+        Videos to (re-)upsert and object uuids to delete. A video is unchanged when
+        it has exactly one object and its hash matches; objects of removed videos,
+        duplicates and objects stored under a non-deterministic uuid are deleted.
+        """
+        changed: Dict[str, dict] = {}
+        stale: List[str] = []
+        for video_id, metadata in self.dataloader.video_metadata.items():
+            objects = indexed.pop(video_id, [])
+            expected_hash = self._document_hash(video_text_document(metadata or {}))
+            if len(objects) == 1 and objects[0][1] == expected_hash:
+                continue
+            changed[video_id] = metadata
+            object_uuid = str(generate_uuid5(video_id))
+            stale.extend(uuid for uuid, _ in objects if uuid != object_uuid)
+        for objects in indexed.values():
+            stale.extend(uuid for uuid, _ in objects)
+        return changed, stale
+
+    def _delete_objects(self, collection: Collection, uuids: List[str]) -> None:
+        from weaviate.classes.query import Filter
+        for start in range(0, len(uuids), DELETE_BATCH_SIZE):
+            chunk = uuids[start:start + DELETE_BATCH_SIZE]
+            collection.data.delete_many(where=Filter.by_id().contains_any(chunk))
+        if uuids:
+            logger.info(f"Deleted {len(uuids)} stale objects from '{self.class_name}'.")
+
+    def index_videos(self, force_reload: bool = False, recreate_collection: bool = False) -> Optional[IndexingStats]:
+        """
+        Index video metadata with Hugging Face embeddings. Unless the collection
+        is recreated, only new or changed videos are encoded and upserted (under
+        a uuid derived from the video id) and removed videos are deleted, so a
+        rebuild costs in proportion to the change rather than the corpus.
+        """
         logger.info("Starting video text indexing process for Weaviate.")
         
         if recreate_collection:
@@ -114,46 +179,47 @@ class WeaviateIndexer:
             logger.error("Failed to load video metadata. Aborting indexing.")
             return
 
-        logger.info(f"Preparing to index metadata for {len(self.dataloader.video_metadata)} videos.")
         collection: Collection = self.client.collections.get(self.class_name)
-
-        objects = []
-        for video_id, metadata in tqdm(self.dataloader.video_metadata.items(), desc="Indexing to Weaviate"):
-            title = normalize_text(metadata.get("title", "") or "")
-            description = normalize_text(metadata.get("description", "") or "")
-            keywords_list = [normalize_text(w or "") for w in metadata.get("keywords", [])]
-            keywords_list = list(set(keywords_list))
-            
-            keywords_string = " ".join(keywords_list) if keywords_list else ""
-
-            combined_content = f"{title}. {keywords_string}. {description}".strip()
-
-            vector = self.embedding_model.encode(combined_content).tolist()
-
-            objects.append(
-                DataObject(
-                    properties={
-                        "video_id": video_id,
-                        "title": title,
-                        "description": description,
-                        "keywords": keywords_string,
-                        "content": combined_content,
-                    },
-                    vector=vector
-                )
-            )
-
+        changed, stale = self._plan_changes(self._indexed_videos(collection))
+        logger.info(f"{len(changed)} of {len(self.dataloader.video_metadata)} videos are new or changed; {len(stale)} stale objects to delete.")
+
+        batch_size = self.settings.WEAVIATE_INDEX_BATCH_SIZE
+        pipeline = TextIndexingPipeline(
+            encode=lambda texts: self.embedding_model.encode_documents(texts, batch_size=batch_size),
+            sink=lambda batch: self._insert_batch(collection, batch),
+            batch_size=batch_size,
+            normalize_workers=self.settings.WEAVIATE_INDEX_WORKERS,
+            queue_batches=self.settings.WEAVIATE_INDEX_QUEUE_BATCHES,
+            name="weaviate-index"
+        )
         try:
-            with collection.batch.dynamic() as batch:
-                for obj in objects:
-                    batch.add_object(
-                        properties=obj.properties,
-                        vector=obj.vector
-                    )
-            logger.info("Finished indexing all video text data to Weaviate.")
+            stats = pipeline.run(changed.items())
+            self._delete_objects(collection, stale)
         except Exception as e:
-            logger.error(f"Error during batch insertion: {e}", exc_info=True)
+            logger.error(f"Error during Weaviate indexing: {e}", exc_info=True)
             raise
+        finally:
+            # Objects are upserted in place, so even a partial run changes what searches return.
+            if changed or stale or recreate_collection:
+                bump_index_stamp(f"weaviate-index:{self.class_name}")
+        logger.info("Finished indexing all video text data to Weaviate.")
+        return stats
+
+    def _insert_batch(self, collection: Collection, batch: DocumentBatch) -> int:
+        """Upsert one encoded batch in a single request; returns the number of rejected objects."""
+        objects = [
+            DataObject(
+                properties={"video_id": video_id, **document, CONTENT_HASH_PROPERTY.name: self._document_hash(document)},
+                vector=vector.tolist(),
+                uuid=generate_uuid5(video_id)
+            )
+            for video_id, document, vector in zip(batch.video_ids, batch.documents, batch.vectors)
+        ]
+        result = collection.data.insert_many(objects)
+        if result.has_errors:
+            for index, error in list(result.errors.items())[:5]:
+                logger.warning(f"Weaviate rejected {batch.video_ids[index]}: {error.message}")
+        return len(result.errors)
 
     def close(self):
         """Close the Weaviate client connection."""
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 
 # Define the root path of the backend directory
@@ -12,15 +13,23 @@ class Settings(BaseSettings):
     PORT: int = 8000
     RELOAD: bool = True
     WORKERS: int = 1
+    ZERO_COPY_SEND: bool = True  # serve files with sendfile(2): main.py runs uvicorn with ZeroCopyHttpToolsProtocol on the asyncio loop (uvloop has no sendfile)
+    FAST_START: bool = False  # opt-in: report ready once metadata is mapped while models and vector index load in the background (search answers 503 until then)
 
     # Qdrant settings
     QDRANT_HOST: str = 'qdrant'
     QDRANT_PORT: int = 6333
     QDRANT_KEYFRAME_COLLECTION: str = 'my_collection'
     QDRANT_CLOUD_URL: str = "https://9bf65806-b1f1-498b-b309-079694a5a23b.us-east4-0.gcp.cloud.qdrant.io"
+    QDRANT_USE_LOCAL: bool = False  # use QDRANT_HOST:QDRANT_PORT (the docker-compose service) instead of QDRANT_CLOUD_URL
+    QDRANT_INGEST_BATCH_SIZE: int = 256  # points per upsert when loading clip-features-32
+    QDRANT_INGEST_PARALLEL: int = 4  # concurrent upserts
 
     # Weaviate settings
     WEAVIATE_URL: str = 'https://r0rrbgnxtqig3jtepvha9a.c0.us-east1.gcp.weaviate.cloud'
+    WEAVIATE_INDEX_BATCH_SIZE: int = 256  # documents encoded and inserted together by WeaviateIndexer
+    WEAVIATE_INDEX_WORKERS: int = 4  # threads turning metadata into documents ahead of the encoder
+    WEAVIATE_INDEX_QUEUE_BATCHES: int = 4  # encoded batches buffered ahead of the inserter
     
     # HuggingFace Dataset   
     HF_ADDITIONAL_DATA_URL: str = "https://huggingface.co/datasets/ChungDat/hcm-aic2025-additional-data/resolve/main/"
@@ -29,6 +38,19 @@ class Settings(BaseSettings):
     
     NUM_WORKERS: int = 8
 
+    # Bulk downloads of small dataset files (I/O-bound, run on threads)
+    FETCH_WORKERS: int = 32  # concurrent downloads
+    FETCH_RETRIES: int = 4  # retries per file, with exponential backoff
+    FETCH_BACKOFF_SECONDS: float = 0.5  # first retry delay, doubled on each attempt
+
+    # Dataset sync (media-info/ and map-keyframes/ into the metadata store)
+    DATASET_SYNC: bool = True  # fetch only new/changed files, tracked in CACHE_PATH/dataset_sync
+    DATASET_SOURCE_DIR: Optional[Path] = None  # local directory laid out like the hub repo, used instead of HF_ADDTIONAL_REPO_ID
+
+    # Request-time thread pools
+    INFERENCE_WORKERS: int = 1  # concurrent model forward passes
+    IO_WORKERS: int = 16  # concurrent blocking search/DB/file calls
+
     # Data paths (No changes needed here, just for context)
     DATA_ROOT: Path = BACKEND_ROOT / 'data'
     VIDEOS_PATH: Path = DATA_ROOT / 'video'
@@ -41,12 +63,71 @@ class Settings(BaseSettings):
     # Cache path
     CACHE_PATH: Path = BACKEND_ROOT / 'cache'
 
+    # Vector index settings
+    VECTOR_INDEX_BACKEND: str = 'qdrant'  # 'qdrant' (remote cluster) or 'local' (in-process index)
+    LOCAL_INDEX_PATH: Path = CACHE_PATH / 'clip_index'
+    LOCAL_INDEX_DTYPE: str = 'float32'  # 'float16' halves disk/RAM but is upcast per search
+    LOCAL_INDEX_TYPE: str = 'flat'  # 'flat' (exact) or 'ivf' (approximate, built offline)
+    IVF_NLIST: int = 0  # 0 = ~4*sqrt(N) lists
+    IVF_NPROBE: int = 16  # default lists scanned per query; SearchRequest.nprobe overrides
+
+    # Vietnamese metadata filter
+    TEXT_RETRIEVER: str = 'weaviate'  # 'weaviate' (cloud hybrid query) or 'local' (in-process BM25 + MiniLM)
+    LOCAL_TEXT_INDEX_PATH: Path = CACHE_PATH / 'text_index'
+    TEXT_HYBRID_ALPHA: float = 0.5  # 1 = vector only, 0 = BM25 only
+    BM25_K1: float = 1.2
+    BM25_B: float = 0.75
+    FUSION_STRATEGY: str = 'weighted'  # how text scores re-rank CLIP results: 'weighted', 'rrf' or 'filter'
+    FUSION_TEXT_WEIGHT: float = 0.5  # 'weighted': share of the text score, 0 = CLIP only, 1 = text only
+    FUSION_RRF_K: int = 60  # 'rrf': rank offset damping the head of each ranking
+    FUSION_FILTER_THRESHOLD: float = 0.5  # 'filter': min text score (min-max scaled over the candidates) to keep a result
+
     # Model settings
     QUERY_EMBEDDING_MODEL: str = 'clip-ViT-B-32'
     KEYWORD_EMBEDDING_MODEL: str = 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2'
 
+    # Query embedding cache
+    EMBEDDING_CACHE_SIZE: int = 10000  # entries kept in memory per model
+    EMBEDDING_CACHE_TTL_SECONDS: float = 86400.0  # 0 = never expire
+    EMBEDDING_CACHE_PERSIST: bool = True  # spill embeddings to CACHE_PATH/embeddings.sqlite3
+    EMBEDDING_STORE_MAX_ROWS: int = 100000  # query embeddings kept on disk, least recently used dropped first; 0 = unbounded
+    EMBEDDING_DOCUMENT_STORE_MAX_ROWS: int = 500000  # corpus document embeddings kept on disk, in their own table; 0 = unbounded
+
+    # Query embedding micro-batching across concurrent requests
+    EMBEDDING_BATCH_WINDOW_MS: float = 5.0  # how long to wait for more texts; 0 disables batching
+    EMBEDDING_MAX_BATCH_SIZE: int = 64  # texts per forward pass
+
     # Search settings
     DEFAULT_TOP_K: int = 100
+    TEMPORAL_MAX_GAP_SECONDS: float = 60.0  # max time between consecutive temporal matches (0 = unbounded)
+    TEMPORAL_MAX_CANDIDATE_VIDEOS: int = 200  # local index: videos whose keyframes are all scored for a temporal query, best hits first
+    DEFAULT_VIDEO_FPS: float = 25.0  # used when a video's keyframe mapping has no fps
+
+    # Search result cache
+    SEARCH_CACHE_SIZE: int = 512  # cached /api/search responses
+    SEARCH_CACHE_TTL_SECONDS: float = 600.0  # 0 = never expire
+    SEARCH_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # ceiling on serialized size of cached results
+    INDEX_STAMP_PATH: Path = CACHE_PATH / 'index_stamp.json'  # bumped by the Qdrant and Weaviate builders; cached results from before are dropped
+    ADMIN_TOKEN: str = ''  # X-Admin-Token required by POST /api/cache/invalidate; empty disables the endpoint
+
+    # Paginated searches (page_size in /api/search, then /api/search/page)
+    SEARCH_SESSION_COUNT: int = 256  # ranked lists kept for paging
+    SEARCH_SESSION_TTL_SECONDS: float = 1800.0  # cursors expire this long after the search ran
+    SEARCH_SESSION_MAX_BYTES: int = 256 * 1024 * 1024  # ceiling on serialized size of stored lists
+
+    # Keyframe thumbnails (/api/thumbnail), resized from KEYFRAMES_PATH
+    THUMBNAIL_CACHE_PATH: Path = CACHE_PATH / 'thumbnails'
+    THUMBNAIL_CACHE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024  # least recently served files are deleted past this
+    THUMBNAIL_WIDTHS: List[int] = [160, 320, 640]  # requested widths snap up to one of these
+    THUMBNAIL_DEFAULT_WIDTH: int = 320
+    THUMBNAIL_QUALITY: int = 80  # JPEG quality
+
+    # Per-video keyframe sprite sheets (/api/sprites), built by app/builder/build_sprite_sheets.py
+    SPRITE_SHEETS_PATH: Path = CACHE_PATH / 'sprites'
+    SPRITE_TILE_WIDTH: int = 160
+    SPRITE_COLUMNS: int = 10
+    SPRITE_ROWS: int = 10  # tiles per sheet = columns * rows; longer videos get several sheets
+    SPRITE_QUALITY: int = 75  # JPEG quality
 
 # Create a single instance of the settings
 settings = Settings()
\ No newline at end of file
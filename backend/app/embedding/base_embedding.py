@@ -1,7 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import List, Union
+from typing import List, Union, Dict, Any
 import numpy as np
 from ..config import settings
+from ..utils.executors import inference_executor
+from ..utils.lru_cache import LRUCache
+from ..utils.text_processing import normalize_text
+from .batcher import EmbeddingBatcher
+from .embedding_store import EmbeddingStore, content_key
 
 class EmbeddingModel(ABC):
     """Abstract base class for embedding models"""
@@ -12,16 +17,133 @@ class EmbeddingModel(ABC):
         self.load_model()
         # self.vector_size = self.model.get_sentence_embedding_dimension()
 
+        # Query embeddings are cached by (model, normalized text): in memory with
+        # LRU/TTL eviction, and optionally spilled to disk to survive restarts.
+        self.cache = LRUCache(
+            max_items=self.settings.EMBEDDING_CACHE_SIZE,
+            ttl_seconds=self.settings.EMBEDDING_CACHE_TTL_SECONDS
+        )
+        # Corpus document embeddings get a table of their own, so a corpus build
+        # neither pushes queries out of the disk tier nor expires with them.
+        self.store = None
+        self.document_store = None
+        if self.settings.EMBEDDING_CACHE_PERSIST:
+            store_path = self.settings.CACHE_PATH / 'embeddings.sqlite3'
+            self.store = EmbeddingStore(
+                store_path,
+                table='embeddings',
+                max_rows=self.settings.EMBEDDING_STORE_MAX_ROWS,
+                ttl_seconds=self.settings.EMBEDDING_CACHE_TTL_SECONDS
+            )
+            self.document_store = EmbeddingStore(store_path, table='document_embeddings', max_rows=self.settings.EMBEDDING_DOCUMENT_STORE_MAX_ROWS)
+        self.disk_hits = 0
+
+        # Cache misses from concurrent requests are coalesced into one forward pass.
+        self.batcher = None
+        if self.settings.EMBEDDING_BATCH_WINDOW_MS > 0:
+            self.batcher = EmbeddingBatcher(
+                self._forward,
+                window_ms=self.settings.EMBEDDING_BATCH_WINDOW_MS,
+                max_batch_size=self.settings.EMBEDDING_MAX_BATCH_SIZE,
+                name=type(self).__name__
+            )
+
+    @property
+    @abstractmethod
+    def model_name(self) -> str:
+        """Name of the underlying model, part of every cache key"""
+        return
+
     @abstractmethod
     def load_model(self) -> bool:
         """Load the embedding model"""
         return
 
+    def _forward(self, texts: List[str]) -> np.ndarray:
+        # Forward passes run on the dedicated inference pool, which bounds how
+        # many hit the model at once.
+        return inference_executor().submit(self.model.encode, texts).result()
+
+    def _cache_key(self, text: str) -> str:
+        return content_key(self.model_name, normalize_text(text))
+
     def encode(self, texts: Union[str, List[str]]) -> np.ndarray:
-        """Encode text to embeddings"""
+        """Encode text to embeddings, serving repeated texts from the cache"""
         if not self.model:
             raise RuntimeError('Model not loaded')
         if isinstance(texts, str):
             texts = [texts]
-        embeddings = self.model.encode(texts)
-        return embeddings
\ No newline at end of file
+        if not texts:
+            return self.model.encode(texts)
+
+        embeddings: List[np.ndarray] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            key = self._cache_key(text)
+            cached = self.cache.get(key)
+            if cached is not None:
+                embeddings[i] = cached
+            else:
+                missing.setdefault(key, []).append(i)
+
+        if missing and self.store is not None:
+            for key, embedding in self.store.get_many(missing).items():
+                self.disk_hits += 1
+                self.cache.set(key, embedding)
+                for i in missing.pop(key):
+                    embeddings[i] = embedding
+
+        if missing:
+            keys = list(missing)
+            batch = [texts[missing[key][0]] for key in keys]
+            batcher = self.batcher
+            encoded = batcher.encode(batch) if batcher is not None else self._forward(batch)
+            encoded = np.asarray(encoded, dtype=np.float32)
+            for key, embedding in zip(keys, encoded):
+                self.cache.set(key, embedding)
+                for i in missing[key]:
+                    embeddings[i] = embedding
+            if self.store is not None:
+                self.store.put_many(list(zip(keys, encoded)))
+
+        return np.stack(embeddings)
+
+    def encode_documents(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """
+        Encode a corpus (e.g. every video's metadata text) in batches. Embeddings
+        are reused from and saved to the document store, and bypass the query
+        caches so a corpus build does not evict cached queries.
+        """
+        keys = [self._cache_key(text) for text in texts]
+        found = self.document_store.get_many(set(keys)) if self.document_store is not None else {}
+        missing = list(dict.fromkeys(key for key in keys if key not in found))
+        if missing:
+            first_text = dict(zip(keys, texts))
+            for start in range(0, len(missing), batch_size):
+                chunk = missing[start:start + batch_size]
+                encoded = np.asarray(self._forward([first_text[key] for key in chunk]), dtype=np.float32)
+                found.update(zip(chunk, encoded))
+                if self.document_store is not None:
+                    self.document_store.put_many(list(zip(chunk, encoded)))
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
+
+    def close(self) -> None:
+        """Stop the batcher's worker thread; later cache misses are encoded inline"""
+        if self.batcher is not None:
+            self.batcher.close()
+            self.batcher = None
+
+    def batching_stats(self) -> Dict[str, Any]:
+        stats = self.batcher.stats() if self.batcher is not None else {"enabled": False}
+        stats["model"] = self.model_name
+        return stats
+
+    def cache_stats(self) -> Dict[str, Any]:
+        stats = self.cache.stats()
+        stats["model"] = self.model_name
+        stats["disk_hits"] = self.disk_hits
+        stats["disk_entries"] = len(self.store) if self.store is not None else 0
+        stats["disk_document_entries"] = len(self.document_store) if self.document_store is not None else 0
+        return stats
@@ -0,0 +1,131 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces encode requests from concurrent callers into batched forward passes.
+
+    Callers submit a list of texts and get a Future. A single worker thread
+    waits for the first request, keeps collecting for up to `window_ms` (or
+    until `max_batch_size` texts are queued), runs one `encode_fn` call over all
+    of them, and fans the rows back out to each caller's Future.
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray], window_ms: float = 5.0, max_batch_size: int = 64, name: str = 'embedding'):
+        self.encode_fn = encode_fn
+        self.window_seconds = window_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self.name = name
+        self._queue: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._closed = False
+
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self.texts = 0
+        self.max_observed_batch = 0
+        self.max_observed_queue_depth = 0
+
+    def submit(self, texts: List[str]) -> Future:
+        if self._closed:
+            raise RuntimeError('EmbeddingBatcher is closed')
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((list(texts), future))
+        with self._stats_lock:
+            self.max_observed_queue_depth = max(self.max_observed_queue_depth, self._queue.qsize())
+        return future
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Blocking convenience wrapper around submit()."""
+        return self.submit(texts).result()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name=f'{self.name}-batcher', daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> List[Tuple[List[str], Future]]:
+        first = self._queue.get()
+        if first is None:
+            return []
+        pending = [first]
+        count = len(first[0])
+        deadline = time.monotonic() + self.window_seconds
+        while count < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._closed = True
+                break
+            pending.append(item)
+            count += len(item[0])
+        return pending
+
+    def _run(self) -> None:
+        while not self._closed:
+            pending = self._collect()
+            if not pending:
+                break
+            pending = [(texts, future) for texts, future in pending if future.set_running_or_notify_cancel()]
+            if not pending:
+                continue
+            all_texts = [text for texts, _ in pending for text in texts]
+            try:
+                embeddings = np.asarray(self.encode_fn(all_texts))
+            except Exception as e:
+                logger.error(f'Batched encode of {len(all_texts)} texts failed: {e}', exc_info=True)
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+
+            offset = 0
+            for texts, future in pending:
+                future.set_result(embeddings[offset:offset + len(texts)])
+                offset += len(texts)
+
+            with self._stats_lock:
+                self.batches += 1
+                self.requests += len(pending)
+                self.texts += len(all_texts)
+                self.max_observed_batch = max(self.max_observed_batch, len(all_texts))
+
+    def close(self) -> None:
+        if not self._closed and self._worker is not None:
+            self._queue.put(None)
+        self._closed = True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "window_ms": self.window_seconds * 1000.0,
+                "max_batch_size": self.max_batch_size,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self.max_observed_queue_depth,
+                "batches": self.batches,
+                "requests": self.requests,
+                "texts": self.texts,
+                "mean_batch_size": self.texts / self.batches if self.batches else 0.0,
+                "mean_requests_per_batch": self.requests / self.batches if self.batches else 0.0,
+                "max_batch_size_observed": self.max_observed_batch,
+            }
@@ -1,4 +1,3 @@
-from sentence_transformers import SentenceTransformer
 from typing import List, Union
 from ..utils.logger import setup_logger
 from .base_embedding import EmbeddingModel
@@ -6,9 +5,14 @@ logger = setup_logger(__name__)
 
 class KeyWordEmbeddingManager(EmbeddingModel):
 
+    @property
+    def model_name(self) -> str:
+        return self.settings.KEYWORD_EMBEDDING_MODEL
+
     def load_model(self) -> bool:
         """Load sentence transformer model"""
         try:
+            from sentence_transformers import SentenceTransformer
             self.model = SentenceTransformer(self.settings.KEYWORD_EMBEDDING_MODEL)
             logger.info(f'Loaded embedding model: {self.settings.KEYWORD_EMBEDDING_MODEL}')
             return True
@@ -22,9 +26,14 @@ class KeyWordEmbeddingManager(EmbeddingModel):
 
 class QueryEmbeddingManager(EmbeddingModel):
 
+    @property
+    def model_name(self) -> str:
+        return self.settings.QUERY_EMBEDDING_MODEL
+
     def load_model(self) -> bool:
         """Load sentence transformer model"""
         try:
+            from sentence_transformers import SentenceTransformer
             self.model = SentenceTransformer(self.settings.QUERY_EMBEDDING_MODEL)
             logger.info(f'Loaded embedding model: {self.settings.QUERY_EMBEDDING_MODEL}')
             return True
@@ -0,0 +1,103 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_TABLE_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def content_key(model_name: str, text: str) -> str:
+    """Stable key for an embedding: hash of the model name and the (normalised) text."""
+    return hashlib.sha1(f"{model_name}\x00{text}".encode('utf-8')).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    Persistent key -> float32 vector store backed by a table of a SQLite file.
+
+    Used as the on-disk tier of the query embedding cache, so embeddings survive
+    restarts, and, in a table of its own, for corpus document embeddings.
+    Every row records when it was last read or written; rows older than
+    `ttl_seconds` are dropped, and past `max_rows` the least recently used
+    rows are deleted, so the file stops growing. Safe to share between threads.
+    """
+
+    def __init__(self, path: Path, table: str = 'embeddings', max_rows: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        if not _TABLE_NAME.match(table):
+            raise ValueError(f"Invalid table name '{table}'.")
+        self.path = Path(path)
+        self.table = table
+        self.max_rows = max_rows or None
+        self.ttl_seconds = ttl_seconds or None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(f'CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, dim INTEGER NOT NULL, vector BLOB NOT NULL, last_used REAL NOT NULL DEFAULT 0)')
+        columns = {row[1] for row in self._conn.execute(f'PRAGMA table_info({table})')}
+        if 'last_used' not in columns:
+            # Files written before pruning existed; their rows count as least recently used.
+            self._conn.execute(f'ALTER TABLE {table} ADD COLUMN last_used REAL NOT NULL DEFAULT 0')
+        self._conn.execute(f'CREATE INDEX IF NOT EXISTS {table}_last_used ON {table} (last_used)')
+        with self._lock:
+            self._prune()
+            self._conn.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        keys = list(keys)
+        found = {}
+        now = time.time()
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit.
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(f'SELECT key, vector, last_used FROM {self.table} WHERE key IN ({placeholders})', chunk).fetchall()
+                for key, blob, last_used in rows:
+                    if self.ttl_seconds is None or now - last_used <= self.ttl_seconds:
+                        found[key] = np.frombuffer(blob, dtype=np.float32)
+            if found:
+                self._conn.executemany(f'UPDATE {self.table} SET last_used = ? WHERE key = ?', [(now, key) for key in found])
+                self._conn.commit()
+        return found
+
+    def put_many(self, items: List[Tuple[str, np.ndarray]]) -> None:
+        if not items:
+            return
+        now = time.time()
+        rows = [(key, int(vector.shape[-1]), np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in items]
+        with self._lock:
+            self._conn.executemany(f'INSERT OR REPLACE INTO {self.table} (key, dim, vector, last_used) VALUES (?, ?, ?, ?)', rows)
+            self._prune()
+            self._conn.commit()
+
+    def _prune(self) -> None:
+        """Drop expired rows, then the least recently used ones over `max_rows`. Caller holds the lock and commits."""
+        deleted = 0
+        if self.ttl_seconds is not None:
+            deleted += self._conn.execute(f'DELETE FROM {self.table} WHERE last_used < ?', (time.time() - self.ttl_seconds,)).rowcount
+        if self.max_rows is not None:
+            excess = self._conn.execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0] - self.max_rows
+            if excess > 0:
+                deleted += self._conn.execute(
+                    f'DELETE FROM {self.table} WHERE key IN (SELECT key FROM {self.table} ORDER BY last_used LIMIT ?)', (excess,)
+                ).rowcount
+        if deleted:
+            logger.debug(f'Pruned {deleted} rows from {self.path.name}:{self.table}')
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import List, Set, Tuple, Dict, Any
+from typing import List, Set, Tuple, Dict, Any, Iterable
+import numpy as np
 from ..config import settings
+from .score_fusion import top_k_order, video_text_scores
 
 @dataclass
 class RetrievalResult:
@@ -17,4 +19,29 @@ class BaseRetriever(ABC):
     @abstractmethod
     def retrieve(self, query: str, candidate_keyframes: Set[Tuple[str, str]], top_k: int=settings.DEFAULT_TOP_K) -> List[RetrievalResult]:
         """Retrieve most relevant keyframes"""
-        return
\ No newline at end of file
+        return
+
+class TextRetriever(BaseRetriever):
+    """Retrievers that score whole videos by their metadata text"""
+
+    @abstractmethod
+    def score_videos(self, query: str, video_ids: Iterable[str]) -> Dict[str, float]:
+        """Relevance of each candidate video to the query, higher is better; videos that do not match are left out"""
+        return
+
+    @staticmethod
+    def rank_by_video_score(candidate_keyframes: Set[Tuple[str, str, int]], video_scores: Dict[str, float], top_k: int, retriever: str) -> List[RetrievalResult]:
+        """Top-k candidate keyframes by the score of their video; keyframes of unscored videos are dropped"""
+        candidates = list(candidate_keyframes)
+        scores = video_text_scores([video_id for video_id, _, _ in candidates], video_scores)
+        scores[np.isnan(scores)] = -np.inf
+        return [
+            RetrievalResult(
+                video_id=candidates[i][0],
+                keyframe_index=candidates[i][2],
+                keyframe_id=candidates[i][1],
+                similarity_score=float(scores[i]),
+                additional_info={"retriever": retriever}
+            )
+            for i in top_k_order(scores, top_k).tolist()
+        ]
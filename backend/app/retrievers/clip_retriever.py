@@ -1,27 +1,61 @@
 from typing import List, Set, Tuple, Optional, Dict
 from collections import defaultdict
-from functools import reduce
 
 import numpy as np
 
 from .base_retriever import BaseRetriever, RetrievalResult
-from ..builder.database_manager import QdrantManager
-from ..embedding.embedding_manager import QueryEmbeddingManager
+from ..builder.search_result import SearchResult
+from ..builder.local_index import LocalVectorIndex, load_keyframe_mappings_from_dir
+from ..config import settings
 from ..utils.logger import setup_logger
+from .temporal_alignment import align_sequence
 
 logger = setup_logger(__name__)
 
 class CLIPRetriever(BaseRetriever):
     """CLIP-based semantic image retrieval."""
 
-    def __init__(self):
-        self.qdrant_manager = QdrantManager()
-        self.embedding_manager = QueryEmbeddingManager()
+    def __init__(self, data_loader=None, vector_store=None, embedding_manager=None):
+        self.data_loader = data_loader
+        self.vector_store = vector_store if vector_store is not None else self.load_vector_store(data_loader)
+        if embedding_manager is None:
+            from ..embedding.embedding_manager import QueryEmbeddingManager
+            embedding_manager = QueryEmbeddingManager()
+        self.embedding_manager = embedding_manager
 
-    def retrieve(self, queries: List[str], top_k: int = 100, top_k_per_query: int = 10, packs: Optional[List[str]] = None, videos: Optional[List[str]] = None, excluded_videos: Optional[List[str]] = None) -> List:
+    @property
+    def index_version(self) -> str:
+        """Identifies the loaded vector index build; empty for the remote Qdrant collection."""
+        return self.vector_store.version if isinstance(self.vector_store, LocalVectorIndex) else ''
+
+    @staticmethod
+    def load_vector_store(data_loader=None):
+        """Select the keyframe vector store configured by VECTOR_INDEX_BACKEND."""
+        backend = settings.VECTOR_INDEX_BACKEND
+        if backend == 'qdrant':
+            # qdrant-client is slow to import; only pay for it when it is the configured backend.
+            from ..builder.database_manager import QdrantManager
+            return QdrantManager()
+        if backend == 'local':
+            keyframe_mappings = data_loader.keyframe_mappings if data_loader else None
+            if not keyframe_mappings:
+                keyframe_mappings = load_keyframe_mappings_from_dir(settings.MAP_KEYFRAMES_PATH)
+            return LocalVectorIndex.load_or_build(
+                index_dir=settings.LOCAL_INDEX_PATH,
+                features_dir=settings.CLIP_FEATURES_PATH,
+                keyframe_mappings=keyframe_mappings,
+                dtype=settings.LOCAL_INDEX_DTYPE,
+                index_type=settings.LOCAL_INDEX_TYPE,
+                default_nprobe=settings.IVF_NPROBE
+            )
+        raise ValueError(f"Unknown VECTOR_INDEX_BACKEND '{backend}'. Expected 'qdrant' or 'local'.")
+
+    def retrieve(self, queries: List[str], top_k: int = 100, top_k_per_query: int = 10, packs: Optional[List[str]] = None, videos: Optional[List[str]] = None, excluded_videos: Optional[List[str]] = None, nprobe: Optional[int] = None, max_gap_seconds: Optional[float] = None) -> List:
         """
         Retrieve using CLIP embeddings. Handles both single and temporal queries.
         If queries are empty but filters are provided, it scrolls through the filtered results.
+        `nprobe` trades recall for speed on approximate indexes (None = index default).
+        `max_gap_seconds` bounds the time between consecutive temporal matches.
         """
         if not queries or (len(queries) == 1 and not queries[0]):
             if packs or videos:
@@ -32,7 +66,7 @@ class CLIPRetriever(BaseRetriever):
                 return []
 
         if len(queries) == 1:
-            return self._retrieve_single(queries[0], top_k, packs, videos, excluded_videos)
+            return self._retrieve_single(queries[0], top_k, packs, videos, excluded_videos, nprobe)
         else:
             valid_queries = [q for q in queries if q]
             if not valid_queries:
@@ -43,14 +77,14 @@ class CLIPRetriever(BaseRetriever):
                     logger.warning('Temporal retrieval called with no valid queries and no filters.')
                     return []
             elif len(valid_queries) == 1:
-                 return self._retrieve_single(valid_queries[0], top_k, packs, videos, excluded_videos)
+                 return self._retrieve_single(valid_queries[0], top_k, packs, videos, excluded_videos, nprobe)
 
-            return self._retrieve_temporal(valid_queries, top_k, top_k_per_query, packs, videos, excluded_videos)
+            return self._retrieve_temporal(valid_queries, top_k, top_k_per_query, packs, videos, excluded_videos, nprobe, max_gap_seconds)
     
     def _scroll_filtered(self, packs: Optional[List[str]], videos: Optional[List[str]], excluded_videos: Optional[List[str]], top_k: int) -> List[Dict]:
         """Scrolls through all keyframes for the given filters."""
         try:
-            scroll_results = self.qdrant_manager.scroll_all(
+            scroll_results = self.vector_store.scroll_all(
                 packs=packs,
                 videos=videos,
                 excluded_videos=excluded_videos,
@@ -69,25 +103,27 @@ class CLIPRetriever(BaseRetriever):
             logger.error(f'Error in scrolling with filters: {e}', exc_info=True)
             return []
 
-    def _retrieve_single(self, query: str, top_k: int, packs: Optional[List[str]] = None, videos: Optional[List[str]] = None, excluded_videos: Optional[List[str]] = None) -> List[Dict]:
+    def _retrieve_single(self, query: str, top_k: int, packs: Optional[List[str]] = None, videos: Optional[List[str]] = None, excluded_videos: Optional[List[str]] = None, nprobe: Optional[int] = None) -> List[Dict]:
         """Handles a single query."""
         if not query:
             logger.warning('CLIP retrieval called with an empty query.')
             return []
         try:
             query_embedding = self.embedding_manager.encode(query)[0]
-            search_results = self.qdrant_manager.search_similar(
+            search_results = self.vector_store.search_similar(
                 query_vector=query_embedding,
                 top_k=top_k,
                 packs=packs,
                 videos=videos,
-                excluded_videos=excluded_videos
+                excluded_videos=excluded_videos,
+                nprobe=nprobe
             )
             results = [
                 {
                     "video": f"{r.pack}_{r.video}",
                     "frame": r.frame,
-                    "frame_index": r.frame_index
+                    "frame_index": r.frame_index,
+                    "similarity_score": r.similarity_score
                 } for r in search_results
             ]
             logger.info(f"Retrieved {len(results)} results for query: '{query}' with filters: packs={packs}, videos={videos}, excluded_videos={excluded_videos}")
@@ -96,66 +132,125 @@ class CLIPRetriever(BaseRetriever):
             logger.error(f'Error in single CLIP retrieval: {e}', exc_info=True)
             return []
 
-    def _retrieve_temporal(self, queries: List[str], top_k: int, top_k_per_query: int, packs: Optional[List[str]] = None, videos: Optional[List[str]] = None, excluded_videos: Optional[List[str]] = None) -> List[Dict]:
-        """Handles a temporal (multi-query) search."""
+    def _retrieve_temporal(self, queries: List[str], top_k: int, top_k_per_query: int, packs: Optional[List[str]] = None, videos: Optional[List[str]] = None, excluded_videos: Optional[List[str]] = None, nprobe: Optional[int] = None, max_gap_seconds: Optional[float] = None) -> List[Dict]:
+        """
+        Handles a temporal (multi-query) search.
+
+        Candidate videos come from one batched vector search over all sub-queries.
+        Each candidate is aligned with a Viterbi pass that picks one keyframe per
+        sub-query in increasing frame order, consecutive matches at most
+        `max_gap_seconds` apart (None uses TEMPORAL_MAX_GAP_SECONDS; 0 allows no
+        gap, so no sequence aligns), and all videos are returned as a single list
+        ranked by mean similarity along their best sequence. Every query_results
+        entry therefore holds exactly one keyframe, so `top_k_per_query` no longer
+        affects temporal results.
+        """
         logger.info(f"Performing temporal retrieval for queries: {queries} with filters: packs={packs}, videos={videos}, excluded_videos={excluded_videos}")
+        if max_gap_seconds is None:
+            # The setting uses 0 for unbounded; an explicit 0 from the caller allows no gap at all.
+            max_gap_seconds = settings.TEMPORAL_MAX_GAP_SECONDS or None
+        elif max_gap_seconds < 0:
+            raise ValueError(f"max_gap_seconds must be >= 0, got {max_gap_seconds}.")
         try:
-            all_query_results = []
-            for query in queries:
-                query_embedding = self.embedding_manager.encode(query)[0]
-                search_results = self.qdrant_manager.search_similar(
-                    query_vector=query_embedding,
-                    top_k=top_k * 5,  # Fetch more to increase chance of finding intersections
-                    packs=packs,
-                    videos=videos,
-                    excluded_videos=excluded_videos
-                )
-                all_query_results.append({"query": query, "results": search_results})
-
-            if not all_query_results:
-                return []
-
-            video_id_sets = [
-                {f"{result.pack}_{result.video}" for result in query_res["results"]}
-                for query_res in all_query_results
-            ]
-            if not video_id_sets:
-                return []
-            common_video_ids = reduce(lambda a, b: a.intersection(b), video_id_sets)
+            # One batched forward pass for every sub-query, then one batched vector search.
+            query_embeddings = self.embedding_manager.encode(queries)
+            batch_results = self.vector_store.search_batch(
+                query_vectors=query_embeddings,
+                top_k=top_k * 5,  # Fetch more to increase chance of finding aligned sequences
+                packs=packs,
+                videos=videos,
+                excluded_videos=excluded_videos,
+                nprobe=nprobe
+            )
 
-            if not common_video_ids:
-                logger.info("No common videos found for the temporal query.")
+            candidates = self._temporal_candidates(query_embeddings, batch_results)
+            if not candidates:
+                logger.info("No candidate videos found for the temporal query.")
                 return []
 
-            grouped_by_video = defaultdict(lambda: defaultdict(list))
-            for query_res in all_query_results:
-                query_text = query_res["query"]
-                for result in query_res["results"]:
-                    full_video_id = f"{result.pack}_{result.video}"
-                    if full_video_id in common_video_ids:
-                        if len(grouped_by_video[full_video_id][query_text]) < top_k_per_query:
-                            grouped_by_video[full_video_id][query_text].append({
-                                "video": full_video_id,
-                                "frame": result.frame,
-                                "frame_index": result.frame_index,
-                                "score": result.similarity_score
-                            })
-
-            final_results = []
-            for video_id, queries_map in grouped_by_video.items():
-                if len(queries_map) == len(queries):
-                    video_result = {"video": video_id, "query_results": []}
-                    for query_text, keyframes in queries_map.items():
-                        keyframes.sort(key=lambda x: x["score"], reverse=True)
-                        video_result["query_results"].append({
+            sequences = []
+            unmapped_videos = 0
+            for video_id, (frames, frame_indices, scores) in candidates.items():
+                if len(frame_indices) and (frame_indices < 0).all():
+                    # No keyframe mapping, so no time order to align on: take each sub-query's best keyframe.
+                    unmapped_videos += 1
+                    columns = np.argmax(scores, axis=1)
+                    score = float(scores[np.arange(len(queries)), columns].mean())
+                    if not np.isfinite(score):
+                        continue
+                else:
+                    order = np.argsort(frame_indices, kind='stable')
+                    max_gap_frames = max_gap_seconds * self._video_fps(video_id) if max_gap_seconds is not None else None
+                    aligned = align_sequence(frame_indices[order], scores[:, order], max_gap_frames)
+                    if aligned is None:
+                        continue
+                    columns = order[aligned.positions]
+                    score = aligned.score
+                sequences.append({
+                    "video": video_id,
+                    "score": score,
+                    "query_results": [
+                        {
                             "query": query_text,
-                            "keyframes": keyframes
-                        })
-                    final_results.append(video_result)
+                            "keyframes": [{
+                                "video": video_id,
+                                "frame": frames[column],
+                                "frame_index": int(frame_indices[column]),
+                                "score": float(scores[step, column])
+                            }]
+                        } for step, (query_text, column) in enumerate(zip(queries, columns))
+                    ]
+                })
 
-            logger.info(f"Found {len(final_results)} videos matching temporal query.")
-            return final_results
+            if unmapped_videos:
+                logger.warning(f"{unmapped_videos} candidate videos have no keyframe mapping (frame_index -1); ranked them by each sub-query's best keyframe without temporal ordering.")
+            sequences.sort(key=lambda sequence: sequence["score"], reverse=True)
+            logger.info(f"Aligned {len(sequences)} of {len(candidates)} candidate videos for the temporal query.")
+            return sequences[:top_k]
 
         except Exception as e:
             logger.error(f'Error in temporal CLIP retrieval: {e}', exc_info=True)
             return []
+
+    def _temporal_candidates(self, query_embeddings: np.ndarray, batch_results: List[List[SearchResult]]) -> Dict[str, Tuple[List[str], np.ndarray, np.ndarray]]:
+        """
+        Per-video similarity matrices {video_id: (frames, frame_indices, scores[n_queries, n_keyframes])}.
+
+        The local index scores every keyframe of the videos hit by the
+        sub-queries, at most TEMPORAL_MAX_CANDIDATE_VIDEOS of them ranked by the
+        sum of their best hit per sub-query, so a broad query does not end up
+        scoring most of the corpus. Qdrant only returns the hits themselves, so
+        a video needs a hit for every sub-query and keyframes a sub-query did
+        not hit score -inf.
+        """
+        if isinstance(self.vector_store, LocalVectorIndex):
+            best_hits = defaultdict(lambda: np.zeros(len(batch_results)))
+            for step, search_results in enumerate(batch_results):
+                for result in search_results:
+                    video_hits = best_hits[f"{result.pack}_{result.video}"]
+                    video_hits[step] = max(video_hits[step], result.similarity_score)
+            hit_video_ids = sorted(best_hits, key=lambda video_id: best_hits[video_id].sum(), reverse=True)
+            return self.vector_store.score_videos(query_embeddings, hit_video_ids[:settings.TEMPORAL_MAX_CANDIDATE_VIDEOS])
+
+        hits_by_video = defaultdict(lambda: defaultdict(dict))
+        for step, search_results in enumerate(batch_results):
+            for result in search_results:
+                hits_by_video[f"{result.pack}_{result.video}"][(result.frame, result.frame_index)][step] = result.similarity_score
+
+        candidates = {}
+        for video_id, keyframe_hits in hits_by_video.items():
+            if len({step for hits in keyframe_hits.values() for step in hits}) < len(batch_results):
+                continue
+            keyframes = list(keyframe_hits)
+            scores = np.full((len(batch_results), len(keyframes)), -np.inf)
+            for column, keyframe in enumerate(keyframes):
+                for step, score in keyframe_hits[keyframe].items():
+                    scores[step, column] = score
+            frames = [frame for frame, _ in keyframes]
+            frame_indices = np.array([frame_index for _, frame_index in keyframes])
+            candidates[video_id] = (frames, frame_indices, scores)
+        return candidates
+
+    def _video_fps(self, video_id: str) -> float:
+        fps = self.data_loader.get_video_fps(video_id) if self.data_loader else None
+        return fps or settings.DEFAULT_VIDEO_FPS
@@ -0,0 +1,48 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ..config import Settings
+from ..builder.text_index import LocalTextIndex
+from ..embedding.embedding_manager import KeyWordEmbeddingManager
+from ..utils.logger import setup_logger
+from .base_retriever import RetrievalResult, TextRetriever
+
+logger = setup_logger(__name__)
+
+
+class LocalTextRetriever(TextRetriever):
+    """
+    Vietnamese metadata filter served from an in-process LocalTextIndex, with
+    the same inputs and results as WeaviateRetriever but no network call.
+    """
+
+    def __init__(self, settings: Settings, video_metadata, model: Optional[KeyWordEmbeddingManager] = None):
+        self.settings = settings
+        self.model = model if model is not None else KeyWordEmbeddingManager()
+        self.index = LocalTextIndex.load_or_build(
+            settings.LOCAL_TEXT_INDEX_PATH,
+            video_metadata,
+            encode_documents=self.model.encode_documents,
+            model_name=self.model.model_name,
+            k1=settings.BM25_K1,
+            b=settings.BM25_B
+        )
+
+    def score_videos(self, query: str, video_ids: Iterable[str]) -> Dict[str, float]:
+        """Hybrid score of each candidate video's metadata text."""
+        query_vector = self.model.encode(query)[0]
+        return dict(self.index.search(query, query_vector, video_ids=video_ids, alpha=self.settings.TEXT_HYBRID_ALPHA))
+
+    def retrieve(self, query: str, candidate_keyframes: Set[Tuple[str, str, int]], top_k: int = 100) -> List[RetrievalResult]:
+        """Ranks candidate keyframes by the hybrid score of their video's metadata text."""
+        if not query:
+            return []
+        if not candidate_keyframes:
+            logger.warning("LocalTextRetriever received no candidate keyframes.")
+            return []
+
+        try:
+            video_scores = self.score_videos(query, {video_id for video_id, _, _ in candidate_keyframes})
+        except Exception as e:
+            logger.error(f"An error occurred during local text search: {e}", exc_info=True)
+            return []
+        return self.rank_by_video_score(candidate_keyframes, video_scores, top_k, "local_text")
@@ -0,0 +1,101 @@
+from typing import Dict, List, Mapping, Sequence
+
+import numpy as np
+
+from ..utils.vectors import min_max
+
+# How the Vietnamese text score of a result's video is combined with its CLIP score:
+#   weighted - min-max scale both over the candidates and mix them with `text_weight`
+#   rrf      - reciprocal rank fusion, 1 / (k + rank) summed over both rankings
+#   filter   - keep results whose video's scaled text score reaches `filter_threshold`, ranked by CLIP
+FUSION_STRATEGIES = ('weighted', 'rrf', 'filter')
+
+
+def rank_positions(scores: np.ndarray) -> np.ndarray:
+    """0-based rank of each score, best first; ties share the best rank of their group."""
+    order = np.argsort(-scores, kind='stable')
+    ordered = scores[order]
+    starts = np.ones(len(scores), dtype=bool)
+    starts[1:] = ordered[1:] != ordered[:-1]
+    ranks = np.empty(len(scores), dtype=np.int64)
+    ranks[order] = np.maximum.accumulate(np.where(starts, np.arange(len(scores)), 0))
+    return ranks
+
+
+def fuse_scores(
+    visual: np.ndarray,
+    text: np.ndarray,
+    strategy: str = 'weighted',
+    text_weight: float = 0.5,
+    rrf_k: int = 60,
+    filter_threshold: float = 0.5,
+) -> np.ndarray:
+    """
+    Fused score per candidate. `text` is NaN where the text retriever returned
+    nothing for the candidate's video; such candidates get no text contribution,
+    and are dropped (-inf) by the `filter` strategy.
+    """
+    if strategy not in FUSION_STRATEGIES:
+        raise ValueError(f"Unknown fusion strategy '{strategy}'.")
+    visual = np.asarray(visual, dtype=np.float64)
+    text = np.asarray(text, dtype=np.float64)
+    matched = ~np.isnan(text)
+
+    if strategy == 'rrf':
+        fused = 1.0 / (rrf_k + 1 + rank_positions(visual))
+        fused[matched] += 1.0 / (rrf_k + 1 + rank_positions(text[matched]))
+        return fused
+
+    text_scaled = np.zeros(len(text))
+    text_scaled[matched] = min_max(text[matched])
+    if strategy == 'filter':
+        return np.where(matched & (text_scaled >= filter_threshold), visual, -np.inf)
+    return (1 - text_weight) * min_max(visual) + text_weight * text_scaled
+
+
+def top_k_order(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """Indices of the `top_k` highest finite scores, best first."""
+    keep = np.flatnonzero(np.isfinite(scores))
+    if top_k < len(keep):
+        keep = keep[np.argpartition(-scores[keep], top_k - 1)[:top_k]]
+    return keep[np.argsort(-scores[keep], kind='stable')]
+
+
+def video_text_scores(video_ids: Sequence[str], video_scores: Mapping[str, float]) -> np.ndarray:
+    """Per-candidate column of its video's text score (NaN if none), looking each video up once."""
+    codes: Dict[str, int] = {}
+    inverse = np.fromiter((codes.setdefault(video_id, len(codes)) for video_id in video_ids), dtype=np.int64, count=len(video_ids))
+    per_video = np.array([video_scores.get(video_id, np.nan) for video_id in codes], dtype=np.float64)
+    return per_video[inverse]
+
+
+def fuse_results(
+    results: List[Dict],
+    video_scores: Mapping[str, float],
+    score_key: str,
+    top_k: int,
+    strategy: str = 'weighted',
+    text_weight: float = 0.5,
+    rrf_k: int = 60,
+    filter_threshold: float = 0.5,
+) -> List[Dict]:
+    """
+    Re-rank search results (keyframes, or temporal sequences keyed by their
+    `video`) by fusing `result[score_key]` with the text score of their video.
+    The fused value replaces `score_key`; the inputs are kept as `clip_score`
+    and `text_score`.
+    """
+    if not results:
+        return []
+    visual = np.fromiter((result.get(score_key, 0.0) for result in results), dtype=np.float64, count=len(results))
+    text = video_text_scores([result['video'] for result in results], video_scores)
+    fused = fuse_scores(visual, text, strategy, text_weight, rrf_k, filter_threshold)
+    return [
+        {
+            **results[i],
+            score_key: float(fused[i]),
+            "clip_score": float(visual[i]),
+            "text_score": None if np.isnan(text[i]) else float(text[i]),
+        }
+        for i in top_k_order(fused, top_k).tolist()
+    ]
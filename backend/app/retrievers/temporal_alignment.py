@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+
+@dataclass
+class AlignedSequence:
+    positions: np.ndarray  # column of the chosen keyframe for each sub-query, in query order
+    score: float  # mean similarity along the sequence
+
+
+class RangeArgmax:
+    """Sparse table answering argmax over half-open windows [lo, hi) of a fixed array in O(1)."""
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+        n = len(values)
+        self.table = [np.arange(n)]
+        width = 1
+        while width * 2 <= n:
+            prev = self.table[-1]
+            left, right = prev[:n - 2 * width + 1], prev[width:n - width + 1]
+            self.table.append(np.where(values[left] >= values[right], left, right))
+            width *= 2
+
+    def query(self, lo: np.ndarray, hi: np.ndarray):
+        """Vectorised (best value, argmax) per window; empty windows give (-inf, -1)."""
+        length = hi - lo
+        valid = length > 0
+        best_value = np.full(len(lo), -np.inf)
+        best_arg = np.full(len(lo), -1, dtype=np.int64)
+        if not valid.any():
+            return best_value, best_arg
+
+        lo_v, hi_v = lo[valid], hi[valid]
+        level = np.floor(np.log2(length[valid])).astype(np.int64)
+        left = np.empty(len(lo_v), dtype=np.int64)
+        right = np.empty(len(lo_v), dtype=np.int64)
+        for k in np.unique(level):
+            at = level == k
+            left[at] = self.table[k][lo_v[at]]
+            right[at] = self.table[k][hi_v[at] - (1 << k)]
+        arg = np.where(self.values[left] >= self.values[right], left, right)
+        best_value[valid] = self.values[arg]
+        best_arg[valid] = arg
+        return best_value, best_arg
+
+
+def align_sequence(frame_indices: np.ndarray, scores: np.ndarray, max_gap_frames: Optional[float] = None) -> Optional[AlignedSequence]:
+    """
+    Viterbi pass for the best ordered keyframe sequence within one video.
+
+    frame_indices: (n,) frame index of each keyframe, sorted ascending.
+    scores: (n_queries, n) similarity of each keyframe to each sub-query;
+        -inf marks keyframes that cannot match a sub-query.
+    max_gap_frames: largest allowed frame distance between consecutive
+        matches (None = unbounded).
+
+    The match for query t+1 must come strictly after the match for query t.
+    For each step the allowed predecessors of a keyframe form a contiguous
+    window of earlier keyframes, so the transition is a windowed argmax and
+    the whole pass is O(n_queries * n log n) with no per-keyframe Python loop.
+    """
+    n_queries, n = scores.shape
+    if n == 0 or n_queries == 0:
+        return None
+
+    frame_indices = np.asarray(frame_indices)
+    # Predecessors of keyframe i: frames in [frame_i - max_gap, frame_i).
+    hi = np.searchsorted(frame_indices, frame_indices, side='left')
+    if max_gap_frames is None:
+        lo = np.zeros(n, dtype=np.int64)
+    else:
+        lo = np.searchsorted(frame_indices, frame_indices - max_gap_frames, side='left')
+
+    best = scores[0].astype(np.float64)
+    backpointers = np.full((n_queries, n), -1, dtype=np.int64)
+    for step in range(1, n_queries):
+        prev_value, prev_arg = RangeArgmax(best).query(lo, hi)
+        best = prev_value + scores[step]
+        backpointers[step] = prev_arg
+
+    end = int(np.argmax(best))
+    if not np.isfinite(best[end]):
+        return None
+
+    positions = np.empty(n_queries, dtype=np.int64)
+    positions[-1] = end
+    for step in range(n_queries - 1, 0, -1):
+        positions[step - 1] = backpointers[step, positions[step]]
+    return AlignedSequence(positions=positions, score=float(best[end] / n_queries))
@@ -0,0 +1,45 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from ..config import settings
+
+_lock = threading.Lock()
+_executors: Dict[str, ThreadPoolExecutor] = {}
+
+
+def _executor(name: str, max_workers: int) -> ThreadPoolExecutor:
+    with _lock:
+        executor = _executors.get(name)
+        if executor is None:
+            executor = _executors[name] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        return executor
+
+
+def inference_executor() -> ThreadPoolExecutor:
+    # Model forward passes get their own small pool: torch already parallelises a
+    # single encode across cores, so more concurrent encodes only add contention.
+    return _executor('inference', settings.INFERENCE_WORKERS)
+
+
+def io_executor() -> ThreadPoolExecutor:
+    # Blocking I/O and request-level work (Qdrant/Weaviate calls, index scans,
+    # file access) runs in a bounded pool so the event loop never blocks on it.
+    return _executor('io', settings.IO_WORKERS)
+
+
+async def run_io(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking call in the I/O pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(io_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def shutdown_executors() -> None:
+    """Stop both pools. They are created again on next use, so a later lifespan in the same process still works."""
+    with _lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,222 @@
+import os
+import re
+import secrets
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from stat import S_ISREG
+from typing import List, Mapping, Optional, Tuple
+
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from .executors import run_io
+
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 1024 * 1024
+_RANGE_SPEC = re.compile(r'^(\d*)-(\d*)$')
+
+
+def chunk_size_for(length: int) -> int:
+    """Small seeks are sent in one read; long ranges stream in chunks of up to 1 MB."""
+    return max(MIN_CHUNK_SIZE, min(MAX_CHUNK_SIZE, length))
+
+
+def parse_range_header(header: str, file_size: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    Parse a `Range: bytes=...` header into sorted, merged inclusive (start, end) pairs.
+
+    Returns None when the header is malformed or uses another unit (the range
+    is then ignored and the whole file sent), and [] when it is well-formed
+    but no range overlaps the file (416), which is always the case for an
+    empty file.
+    """
+    unit, _, specs = header.partition('=')
+    if unit.strip().lower() != 'bytes' or not specs.strip():
+        return None
+
+    ranges = []
+    for spec in specs.split(','):
+        match = _RANGE_SPEC.match(spec.strip())
+        if not match or match.groups() == ('', ''):
+            return None
+        first, last = match.groups()
+        if not first:
+            # Suffix range: the final N bytes.
+            length = int(last)
+            if length == 0 or file_size == 0:
+                continue
+            ranges.append((max(0, file_size - length), file_size - 1))
+            continue
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start < file_size:
+            ranges.append((start, min(int(last), file_size - 1) if last else file_size - 1))
+
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class RangeFileResponse(Response):
+    """
+    Serves a file with HTTP range support: Range/If-Range, ETag and
+    Last-Modified validators, 304, 416 and multipart/byteranges.
+
+    The body goes out through the ASGI zero-copy extensions when the server
+    offers them (`http.response.pathsend` for whole files, or
+    `http.response.zerocopysend`). Stock uvicorn offers neither; main.py runs
+    it with ZeroCopyHttpToolsProtocol (app/utils/zerocopy.py), which adds
+    zerocopysend on top of sendfile(2). Otherwise the body is read with
+    os.pread in the I/O pool, in chunks sized to the range, so the event
+    loop never blocks on disk.
+
+    Build it with `await RangeFileResponse.create(...)`, which also takes the
+    file's stat off the event loop.
+    """
+
+    def __init__(self, path: Path, request_headers: Mapping[str, str], media_type: str = 'application/octet-stream', method: str = 'GET', stat_result: Optional[os.stat_result] = None):
+        self.path = Path(path)
+        self.file_media_type = media_type
+        # Content-Type is set per branch below; 304/416 carry none.
+        self.media_type = None
+        self.send_body = method != 'HEAD'
+        self.background = None
+        self.ranges: List[Tuple[int, int]] = []
+        self.boundary = ''
+
+        stat = stat_result if stat_result is not None else os.stat(self.path)
+        self.file_size = stat.st_size
+        self.etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        self.last_modified = formatdate(stat.st_mtime, usegmt=True)
+        headers = {
+            'accept-ranges': 'bytes',
+            'etag': self.etag,
+            'last-modified': self.last_modified,
+        }
+
+        if self._not_modified(request_headers, stat.st_mtime):
+            self.status_code = 304
+            self.init_headers(headers)
+            return
+
+        ranges = None
+        range_header = request_headers.get('range')
+        if range_header and self._if_range_matches(request_headers.get('if-range')):
+            ranges = parse_range_header(range_header, self.file_size)
+
+        if ranges is None:
+            self.status_code = 200
+            self.ranges = [(0, self.file_size - 1)] if self.file_size else []
+            headers['content-type'] = media_type
+            headers['content-length'] = str(self.file_size)
+        elif not ranges:
+            self.status_code = 416
+            headers['content-range'] = f'bytes */{self.file_size}'
+            headers['content-length'] = '0'
+        elif len(ranges) == 1:
+            start, end = ranges[0]
+            self.status_code = 206
+            self.ranges = ranges
+            headers['content-type'] = media_type
+            headers['content-range'] = f'bytes {start}-{end}/{self.file_size}'
+            headers['content-length'] = str(end - start + 1)
+        else:
+            self.status_code = 206
+            self.ranges = ranges
+            self.boundary = secrets.token_hex(16)
+            headers['content-type'] = f'multipart/byteranges; boundary={self.boundary}'
+            headers['content-length'] = str(sum(len(self._part_header(start, end)) + end - start + 1 for start, end in ranges) + len(self._closing_boundary()))
+        self.init_headers(headers)
+
+    @classmethod
+    async def create(cls, path: Path, request_headers: Mapping[str, str], media_type: str = 'application/octet-stream', method: str = 'GET') -> 'RangeFileResponse':
+        """Stat the file in the I/O pool, then build the response; FileNotFoundError unless `path` is a regular file."""
+        stat_result = await run_io(os.stat, path)
+        if not S_ISREG(stat_result.st_mode):
+            raise FileNotFoundError(f'Not a regular file: {path}')
+        return cls(path, request_headers, media_type, method, stat_result)
+
+    def _not_modified(self, request_headers: Mapping[str, str], mtime: float) -> bool:
+        if_none_match = request_headers.get('if-none-match')
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+            return self.etag in tags or '*' in tags
+        if_modified_since = request_headers.get('if-modified-since')
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _if_range_matches(self, if_range: Optional[str]) -> bool:
+        """A Range is honoured only if If-Range is absent or still names this exact file version."""
+        if if_range is None:
+            return True
+        if_range = if_range.strip()
+        if if_range.startswith('"'):
+            return if_range == self.etag
+        return if_range == self.last_modified
+
+    def _part_header(self, start: int, end: int) -> bytes:
+        return (f'\r\n--{self.boundary}\r\n'
+                f'Content-Type: {self.file_media_type}\r\n'
+                f'Content-Range: bytes {start}-{end}/{self.file_size}\r\n\r\n').encode('latin-1')
+
+    def _closing_boundary(self) -> bytes:
+        return f'\r\n--{self.boundary}--\r\n'.encode('latin-1')
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({'type': 'http.response.start', 'status': self.status_code, 'headers': self.raw_headers})
+        if not self.send_body or not self.ranges:
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        extensions = scope.get('extensions') or {}
+        whole_file = self.status_code == 200
+        if whole_file and 'http.response.pathsend' in extensions:
+            await send({'type': 'http.response.pathsend', 'path': str(self.path)})
+            return
+
+        f = await run_io(open, self.path, 'rb')
+        try:
+            for i, (start, end) in enumerate(self.ranges):
+                last_range = i == len(self.ranges) - 1
+                if self.boundary:
+                    await send({'type': 'http.response.body', 'body': self._part_header(start, end), 'more_body': True})
+                more_after = bool(self.boundary) or not last_range
+                if 'http.response.zerocopysend' in extensions:
+                    await send({
+                        'type': 'http.response.zerocopysend',
+                        'file': f,
+                        'offset': start,
+                        'count': end - start + 1,
+                        'more_body': more_after,
+                    })
+                else:
+                    await self._send_range(f.fileno(), start, end, more_after, send)
+            if self.boundary:
+                await send({'type': 'http.response.body', 'body': self._closing_boundary(), 'more_body': False})
+        finally:
+            f.close()
+
+    @staticmethod
+    async def _send_range(fd: int, start: int, end: int, more_after: bool, send: Send) -> None:
+        remaining = end - start + 1
+        chunk_size = chunk_size_for(remaining)
+        offset = start
+        while remaining > 0:
+            chunk = await run_io(os.pread, fd, min(chunk_size, remaining), offset)
+            if not chunk:
+                break
+            offset += len(chunk)
+            remaining -= len(chunk)
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': remaining > 0 or more_after})
+        if remaining > 0 and not more_after:
+            # File shrank under us; close the body rather than hang the client.
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
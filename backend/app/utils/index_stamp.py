@@ -0,0 +1,68 @@
+import json
+import os
+import secrets
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from ..config import settings
+from .logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def bump_index_stamp(source: str, path: Optional[Path] = None) -> str:
+    """
+    Record that a served index (Qdrant collection, Weaviate collection) changed.
+    Servers sharing the stamp file stop serving search results cached before it.
+    """
+    path = Path(path or settings.INDEX_STAMP_PATH)
+    version = secrets.token_hex(8)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{path.name}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': version, 'source': source, 'updated_at': time.time()}, f)
+    os.replace(tmp_path, path)
+    logger.info(f'Index stamp bumped by {source}: {version}')
+    return version
+
+
+class IndexStamp:
+    """
+    Reader side of the stamp file, for the search result cache key. The file
+    is re-read at most every `check_every_seconds`, so a rebuild is noticed
+    within that delay without touching the disk on every request.
+    """
+
+    def __init__(self, path: Path, check_every_seconds: float = 1.0):
+        self.path = Path(path)
+        self.check_every_seconds = check_every_seconds
+        self._lock = threading.Lock()
+        self._checked_at = time.monotonic()
+        self.version = ''
+        self.version = self._read()
+
+    def _read(self) -> str:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return str(json.load(f).get('version', ''))
+        except FileNotFoundError:
+            return ''
+        except (OSError, ValueError) as e:
+            # The file is replaced atomically, so this is a damaged file rather than a torn read.
+            logger.warning(f'Could not read index stamp {self.path}: {e}')
+            return self.version
+
+    def refresh(self) -> bool:
+        """Re-read the stamp if the check interval has passed; True if a builder bumped it since the last read."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < self.check_every_seconds:
+                return False
+            self._checked_at = now
+            version = self._read()
+            if version == self.version:
+                return False
+            self.version = version
+            return True
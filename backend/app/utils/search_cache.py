@@ -0,0 +1,92 @@
+import hashlib
+import json
+import secrets
+from typing import Any, Dict, List, Optional, Tuple
+
+from .lru_cache import LRUCache
+
+# Filter lists whose order does not change the result set.
+UNORDERED_FILTERS = ('packs', 'videos', 'excluded_videos')
+
+
+def canonical_request_key(request_data: Dict[str, Any], index_version: str = '') -> str:
+    """
+    Hash of a search request that is identical for equivalent requests:
+    keys are sorted and order-insensitive filter lists are sorted too.
+    Query order is kept, since it matters for temporal search.
+    """
+    data = dict(request_data)
+    filters = dict(data.get('filters') or {})
+    for name in UNORDERED_FILTERS:
+        if filters.get(name):
+            filters[name] = sorted(set(filters[name]))
+    data['filters'] = filters
+    data['__index_version'] = index_version
+    encoded = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _json_size(value: Any) -> int:
+    return len(json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8'))
+
+
+class SearchResultCache:
+    """LRU + TTL cache of /api/search results, bounded by entry count and serialized size."""
+
+    def __init__(self, max_items: int, ttl_seconds: Optional[float], max_bytes: Optional[int]):
+        self.cache = LRUCache(max_items=max_items, ttl_seconds=ttl_seconds, max_bytes=max_bytes, sizeof=_json_size)
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        return self.cache.get(key)
+
+    def put(self, key: str, results: List[Dict[str, Any]]) -> None:
+        # Empty results are usually a failed backend call (retrievers swallow
+        # their errors), so never pin them in the cache.
+        if results:
+            self.cache.set(key, results)
+
+    def invalidate(self) -> None:
+        self.cache.clear()
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.cache.stats()
+        stats["invalidations"] = self.invalidations
+        return stats
+
+
+class SearchSessionStore:
+    """
+    Ranked result lists of recent searches, so later pages are sliced from
+    the stored list instead of re-running retrieval and the rerank.
+
+    Sessions are LRU-evicted and expire `ttl_seconds` after the search ran;
+    a cursor is `<session id>:<offset>` and stays valid until then.
+    """
+
+    def __init__(self, max_sessions: int, ttl_seconds: Optional[float], max_bytes: Optional[int]):
+        self.sessions = LRUCache(max_items=max_sessions, ttl_seconds=ttl_seconds, max_bytes=max_bytes, sizeof=_json_size)
+
+    def first_page(self, results: List[Dict[str, Any]], page_size: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """The first page and the cursor of the next one (None if everything fit)."""
+        if len(results) <= page_size:
+            return results, None
+        session_id = secrets.token_urlsafe(12)
+        self.sessions.set(session_id, results)
+        return results[:page_size], f'{session_id}:{page_size}'
+
+    def page(self, cursor: str, page_size: int) -> Optional[Tuple[List[Dict[str, Any]], int, Optional[str]]]:
+        """(results, total, next cursor) at `cursor`, or None if the session expired or was evicted."""
+        session_id, _, offset = cursor.partition(':')
+        if not offset.isdigit():
+            raise ValueError(f'Malformed cursor: {cursor!r}')
+        results = self.sessions.get(session_id)
+        if results is None:
+            return None
+        start = int(offset)
+        end = start + page_size
+        return results[start:end], len(results), (f'{session_id}:{end}' if end < len(results) else None)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.sessions.stats()
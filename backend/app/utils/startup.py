@@ -0,0 +1,69 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .logger import setup_logger
+
+logger = setup_logger(__name__)
+
+PENDING = 'pending'
+LOADING = 'loading'
+READY = 'ready'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+
+class StartupStages:
+    """
+    Load state of each startup stage (metadata, models, vector index).
+
+    Stages run through `run()`, which records loading/ready/failed with the
+    time taken, so /api/health can report progress and endpoints can refuse
+    work until the stages they depend on are ready.
+    """
+
+    def __init__(self, names: List[str]):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, Any]] = {name: {"state": PENDING} for name in names}
+        self.started_at = time.time()
+
+    def _update(self, name: str, **fields) -> None:
+        with self._lock:
+            self._stages[name].update(fields)
+
+    def run(self, name: str, fn: Callable[..., Any], *args, **kwargs) -> Optional[Any]:
+        """Run one stage, returning its result, or None if it raised."""
+        self._update(name, state=LOADING, started_at=time.time())
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._update(name, state=FAILED, seconds=round(time.perf_counter() - start, 3), error=str(e))
+            logger.error(f"Startup stage '{name}' failed: {e}", exc_info=True)
+            return None
+        self._update(name, state=READY, seconds=round(time.perf_counter() - start, 3))
+        logger.info(f"Startup stage '{name}' ready in {time.perf_counter() - start:.2f}s")
+        return result
+
+    def fail(self, name: str, error: str) -> None:
+        self._update(name, state=FAILED, error=error)
+
+    def skip(self, name: str, reason: str) -> None:
+        """Mark a stage this configuration does not need."""
+        self._update(name, state=SKIPPED, reason=reason)
+        logger.info(f"Startup stage '{name}' skipped: {reason}")
+
+    def state(self, name: str) -> str:
+        with self._lock:
+            return self._stages[name]["state"]
+
+    def is_ready(self, *names: str) -> bool:
+        return all(self.state(name) == READY for name in names)
+
+    def is_settled(self, name: str) -> bool:
+        """Ready, failed or skipped: nothing more will happen to this stage."""
+        return self.state(name) in (READY, FAILED, SKIPPED)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: dict(stage) for name, stage in self._stages.items()}
@@ -1,5 +1,5 @@
 import re
-from typing import List, Set
+from typing import Any, Dict, List, Set
 import unicodedata
 
 def normalize_text(text: str) -> str:
@@ -19,4 +19,22 @@ def extract_keywords(text: str) -> List[str]:
     words = re.findall('\\b\\w+\\b', text)
     stop_words = {'với', 'này', 'cho', 'các', 'một', 'và', 'từ', 'đó', 'trong', 'về', 'có', 'để', 'của', 'là'}
     keywords = [word for word in words if len(word) > 2 and word not in stop_words]
-    return list(set(keywords))
\ No newline at end of file
+    return list(set(keywords))
+
+def tokenize(text: str) -> List[str]:
+    """Split normalized text into word tokens, like Weaviate's `word` tokenization"""
+    return re.findall('\\w+', normalize_text(text))
+
+def video_text_document(metadata: Dict[str, Any]) -> Dict[str, str]:
+    """Searchable text fields of a video's media-info, as indexed for the Vietnamese filter"""
+    title = normalize_text(metadata.get("title", "") or "")
+    description = normalize_text(metadata.get("description", "") or "")
+    # Order-preserving dedupe, so the same metadata always gives the same text (and embedding key).
+    keywords_list = list(dict.fromkeys(normalize_text(w or "") for w in metadata.get("keywords", []) or []))
+    keywords_string = " ".join(keywords_list) if keywords_list else ""
+    return {
+        "title": title,
+        "description": description,
+        "keywords": keywords_string,
+        "content": f"{title}. {keywords_string}. {description}".strip(),
+    }
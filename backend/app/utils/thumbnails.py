@@ -0,0 +1,173 @@
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .logger import setup_logger
+from .lru_cache import LRUCache
+
+logger = setup_logger(__name__)
+
+_NAME = re.compile(r'^[A-Za-z0-9_-]+$')
+_LOCK_STRIPES = 64
+
+ThumbnailKey = Tuple[int, str, str]
+
+
+@dataclass
+class PregenerateReport:
+    generated: int = 0
+    cached: int = 0
+    failed: int = 0
+    bytes: int = 0
+
+
+class ThumbnailCache:
+    """
+    Keyframe thumbnails resized on first request and kept on disk.
+
+    Source keyframes are read from `source_dir/<video_id>/<keyframe>.jpg`, and
+    each requested width is snapped to the nearest configured width so only
+    a few variants per keyframe are encoded. Encoded files live under
+    `cache_dir/<width>/<video_id>/<keyframe>.jpg`, and the least recently
+    served files are deleted once the directory grows past `max_bytes`.
+    """
+
+    def __init__(self, source_dir: Path, cache_dir: Path, widths: Sequence[int], max_bytes: int, quality: int = 80):
+        self.source_dir = Path(source_dir)
+        self.cache_dir = Path(cache_dir)
+        self.widths = sorted(set(widths))
+        self.quality = quality
+        self._index = LRUCache(max_items=sys.maxsize, max_bytes=max_bytes, sizeof=lambda size: size, on_evict=self._delete)
+        self._index_lock = threading.Lock()
+        self._indexed = False
+        # Concurrent requests for the same thumbnail encode it once.
+        self._encode_locks = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+
+    def snap_width(self, width: int) -> int:
+        """The smallest configured width that is at least `width`, or the largest one."""
+        return next((w for w in self.widths if w >= width), self.widths[-1])
+
+    def path_for(self, width: int, video_id: str, keyframe: str) -> Path:
+        return self.cache_dir / str(width) / video_id / f'{keyframe}.jpg'
+
+    def get(self, video_id: str, keyframe: str, width: int) -> Optional[Path]:
+        """Path of the thumbnail, encoding it first if needed. None if the keyframe does not exist."""
+        if not _NAME.match(video_id) or not _NAME.match(keyframe):
+            return None
+        self._ensure_index()
+        width = self.snap_width(width)
+        key = (width, video_id, keyframe)
+        path = self.path_for(*key)
+        if self._index.get(key) is not None and path.is_file():
+            return path
+
+        with self._encode_locks[hash(key) % _LOCK_STRIPES]:
+            if key in self._index and path.is_file():
+                return path
+            # Written by another process (e.g. build_thumbnails.py) since the index was loaded.
+            size = self._file_size(path)
+            if size is not None:
+                self._index.set(key, size)
+                return path
+            source = self.source_dir / video_id / f'{keyframe}.jpg'
+            if not source.is_file():
+                return None
+            self._index.set(key, self._encode(source, path, width))
+        return path
+
+    def _encode(self, source: Path, target: Path, width: int) -> int:
+        from PIL import Image
+
+        with Image.open(source) as image:
+            # Let the JPEG decoder downscale by a power of two before resizing.
+            image.draft('RGB', (width, image.height * width // max(image.width, 1)))
+            image = image.convert('RGB')
+            if image.width > width:
+                image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS, reducing_gap=2.0)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(f'{target.name}.{threading.get_ident()}.tmp')
+            image.save(tmp, 'JPEG', quality=self.quality, optimize=True, progressive=True)
+        os.replace(tmp, target)
+        return target.stat().st_size
+
+    @staticmethod
+    def _file_size(path: Path) -> Optional[int]:
+        try:
+            return path.stat().st_size
+        except FileNotFoundError:
+            return None
+
+    def _delete(self, key: ThumbnailKey, size: int) -> None:
+        try:
+            self.path_for(*key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _ensure_index(self) -> None:
+        """Adopt thumbnails left by a previous run, oldest first so they are evicted first."""
+        if self._indexed:
+            return
+        with self._index_lock:
+            if self._indexed:
+                return
+            entries = []
+            if self.cache_dir.is_dir():
+                for width_dir in self.cache_dir.iterdir():
+                    if not width_dir.name.isdigit():
+                        continue
+                    for video_dir in width_dir.iterdir():
+                        for entry in os.scandir(video_dir):
+                            if entry.name.endswith('.jpg'):
+                                stat = entry.stat()
+                                entries.append((stat.st_mtime, (int(width_dir.name), video_dir.name, entry.name[:-4]), stat.st_size))
+            for _, key, size in sorted(entries):
+                self._index.set(key, size)
+            self._indexed = True
+            if entries:
+                logger.info(f'Thumbnail cache: adopted {len(entries)} files ({self._index.stats()["bytes"] / 1e6:.1f} MB).')
+
+    def keyframes_of(self, video_id: str) -> List[str]:
+        video_dir = self.source_dir / video_id
+        if not video_dir.is_dir():
+            return []
+        return sorted(entry.name[:-4] for entry in os.scandir(video_dir) if entry.name.endswith('.jpg'))
+
+    def pregenerate(self, video_ids: Iterable[str], widths: Optional[Sequence[int]] = None, num_workers: int = 8) -> PregenerateReport:
+        """Encode every keyframe of the given videos at each width ahead of time."""
+        self._ensure_index()
+        widths = sorted({self.snap_width(w) for w in widths}) if widths else self.widths
+        report = PregenerateReport()
+        report_lock = threading.Lock()
+
+        def one(key: ThumbnailKey) -> None:
+            width, video_id, keyframe = key
+            cached = key in self._index and self.path_for(*key).is_file()
+            try:
+                path = self.get(video_id, keyframe, width)
+            except Exception as e:
+                logger.error(f'Failed to encode thumbnail {video_id}/{keyframe} at {width}px: {e}')
+                path = None
+            with report_lock:
+                if path is None:
+                    report.failed += 1
+                elif cached:
+                    report.cached += 1
+                else:
+                    report.generated += 1
+                    report.bytes += self._index.get(key, 0)
+
+        tasks = ((width, video_id, keyframe) for video_id in video_ids for keyframe in self.keyframes_of(video_id) for width in widths)
+        # Pillow releases the GIL while decoding and encoding, so threads scale here.
+        with ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix='thumbnails') as executor:
+            for _ in executor.map(one, tasks):
+                pass
+        return report
+
+    def stats(self) -> Dict[str, int]:
+        stats = self._index.stats()
+        return {"files": stats["size"], "bytes": stats["bytes"], "max_bytes": stats["max_bytes"], "evictions": stats["evictions"]}
@@ -0,0 +1,19 @@
+import numpy as np
+
+
+def l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale each row (last axis) to unit length as float32; zero rows are left as zeros."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def min_max(scores: np.ndarray) -> np.ndarray:
+    """Scale scores to [0, 1]; a constant set of scores maps to 1."""
+    if not len(scores):
+        return scores
+    low, high = scores.min(), scores.max()
+    if high <= low:
+        return np.ones_like(scores)
+    return (scores - low) / (high - low)
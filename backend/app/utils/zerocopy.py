@@ -0,0 +1,74 @@
+import asyncio
+import os
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from uvicorn.protocols.http.httptools_impl import HttpToolsProtocol
+
+ZEROCOPY_EXTENSION = 'http.response.zerocopysend'
+
+
+def loop_supports_sendfile(loop: asyncio.AbstractEventLoop) -> bool:
+    """uvloop inherits AbstractEventLoop.sendfile, which only raises NotImplementedError."""
+    return type(loop).sendfile is not asyncio.AbstractEventLoop.sendfile
+
+
+async def _sendfile(cycle, message: Message) -> None:
+    """Write `count` bytes of `file` from `offset` straight from the page cache to the socket."""
+    if cycle.flow.write_paused and not cycle.disconnected:
+        await cycle.flow.drain()
+    if cycle.disconnected:
+        return
+    if not cycle.response_started or cycle.response_complete or cycle.chunked_encoding:
+        raise RuntimeError(f"'{ZEROCOPY_EXTENSION}' needs a started response with a Content-Length.")
+
+    file = message['file']
+    offset = message.get('offset') or 0
+    count = message.get('count')
+    if count is None:
+        count = os.fstat(file.fileno()).st_size - offset
+    if cycle.scope['method'] == 'HEAD':
+        return
+    if count > cycle.expected_content_length:
+        raise RuntimeError('Response content longer than Content-Length')
+    # os.sendfile on plain sockets; asyncio falls back to read/write for TLS transports.
+    sent = await asyncio.get_running_loop().sendfile(cycle.transport, file, offset, count)
+    cycle.expected_content_length -= sent
+
+
+def with_zerocopysend(app: ASGIApp) -> ASGIApp:
+    """
+    Advertise and implement `http.response.zerocopysend` on top of uvicorn's
+    httptools request cycle. uvicorn passes the cycle's bound `send`, whose
+    transport and Content-Length bookkeeping the file bytes go through.
+    """
+    async def zerocopy_app(scope: Scope, receive: Receive, send: Send) -> None:
+        cycle = getattr(send, '__self__', None)
+        if scope['type'] != 'http' or not hasattr(cycle, 'expected_content_length') or not loop_supports_sendfile(asyncio.get_running_loop()):
+            await app(scope, receive, send)
+            return
+        scope['extensions'] = {**(scope.get('extensions') or {}), ZEROCOPY_EXTENSION: {}}
+
+        async def zerocopy_send(message: Message) -> None:
+            if message['type'] != ZEROCOPY_EXTENSION:
+                await send(message)
+                return
+            await _sendfile(cycle, message)
+            if not message.get('more_body', False):
+                # Completes the response through uvicorn's own bookkeeping.
+                await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+        await app(scope, receive, zerocopy_send)
+    return zerocopy_app
+
+
+class ZeroCopyHttpToolsProtocol(HttpToolsProtocol):
+    """
+    uvicorn's httptools protocol with the zero-copy send extension, so
+    RangeFileResponse hands video ranges to sendfile(2) instead of reading
+    them into Python. Run it on the asyncio loop: uvloop has no sendfile and
+    the extension is then not advertised.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.app = with_zerocopysend(self.app)
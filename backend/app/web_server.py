@@ -7,47 +7,150 @@ sys.path.insert(0, str(project_root))
 
 from contextlib import asynccontextmanager
 from typing import List, Set, Tuple, Optional
-from fastapi import FastAPI, HTTPException, Depends, Request
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
-import pandas as pd
+from pydantic import BaseModel, Field
 import os
 import re # For security check
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from app.config import settings
 from backend.app.builder.data_loader import DataLoader
+from app.builder.sprite_sheets import INDEX_FILE as SPRITE_INDEX_FILE, sheet_path, sprite_dir
+from app.retrievers.base_retriever import TextRetriever
 from app.retrievers.clip_retriever import CLIPRetriever
 from app.retrievers.weaviate_retriever import WeaviateRetriever
+from app.retrievers.local_text_retriever import LocalTextRetriever
+from app.retrievers.score_fusion import FUSION_STRATEGIES, fuse_results
+from app.embedding.embedding_manager import KeyWordEmbeddingManager, QueryEmbeddingManager
+from app.utils.executors import run_io, shutdown_executors
+from app.utils.file_response import RangeFileResponse
+from app.utils.index_stamp import IndexStamp
 from app.utils.logger import setup_logger
+from app.utils.search_cache import SearchResultCache, SearchSessionStore, canonical_request_key
+from app.utils.startup import SKIPPED, StartupStages
+from app.utils.thumbnails import ThumbnailCache
 from fastapi.responses import FileResponse
 
 logger = setup_logger(__name__)
 app_state = {}
 
+STARTUP_STAGES = ["metadata", "vector_index", "clip_model", "keyword_model", "text_index"]
+
+def load_clip_model() -> QueryEmbeddingManager:
+    embedding_manager = QueryEmbeddingManager()
+    embedding_manager.encode("warm-up")
+    return embedding_manager
+
+def load_keyword_model() -> KeyWordEmbeddingManager:
+    model = KeyWordEmbeddingManager()
+    model.encode("warm-up")
+    return model
+
+def load_text_retrievers(data_loader: DataLoader, keyword_model: KeyWordEmbeddingManager, stages: StartupStages) -> None:
+    """
+    Sets up the Vietnamese filter backends on the shared keyword model. The
+    local index is only built when TEXT_RETRIEVER is 'local'.
+    """
+    app_state["keyword_model"] = keyword_model
+    # es_retriever = ElasticsearchRetriever(settings.ES_HOST, settings.ES_INDEX_NAME)
+    try:
+        app_state["weaviate_retriever"] = WeaviateRetriever(settings, model=keyword_model)
+    except Exception as e:
+        logger.error(f"WeaviateRetriever is unavailable: {e}")
+    if settings.TEXT_RETRIEVER == "local":
+        app_state["local_text_retriever"] = stages.run("text_index", LocalTextRetriever, settings, data_loader.video_metadata, keyword_model)
+    else:
+        stages.skip("text_index", f"TEXT_RETRIEVER is '{settings.TEXT_RETRIEVER}'.")
+    if app_state["weaviate_retriever"] is None and app_state["local_text_retriever"] is None:
+        logger.error("No text retriever is available. The Vietnamese search filter will be disabled.")
+
+def load_stages(data_loader: DataLoader, stages: StartupStages) -> None:
+    """
+    Loads everything the server needs. Both embedding models load concurrently
+    with the metadata, which the vector and text indexes then wait for. The service is
+    marked ready as soon as metadata is mapped; search endpoints additionally
+    wait for the stages they use.
+    """
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup") as executor:
+        clip_model = executor.submit(stages.run, "clip_model", load_clip_model)
+        keyword_model = executor.submit(stages.run, "keyword_model", load_keyword_model)
+
+        if stages.run("metadata", data_loader.load_all) is False:
+            stages.fail("metadata", "Data loading failed; see the server log.")
+        app_state["is_ready"] = True
+        logger.info("Metadata ready. Serving requests while models load.")
+
+        vector_store = stages.run("vector_index", CLIPRetriever.load_vector_store, data_loader)
+        embedding_manager = clip_model.result()
+        if vector_store is not None and embedding_manager is not None:
+            app_state["clip_retriever"] = CLIPRetriever(data_loader, vector_store=vector_store, embedding_manager=embedding_manager)
+
+        if keyword_model.result() is not None:
+            load_text_retrievers(data_loader, keyword_model.result(), stages)
+        elif settings.TEXT_RETRIEVER == "local":
+            stages.fail("text_index", "Keyword model failed to load.")
+        else:
+            stages.skip("text_index", f"TEXT_RETRIEVER is '{settings.TEXT_RETRIEVER}'.")
+
+    # Page in the rest of the metadata store now that nothing else is competing for I/O.
+    data_loader.prefetch()
+    logger.info("Server startup complete. All stages settled.")
+
+def close_embedding_models() -> None:
+    """Stops the micro-batching worker threads of the loaded embedding models."""
+    clip_retriever = app_state.get("clip_retriever")
+    models = [app_state.get("keyword_model"), clip_retriever.embedding_manager if clip_retriever else None]
+    for model in models:
+        if model is not None:
+            model.close()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     app_state["is_ready"] = False
     logger.info("Server starting up...")
     data_loader = DataLoader(settings)
-    data_loader.load_all()
-    # app_state["es_retriever"] = ElasticsearchRetriever(settings.ES_HOST, settings.ES_INDEX_NAME)
-    app_state["clip_retriever"] = CLIPRetriever()
-    try:
-        app_state["weaviate_retriever"] = WeaviateRetriever(settings)
-    except ValueError as e:
-        logger.error(f"Failed to initialize WeaviateRetriever: {e}. The Vietnamese search filter will be disabled.")
-        app_state["weaviate_retriever"] = None
-    logger.info("Warming up embedding models...")
-    app_state["clip_retriever"].embedding_manager.encode("warm-up")
-    logger.info("Embedding models are ready.")
-    app_state["data_loader"] = data_loader
-    app_state["is_ready"] = True
-    logger.info("Server startup complete. READY")
+    stages = StartupStages(STARTUP_STAGES)
+    app_state.update(
+        startup=stages,
+        data_loader=data_loader,
+        clip_retriever=None,
+        weaviate_retriever=None,
+        local_text_retriever=None,
+        keyword_model=None,
+        search_cache=SearchResultCache(
+            max_items=settings.SEARCH_CACHE_SIZE,
+            ttl_seconds=settings.SEARCH_CACHE_TTL_SECONDS,
+            max_bytes=settings.SEARCH_CACHE_MAX_BYTES
+        ),
+        index_stamp=IndexStamp(settings.INDEX_STAMP_PATH),
+        search_sessions=SearchSessionStore(
+            max_sessions=settings.SEARCH_SESSION_COUNT,
+            ttl_seconds=settings.SEARCH_SESSION_TTL_SECONDS,
+            max_bytes=settings.SEARCH_SESSION_MAX_BYTES
+        ),
+        thumbnails=ThumbnailCache(
+            source_dir=settings.KEYFRAMES_PATH,
+            cache_dir=settings.THUMBNAIL_CACHE_PATH,
+            widths=settings.THUMBNAIL_WIDTHS,
+            max_bytes=settings.THUMBNAIL_CACHE_MAX_BYTES,
+            quality=settings.THUMBNAIL_QUALITY
+        )
+    )
+    if settings.FAST_START:
+        threading.Thread(target=load_stages, args=(data_loader, stages), name="startup", daemon=True).start()
+    else:
+        await run_io(load_stages, data_loader, stages)
+        logger.info("Server startup complete. READY")
     yield
     logger.info("Server shutting down...")
+    close_embedding_models()
     app_state.clear()
+    shutdown_executors()
 
 app = FastAPI(lifespan=lifespan)
 app.add_middleware(
@@ -75,6 +178,11 @@ class SearchRequest(BaseModel):
     filters: SearchFilters
     top_k: int = 100
     top_k_per_query: Optional[int] = 10
+    nprobe: Optional[int] = None  # ANN recall/latency knob: IVF lists (local index) or HNSW ef (Qdrant)
+    max_gap_seconds: Optional[float] = Field(None, ge=0)  # temporal search: max time between consecutive matches (None = TEMPORAL_MAX_GAP_SECONDS)
+    page_size: Optional[int] = Field(None, ge=1)  # return the top_k results a page at a time; see /api/search/page
+    text_retriever: str = settings.TEXT_RETRIEVER  # backend of the Vietnamese filter: 'weaviate' or 'local'
+    fusion: str = settings.FUSION_STRATEGY  # how the Vietnamese filter combines with CLIP: 'weighted', 'rrf' or 'filter'
 
 class SearchResultItem(BaseModel):
     video: str
@@ -86,31 +194,111 @@ class SaveSubmissionRequest(BaseModel):
     content: str
 
 # def get_es_retriever(): return app_state["es_retriever"]
-def get_clip_retriever(): return app_state["clip_retriever"]
-def get_weaviate_retriever(): return app_state["weaviate_retriever"]
+def get_clip_retriever(): return app_state.get("clip_retriever")
+def get_weaviate_retriever(): return app_state.get("weaviate_retriever")
+def get_text_retrievers(): return {"weaviate": app_state.get("weaviate_retriever"), "local": app_state.get("local_text_retriever")}
 def get_query_builder(): return app_state["query_builder"]
 def get_data_loader(): return app_state["data_loader"]
+def get_search_cache(): return app_state["search_cache"]
+def get_search_sessions(): return app_state["search_sessions"]
+def get_thumbnails(): return app_state["thumbnails"]
+
+def require_stages(*names: str) -> None:
+    """Refuse the request with 503 until the startup stages it depends on are ready."""
+    startup: Optional[StartupStages] = app_state.get("startup")
+    waiting = [name for name in names if startup is None or not startup.is_ready(name)]
+    if waiting:
+        raise HTTPException(status_code=503, detail=f"Service is starting up: waiting for {', '.join(waiting)}.")
+
+def etag_json_response(request: Request, body: bytes, etag: str) -> Response:
+    """Serve a pre-serialized JSON body, answering 304 when the client already has it."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if etag in tags or "*" in tags:
+            return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @app.get("/api/packs", response_model=List[str])
-async def get_available_packs(data_loader: DataLoader = Depends(get_data_loader)):
+async def get_available_packs(request: Request, data_loader: DataLoader = Depends(get_data_loader)):
     """Endpoint to get the list of all available packs."""
     if not app_state.get("is_ready"):
         raise HTTPException(status_code=503, detail="Service not ready")
     
-    return data_loader.get_available_packs()
+    return etag_json_response(request, *data_loader.get_packs_json())
 
 @app.post("/api/videos_in_packs", response_model=List[str])
-async def get_videos_in_packs(request: VideosInPacksRequest, data_loader: DataLoader = Depends(get_data_loader)):
+async def get_videos_in_packs(request: Request, body: VideosInPacksRequest, data_loader: DataLoader = Depends(get_data_loader)):
     """Endpoint to get the list of videos for a given list of packs."""
     if not app_state.get("is_ready"):
         raise HTTPException(status_code=503, detail="Service not ready")
     
-    return data_loader.get_videos_for_packs(request.packs)
+    return etag_json_response(request, *data_loader.get_videos_for_packs_json(body.packs))
+
+@app.get("/api/videos_in_packs", response_model=List[str])
+async def get_videos_in_packs_cacheable(request: Request, packs: List[str] = Query(...), data_loader: DataLoader = Depends(get_data_loader)):
+    """GET variant of /api/videos_in_packs, so browsers can revalidate it with If-None-Match."""
+    if not app_state.get("is_ready"):
+        raise HTTPException(status_code=503, detail="Service not ready")
+    
+    return etag_json_response(request, *data_loader.get_videos_for_packs_json(packs))
 
 @app.get("/api/health")
 async def health_check():
-    if app_state.get("is_ready"): return {"status": "ready"}
-    raise HTTPException(status_code=503, detail="Service not ready")
+    """Ready once metadata is mapped; `stages` reports the metadata, model and vector index loads."""
+    startup: Optional[StartupStages] = app_state.get("startup")
+    body = {
+        "status": "ready" if app_state.get("is_ready") else "starting",
+        "stages": startup.snapshot() if startup else {},
+    }
+    return JSONResponse(content=body, status_code=200 if app_state.get("is_ready") else 503)
+
+@app.get("/api/cache/stats", response_model=dict)
+async def cache_stats():
+    """Endpoint to inspect hit/miss counters of the server-side caches."""
+    if not app_state.get("is_ready"):
+        raise HTTPException(status_code=503, detail="Service not ready")
+
+    require_stages("clip_model", "vector_index")
+    stats = {
+        "search_results": app_state["search_cache"].stats(),
+        "search_sessions": app_state["search_sessions"].stats(),
+        "query_embeddings": app_state["clip_retriever"].embedding_manager.cache_stats(),
+    }
+    if app_state.get("keyword_model"):
+        stats["keyword_embeddings"] = app_state["keyword_model"].cache_stats()
+    return stats
+
+@app.get("/api/embedding/batching", response_model=dict)
+async def embedding_batching_stats():
+    """Endpoint to inspect queue depth and batch sizes of the embedding micro-batchers."""
+    if not app_state.get("is_ready"):
+        raise HTTPException(status_code=503, detail="Service not ready")
+
+    require_stages("clip_model", "vector_index")
+    stats = {"query_embeddings": app_state["clip_retriever"].embedding_manager.batching_stats()}
+    if app_state.get("keyword_model"):
+        stats["keyword_embeddings"] = app_state["keyword_model"].batching_stats()
+    return stats
+
+@app.post("/api/cache/invalidate", response_model=dict)
+async def invalidate_search_cache(x_admin_token: Optional[str] = Header(None)):
+    """
+    Endpoint to drop all cached search results. The Qdrant and Weaviate builders
+    already do this through the index stamp; this is for changes made by hand.
+    Requires the X-Admin-Token header to match ADMIN_TOKEN.
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Cache invalidation is disabled; set ADMIN_TOKEN to enable it.")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token.")
+    if not app_state.get("is_ready"):
+        raise HTTPException(status_code=503, detail="Service not ready")
+
+    app_state["search_cache"].invalidate()
+    logger.info("Search result cache invalidated.")
+    return {"message": "Search result cache invalidated."}
 
 # @app.get("/api/objects", response_model=List[str])
 # async def get_unique_objects(data_loader: DataLoader = Depends(get_data_loader)):
@@ -123,13 +311,19 @@ async def health_check():
 
 @app.get("/api/video_keyframes/{video_id}", response_model=dict)
 async def get_video_keyframes(video_id: str, data_loader: DataLoader = Depends(get_data_loader)):
-    keyframes = data_loader.get_keyframes_for_video(video_id)
-    if not keyframes: raise HTTPException(status_code=404, detail="Video not found.")
-    return {"keyframes": keyframes}
+    if not app_state.get("is_ready"):
+        raise HTTPException(status_code=503, detail="Service not ready")
+    require_stages("metadata")
+    body = data_loader.get_keyframes_json(video_id)
+    if body is None: raise HTTPException(status_code=404, detail="Video not found.")
+    return Response(content=body, media_type="application/json")
 
 @app.get("/api/video_info/{video_id}", response_model=dict)
 async def get_video_info(video_id: str, data_loader: DataLoader = Depends(get_data_loader)):
     """Endpoint to get metadata for a video, like FPS."""
+    if not app_state.get("is_ready"):
+        raise HTTPException(status_code=503, detail="Service not ready")
+    require_stages("metadata")
     fps = data_loader.get_video_fps(video_id)
     if fps is None:
         raise HTTPException(status_code=404, detail="Video info or FPS not found.")
@@ -138,6 +332,9 @@ async def get_video_info(video_id: str, data_loader: DataLoader = Depends(get_da
 @app.get("/api/video_details/{video_id}", response_model=dict)
 async def get_video_details(video_id: str, data_loader: DataLoader = Depends(get_data_loader)):
     """Endpoint to get video details like watch_url and fps."""
+    if not app_state.get("is_ready"):
+        raise HTTPException(status_code=503, detail="Service not ready")
+    require_stages("metadata")
     # Special handling for L28 pack to use Hugging Face URLs
     if video_id.startswith('L28'):
         watch_url = f"https://huggingface.co/datasets/ChungDat/hcm-aic2025-additional-data/resolve/main/video/{video_id}.mp4"
@@ -159,13 +356,102 @@ async def get_video_details(video_id: str, data_loader: DataLoader = Depends(get
 @app.post("/api/search", response_model=dict)
 async def search(
     request: SearchRequest,
+    http_request: Request,
+    response: Response,
     # es_retriever: ElasticsearchRetriever = Depends(get_es_retriever),
     clip_retriever: CLIPRetriever = Depends(get_clip_retriever),
-    weaviate_retriever: WeaviateRetriever = Depends(get_weaviate_retriever),
-    data_loader: DataLoader = Depends(get_data_loader)
+    text_retrievers: dict = Depends(get_text_retrievers),
+    search_cache: SearchResultCache = Depends(get_search_cache),
+    search_sessions: SearchSessionStore = Depends(get_search_sessions)
 ):
+    """
+    Runs a search, serving identical requests from the result cache.
+    Send `X-Cache-Bypass: 1` to force recomputation; the `X-Cache` response
+    header and the `cached` field say whether the cache was used. When the
+    Vietnamese filter fails, the CLIP results are returned unfused with an
+    `X-Search-Degraded` header and are not cached.
+
+    With `page_size`, only the first page is returned, along with `total`
+    and a `next_cursor` for /api/search/page, which serves the remaining
+    top_k results from the stored ranking without searching again.
+    """
     if not app_state.get("is_ready"): raise HTTPException(status_code=503, detail="Service is starting up.")
-    
+    require_stages("clip_model", "vector_index")
+    if request.text_retriever not in text_retrievers:
+        raise HTTPException(status_code=400, detail="Invalid text retriever.")
+    if request.fusion not in FUSION_STRATEGIES:
+        raise HTTPException(status_code=400, detail="Invalid fusion strategy.")
+    if request.filters.vietnamese_query and not app_state["startup"].is_settled("keyword_model"):
+        require_stages("keyword_model")
+    if request.filters.vietnamese_query and request.text_retriever == "local":
+        if app_state["startup"].state("text_index") == SKIPPED:
+            raise HTTPException(status_code=400, detail="The local text retriever is disabled; start the server with TEXT_RETRIEVER='local'.")
+        if not app_state["startup"].is_settled("text_index"):
+            require_stages("text_index")
+
+    bypass_cache = http_request.headers.get("x-cache-bypass", "").lower() in ("1", "true", "yes")
+    index_version = await run_io(search_index_version, clip_retriever, search_cache)
+    cache_key = canonical_request_key(request.model_dump(exclude={"page_size"}), index_version)
+    if not bypass_cache:
+        cached_results = search_cache.get(cache_key)
+        if cached_results is not None:
+            response.headers["X-Cache"] = "HIT"
+            logger.info(f"Returning {len(cached_results)} cached search results.")
+            return paginate(cached_results, request.page_size, search_sessions, cached=True)
+
+    # Model inference and Qdrant/Weaviate calls are blocking; keep them off the event loop.
+    search_results, degraded = await run_io(run_search, request, clip_retriever, text_retrievers[request.text_retriever])
+    if degraded:
+        # Unfused results must not be served later as the answer to the fused request.
+        response.headers["X-Search-Degraded"] = "vietnamese_filter"
+    else:
+        search_cache.put(cache_key, search_results)
+
+    response.headers["X-Cache"] = "BYPASS" if bypass_cache else "MISS"
+    logger.info(f"Returning {len(search_results)} search results.")
+    return paginate(search_results, request.page_size, search_sessions, cached=False)
+
+def search_index_version(clip_retriever: CLIPRetriever, search_cache: SearchResultCache) -> str:
+    """
+    Version of the indexes behind a search, part of its cache key: the loaded
+    local vector index plus the stamp the Qdrant and Weaviate builders bump.
+    A new stamp also clears the cache, since no entry made before it can hit again.
+    """
+    stamp: IndexStamp = app_state["index_stamp"]
+    if stamp.refresh():
+        search_cache.invalidate()
+        logger.info(f"Index stamp changed to {stamp.version}; search result cache invalidated.")
+    return f"{clip_retriever.index_version}:{stamp.version}"
+
+def paginate(results: List[dict], page_size: Optional[int], search_sessions: SearchSessionStore, cached: bool) -> dict:
+    """The /api/search body: every result, or the first page and a cursor when page_size is set."""
+    if not page_size:
+        return {"results": results, "cached": cached}
+    page, next_cursor = search_sessions.first_page(results, page_size)
+    return {"results": page, "cached": cached, "total": len(results), "next_cursor": next_cursor}
+
+@app.get("/api/search/page", response_model=dict)
+async def search_page(
+    cursor: str,
+    page_size: int = Query(100, ge=1),
+    search_sessions: SearchSessionStore = Depends(get_search_sessions)
+):
+    """Endpoint to get the next page of a paginated search from its `next_cursor`."""
+    try:
+        page = search_sessions.page(cursor, page_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page is None:
+        raise HTTPException(status_code=410, detail="Search session expired; run the search again.")
+    results, total, next_cursor = page
+    return {"results": results, "total": total, "next_cursor": next_cursor}
+
+def run_search(request: SearchRequest, clip_retriever: CLIPRetriever, text_retriever: Optional[TextRetriever]) -> Tuple[List[dict], bool]:
+    """
+    Runs the CLIP retrieval and the optional Vietnamese filtering step.
+    Returns the results and whether they are degraded: CLIP results left
+    unfused because the text retriever failed.
+    """
     # Unpack filters
     packs = request.filters.packs
     videos = request.filters.videos
@@ -175,7 +461,7 @@ async def search(
     # The check for empty queries is now handled by the retriever
     if not request.queries and not packs and not videos:
         logger.warning("Search called with no queries and no pack or video filters.")
-        return {"results": []}
+        return [], False
 
     if request.retriever == 'clip':
         # The retrieve method will now handle both single and temporal queries
@@ -185,39 +471,41 @@ async def search(
             videos=videos,
             excluded_videos=excluded_videos,
             top_k=request.top_k,
-            top_k_per_query=request.top_k_per_query
+            top_k_per_query=request.top_k_per_query,
+            nprobe=request.nprobe,
+            max_gap_seconds=request.max_gap_seconds
         )
     else:
         raise HTTPException(status_code=400, detail="Invalid retriever.")
         
-    # --- New Weaviate Filtering Step ---
-    if vietnamese_query and weaviate_retriever:
-        logger.info(f"Applying Vietnamese filter: '{vietnamese_query}'")
-        # Convert initial results to the format WeaviateRetriever expects
-        candidate_keyframes = {(res['video'], res['frame'], res['frame_index']) for res in search_results}
-        
-        retrieved_results = weaviate_retriever.retrieve(
-            query=vietnamese_query,
-            candidate_keyframes=candidate_keyframes,
-            top_k=request.top_k
+    # --- Vietnamese Filtering Step (Weaviate or the local text index) ---
+    if vietnamese_query and text_retriever:
+        logger.info(f"Applying Vietnamese filter: '{vietnamese_query}' ({request.fusion} fusion)")
+        # Text scores are per video, so single and temporal results are both fused through their 'video';
+        # temporal sequences carry their CLIP score as 'score', keyframes as 'similarity_score'.
+        candidate_videos = {res['video'] for res in search_results}
+        try:
+            video_scores = text_retriever.score_videos(vietnamese_query, candidate_videos)
+        except Exception as e:
+            logger.error(f"Vietnamese filter failed, returning CLIP results unfused: {e}", exc_info=True)
+            return search_results, True
+
+        score_key = "score" if search_results and "query_results" in search_results[0] else "similarity_score"
+        search_results = fuse_results(
+            search_results,
+            video_scores,
+            score_key=score_key,
+            top_k=request.top_k,
+            strategy=request.fusion,
+            text_weight=settings.FUSION_TEXT_WEIGHT,
+            rrf_k=settings.FUSION_RRF_K,
+            filter_threshold=settings.FUSION_FILTER_THRESHOLD
         )
-        
-        # Convert RetrievalResult objects to the dictionary format expected by the frontend
-        search_results = [
-            {
-                "video": res.video_id,
-                "frame": res.keyframe_id,
-                "frame_index": res.keyframe_index,
-                "similarity_score": res.similarity_score
-            }
-            for res in retrieved_results
-        ]
-        
-    elif vietnamese_query and not weaviate_retriever:
-        logger.warning("Vietnamese query was provided, but WeaviateRetriever is not available.")
 
-    logger.info(f"Returning {len(search_results)} search results.")
-    return {"results": search_results}
+    elif vietnamese_query and not text_retriever:
+        logger.warning(f"Vietnamese query was provided, but the '{request.text_retriever}' text retriever is not available.")
+
+    return search_results, False
 
 @app.post("/api/save_submission")
 async def save_submission(request: SaveSubmissionRequest):
@@ -239,8 +527,7 @@ async def save_submission(request: SaveSubmissionRequest):
         filename = f"{request.filename}.csv"
         save_path = submissions_dir / filename
 
-        with open(save_path, "w", encoding="utf-8") as f:
-            f.write(request.content)
+        await run_io(save_path.write_text, request.content, encoding="utf-8")
 
         logger.info(f"Successfully saved submission to {save_path}")
         return {"message": "Submission saved successfully.", "path": str(save_path)}
@@ -249,74 +536,72 @@ async def save_submission(request: SaveSubmissionRequest):
         logger.error(f"Failed to save submission file: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to save submission file on the server.")
 
-@app.get("/api/video/{video_id}")
+@app.api_route("/api/video/{video_id}", methods=["GET", "HEAD"])
 async def get_video_file(video_id: str, request: Request):
     """
-    Endpoint to stream a video file with proper HTTP range request support for seeking.
+    Endpoint to serve a video file with HTTP range support for seeking: single
+    and multiple ranges, If-Range, ETag/Last-Modified revalidation and 416 for
+    unsatisfiable ranges. The body is sent with sendfile(2) under main.py's uvicorn protocol.
     """
     video_path = settings.VIDEOS_PATH / f"{video_id}.mp4"
-
-    # Security check: ensure the file exists before trying to serve it
-    if not video_path.is_file():
+    try:
+        return await RangeFileResponse.create(video_path, request.headers, media_type="video/mp4", method=request.method)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Video file not found")
-    
-    file_size = video_path.stat().st_size
-    range_header = request.headers.get('range')
-    
-    if range_header:
-        # Parse the range header (e.g., "bytes=0-1023")
-        range_match = range_header.replace('bytes=', '').split('-')
-        start = int(range_match[0]) if range_match[0] else 0
-        end = int(range_match[1]) if range_match[1] else file_size - 1
-        
-        # Ensure valid range
-        start = max(0, start)
-        end = min(file_size - 1, end)
-        content_length = end - start + 1
-        
-        def iter_file_range():
-            with open(video_path, 'rb') as f:
-                f.seek(start)
-                remaining = content_length
-                while remaining:
-                    chunk_size = min(8192, remaining)  # 8KB chunks
-                    chunk = f.read(chunk_size)
-                    if not chunk:
-                        break
-                    remaining -= len(chunk)
-                    yield chunk
-        
-        headers = {
-            'Content-Range': f'bytes {start}-{end}/{file_size}',
-            'Accept-Ranges': 'bytes',
-            'Content-Length': str(content_length),
-            'Content-Type': 'video/mp4',
-        }
-        
-        return StreamingResponse(
-            iter_file_range(),
-            status_code=206,  # Partial Content
-            headers=headers
-        )
-    
+
+@app.api_route("/api/thumbnail/{video_id}/{keyframe}", methods=["GET", "HEAD"])
+async def get_thumbnail(video_id: str, keyframe: str, request: Request, w: int = Query(settings.THUMBNAIL_DEFAULT_WIDTH, ge=1, le=4096), thumbnails: ThumbnailCache = Depends(get_thumbnails)):
+    """
+    Endpoint to serve a keyframe resized to (about) `w` pixels wide. The width
+    snaps up to one of THUMBNAIL_WIDTHS, and the result is cached on disk.
+    """
+    # A second attempt covers the file being evicted between encoding and sending.
+    for _ in range(2):
+        thumbnail_path = await run_io(thumbnails.get, video_id, keyframe.removesuffix(".jpg"), w)
+        if thumbnail_path is None:
+            raise HTTPException(status_code=404, detail="Keyframe not found")
+        try:
+            response = await RangeFileResponse.create(thumbnail_path, request.headers, media_type="image/jpeg", method=request.method)
+            break
+        except FileNotFoundError:
+            continue
     else:
-        # No range header, serve the entire file
-        def iter_file():
-            with open(video_path, 'rb') as f:
-                while True:
-                    chunk = f.read(8192)  # 8KB chunks
-                    if not chunk:
-                        break
-                    yield chunk
-        
-        headers = {
-            'Accept-Ranges': 'bytes',
-            'Content-Length': str(file_size),
-            'Content-Type': 'video/mp4',
-        }
-        
-        return StreamingResponse(
-            iter_file(),
-            status_code=200,
-            headers=headers
-        )
\ No newline at end of file
+        raise HTTPException(status_code=503, detail="Thumbnail cache is under pressure; retry.")
+    # A keyframe never changes at a given URL, so browsers need not revalidate.
+    response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
+@app.get("/api/thumbnails/stats", response_model=dict)
+async def thumbnail_stats(thumbnails: ThumbnailCache = Depends(get_thumbnails)):
+    """Endpoint to inspect the size of the thumbnail disk cache."""
+    return thumbnails.stats()
+
+@app.api_route("/api/sprites/{video_id}", methods=["GET", "HEAD"])
+async def get_sprite_index(video_id: str, request: Request):
+    """
+    Endpoint to get a video's sprite-sheet index: tile size, the sheets, and
+    for each keyframe (in mapping order) its sheet, pixel offset and
+    frame_index. 404 until build_sprite_sheets.py has run for the video.
+    """
+    directory = sprite_dir(settings.SPRITE_SHEETS_PATH, video_id)
+    try:
+        if directory is None:
+            raise FileNotFoundError(video_id)
+        response = await RangeFileResponse.create(directory / SPRITE_INDEX_FILE, request.headers, media_type="application/json", method=request.method)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="No sprite sheets for this video")
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+@app.api_route("/api/sprites/{video_id}/{sheet}", methods=["GET", "HEAD"])
+async def get_sprite_sheet(video_id: str, sheet: str, request: Request):
+    """Endpoint to serve one sprite sheet. Sheet names include a content hash, so they never change."""
+    path = sheet_path(settings.SPRITE_SHEETS_PATH, video_id, sheet)
+    try:
+        if path is None:
+            raise FileNotFoundError(sheet)
+        response = await RangeFileResponse.create(path, request.headers, media_type="image/jpeg", method=request.method)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Sprite sheet not found")
+    response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
@@ -0,0 +1,60 @@
+"""
+Recall@k vs. latency curve of the IVF index against exact local search.
+
+Builds a flat LocalVectorIndex on a synthetic corpus, trains IVF lists on it,
+then sweeps nprobe and reports recall of the approximate results relative to
+the exact (nprobe=0) results of the same index.
+
+    python benchmarks/bench_ann.py --videos 1200 --frames 250 --top-k 500
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.synthetic import make_corpus, make_queries, recall, time_calls, describe_latency
+from app.builder.local_index import LocalVectorIndex
+
+
+def as_keys(results):
+    return {(r.pack, r.video, r.frame) for r in results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--videos', type=int, default=800)
+    parser.add_argument('--frames', type=int, default=250)
+    parser.add_argument('--dim', type=int, default=512)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--top-k', type=int, default=500, help='Temporal search fetches top_k * 5 per sub-query.')
+    parser.add_argument('--nlist', type=int, default=0)
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32, 64, 128])
+    args = parser.parse_args()
+
+    features, mappings = make_corpus(args.videos, args.frames, args.dim)
+    queries = make_queries(features, args.queries)
+    total = sum(len(v) for v in features.values())
+    print(f"Synthetic corpus: {total} vectors x {args.dim}d, {args.queries} queries, top_k={args.top_k}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = LocalVectorIndex.build(Path(tmp), features, mappings)
+        start = time.perf_counter()
+        ivf = index.build_ivf(nlist=args.nlist)
+        print(f"IVF build: {ivf.nlist} lists in {time.perf_counter() - start:.2f}s")
+
+        exact, latencies = time_calls(lambda q: index.search_similar(q, top_k=args.top_k, nprobe=0), queries)
+        truth = [as_keys(r) for r in exact]
+        print(f"{'exact':>12s}  {describe_latency(latencies)}  recall@{args.top_k}=1.0000")
+
+        for nprobe in args.nprobe:
+            if nprobe > ivf.nlist:
+                break
+            results, latencies = time_calls(lambda q: index.search_similar(q, top_k=args.top_k, nprobe=nprobe), queries)
+            print(f"{f'nprobe={nprobe}':>12s}  {describe_latency(latencies)}  recall@{args.top_k}={recall([as_keys(r) for r in results], truth):.4f}")
+
+
+if __name__ == '__main__':
+    main()
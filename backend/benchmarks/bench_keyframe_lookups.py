@@ -0,0 +1,83 @@
+"""
+Keyframe lookups in DataLoader: row-by-row iterrows() against the columnar store.
+
+Times get_keyframes_for_video, the cached /api/video_keyframes body and
+get_all_keyframes over a synthetic corpus, next to the previous iterrows()
+implementations run on the same data.
+
+    python benchmarks/bench_keyframe_lookups.py --videos 1000 --frames 250
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.synthetic import make_metadata, time_calls, describe_latency
+from app.config import Settings
+from app.builder.data_loader import DataLoader
+from app.builder.metadata_store import MetadataStore
+
+
+def iterrows_keyframes_for_video(keyframe_mappings, video_id):
+    mapping_df = keyframe_mappings.get(video_id)
+    if mapping_df is None or mapping_df.empty:
+        return []
+    return [
+        {'keyframe_id': str(int(row['n'])).zfill(3), 'frame_index': int(row['frame_idx'])}
+        for _, row in mapping_df.iterrows()
+    ]
+
+
+def iterrows_all_keyframes(keyframe_mappings):
+    keyframes = set()
+    for video_id, mappings in keyframe_mappings.items():
+        for _, row in mappings.iterrows():
+            keyframes.add((video_id, str(int(row['n'])).zfill(3)))
+    return keyframes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--videos', type=int, default=1000)
+    parser.add_argument('--frames', type=int, default=250)
+    parser.add_argument('--lookups', type=int, default=300)
+    args = parser.parse_args()
+
+    video_metadata, keyframe_mappings = make_metadata(args.videos, args.frames)
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(CACHE_PATH=Path(tmp))
+        MetadataStore.write(Path(tmp) / 'metadata_store', video_metadata, keyframe_mappings)
+        data_loader = DataLoader(settings)
+        data_loader.load_all()
+
+        rng = np.random.default_rng(0)
+        video_ids = rng.choice(sorted(keyframe_mappings), size=args.lookups).tolist()
+        expected, old = time_calls(lambda v: iterrows_keyframes_for_video(keyframe_mappings, v), video_ids)
+        actual, new = time_calls(data_loader.get_keyframes_for_video, video_ids)
+        assert expected == actual
+        data_loader.get_keyframes_json(video_ids[0])
+        _, cached = time_calls(data_loader.get_keyframes_json, [video_ids[0]] * args.lookups)
+
+        print(f"{args.videos} videos x {args.frames} keyframes")
+        print(f"get_keyframes_for_video  iterrows   {describe_latency(old)}")
+        print(f"get_keyframes_for_video  columnar   {describe_latency(new)}")
+        print(f"video_keyframes body     cached     {describe_latency(cached)}")
+
+        start = time.perf_counter()
+        expected = iterrows_all_keyframes(keyframe_mappings)
+        old_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = data_loader.get_all_keyframes()
+        new_seconds = time.perf_counter() - start
+        assert expected == actual
+        print(f"get_all_keyframes        iterrows {old_seconds * 1000:9.1f}ms  columnar {new_seconds * 1000:9.1f}ms  "
+              f"({old_seconds / new_seconds:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Latency and recall of the in-process LocalVectorIndex against the Qdrant path.
+
+The Qdrant side runs through QdrantManager against a client of your choice:
+an in-memory qdrant-client by default, or a real server with --qdrant-url
+(e.g. the docker-compose `qdrant` service at http://localhost:6333).
+
+    python benchmarks/bench_local_index.py --videos 400 --frames 250 --top-k 100
+"""
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.synthetic import make_corpus, make_queries, exact_top_k, recall, time_calls, describe_latency
+from app.builder.database_manager import QdrantManager
+from app.builder.local_index import LocalVectorIndex
+
+
+def build_qdrant(features, mappings, url=None) -> QdrantManager:
+    from qdrant_client import QdrantClient, models
+
+    client = QdrantClient(url=url) if url else QdrantClient(location=':memory:')
+    collection = 'bench_keyframes'
+    dim = next(iter(features.values())).shape[1]
+    if client.collection_exists(collection):
+        client.delete_collection(collection)
+    client.create_collection(collection, vectors_config=models.VectorParams(size=dim, distance=models.Distance.COSINE))
+
+    point_id = 0
+    for video_id in sorted(features):
+        pack, video = video_id.split('_', 1)
+        vectors = features[video_id]
+        frame_idx = mappings[video_id]['frame_idx'].to_numpy()
+        points = []
+        for n, vector in enumerate(vectors, start=1):
+            points.append(models.PointStruct(
+                id=point_id,
+                vector=vector.tolist(),
+                payload={'pack': pack, 'video': video, 'frame': f"{n:03d}.jpg", 'frame_index': int(frame_idx[n - 1])}
+            ))
+            point_id += 1
+        client.upsert(collection, points=points, wait=True)
+    return QdrantManager(client=client, collection_name=collection)
+
+
+def as_keys(results):
+    return {(f"{r.pack}_{r.video}", int(r.frame[:-4])) for r in results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--videos', type=int, default=200)
+    parser.add_argument('--frames', type=int, default=250)
+    parser.add_argument('--dim', type=int, default=512)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--top-k', type=int, default=100)
+    parser.add_argument('--qdrant-url', default=None, help='Benchmark a running Qdrant server instead of in-memory mode.')
+    parser.add_argument('--skip-qdrant', action='store_true')
+    args = parser.parse_args()
+
+    features, mappings = make_corpus(args.videos, args.frames, args.dim)
+    queries = make_queries(features, args.queries)
+    truth = exact_top_k(features, queries, args.top_k)
+    total = sum(len(v) for v in features.values())
+    print(f"Synthetic corpus: {total} vectors x {args.dim}d across {len(features)} videos, {args.queries} queries, top_k={args.top_k}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for dtype in ('float32', 'float16'):
+            index = LocalVectorIndex.build(Path(tmp) / dtype, features, mappings, dtype=dtype)
+            results, latencies = time_calls(lambda q: index.search_similar(q, top_k=args.top_k), queries)
+            print(f"local[{dtype}]   {describe_latency(latencies)}  recall@{args.top_k}={recall([as_keys(r) for r in results], truth):.4f}")
+
+        if not args.skip_qdrant:
+            manager = build_qdrant(features, mappings, args.qdrant_url)
+            results, latencies = time_calls(lambda q: manager.search_similar(np.asarray(q), top_k=args.top_k), queries)
+            label = 'qdrant[server]' if args.qdrant_url else 'qdrant[memory]'
+            print(f"{label:16s}{describe_latency(latencies)}  recall@{args.top_k}={recall([as_keys(r) for r in results], truth):.4f}")
+
+
+if __name__ == '__main__':
+    main()
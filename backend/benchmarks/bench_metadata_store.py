@@ -0,0 +1,103 @@
+"""
+Startup time, RSS and per-video lookup latency of the DataLoader caches.
+
+Compares the legacy `data_cache.pkl` (a pickled dict of DataFrames) with the
+columnar memory-mapped MetadataStore. Each mode is measured in a fresh
+subprocess so RSS reflects only what loading that cache costs.
+
+    python benchmarks/bench_metadata_store.py --videos 3000 --frames 250
+"""
+import argparse
+import json
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.synthetic import make_metadata, describe_latency
+
+
+def rss_mb() -> float:
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return float('nan')
+
+
+def measure(mode: str, cache_dir: Path, lookups: int) -> dict:
+    """Runs inside the child process: load one cache and look up random videos."""
+    from app.builder.metadata_store import MetadataStore, KeyframeMappingView, VideoMetadataView
+
+    baseline = rss_mb()
+    start = time.perf_counter()
+    if mode == 'pickle':
+        with open(cache_dir / 'data_cache.pkl', 'rb') as f:
+            cache_data = pickle.load(f)
+        video_metadata, keyframe_mappings = cache_data['video_metadata'], cache_data['keyframe_mappings']
+    else:
+        store = MetadataStore(cache_dir / 'metadata_store')
+        video_metadata, keyframe_mappings = VideoMetadataView(store), KeyframeMappingView(store)
+    load_seconds = time.perf_counter() - start
+    loaded_rss = rss_mb()
+
+    rng = np.random.default_rng(0)
+    video_ids = list(keyframe_mappings)
+    latencies = []
+    for video_id in rng.choice(video_ids, size=lookups):
+        start = time.perf_counter()
+        frame_idx = keyframe_mappings[video_id]['frame_idx'].to_numpy()
+        video_metadata[video_id].get('watch_url')
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert len(frame_idx)
+
+    return {
+        'load_seconds': load_seconds,
+        'rss_delta_mb': loaded_rss - baseline,
+        'rss_after_lookups_mb': rss_mb() - baseline,
+        'lookup': describe_latency(np.array(latencies)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--videos', type=int, default=3000)
+    parser.add_argument('--frames', type=int, default=250)
+    parser.add_argument('--lookups', type=int, default=2000)
+    parser.add_argument('--child', choices=['pickle', 'store'], help=argparse.SUPPRESS)
+    parser.add_argument('--cache-dir', type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.cache_dir, args.lookups)))
+        return
+
+    from app.builder.metadata_store import MetadataStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp)
+        video_metadata, keyframe_mappings = make_metadata(args.videos, args.frames)
+        with open(cache_dir / 'data_cache.pkl', 'wb') as f:
+            pickle.dump({'video_metadata': video_metadata, 'keyframe_mappings': keyframe_mappings}, f)
+        MetadataStore.write(cache_dir / 'metadata_store', video_metadata, keyframe_mappings)
+        del video_metadata, keyframe_mappings
+
+        print(f"{args.videos} videos x {args.frames} keyframes")
+        for mode in ('pickle', 'store'):
+            output = subprocess.run(
+                [sys.executable, __file__, '--child', mode, '--cache-dir', str(cache_dir), '--lookups', str(args.lookups)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:7s} load={result['load_seconds'] * 1000:9.1f}ms  rss+={result['rss_delta_mb']:8.1f}MB  "
+                  f"rss+ after lookups={result['rss_after_lookups_mb']:8.1f}MB  lookup {result['lookup']}")
+
+
+if __name__ == '__main__':
+    main()
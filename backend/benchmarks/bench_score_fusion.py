@@ -0,0 +1,73 @@
+"""
+Cost of the Vietnamese re-ranking step of /api/search on large candidate sets:
+the former per-keyframe loop (one RetrievalResult per candidate, sorted by
+its video's text score) against vectorised fusion of the CLIP and text score
+columns with each strategy.
+
+Candidates are drawn from --videos videos with random CLIP scores; about half
+of the videos get a text score, as a restrictive Vietnamese query would.
+
+    python benchmarks/bench_score_fusion.py --candidates 1000 10000 100000
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.synthetic import describe_latency, time_calls
+from app.retrievers.base_retriever import RetrievalResult
+from app.retrievers.score_fusion import FUSION_STRATEGIES, fuse_results
+
+
+def loop_rerank(results, video_scores, top_k):
+    """The re-ranking /api/search did before score fusion."""
+    candidate_keyframes = {(res['video'], res['frame'], res['frame_index']) for res in results}
+    final_results = []
+    for video_id, keyframe_n, keyframe_index in candidate_keyframes:
+        if video_id in video_scores:
+            final_results.append(RetrievalResult(
+                video_id=video_id,
+                keyframe_index=keyframe_index,
+                keyframe_id=keyframe_n,
+                similarity_score=video_scores[video_id],
+                additional_info={"retriever": "weaviate"}
+            ))
+    final_results.sort(key=lambda x: x.similarity_score, reverse=True)
+    return [
+        {"video": res.video_id, "frame": res.keyframe_id, "frame_index": res.keyframe_index, "similarity_score": res.similarity_score}
+        for res in final_results[:top_k]
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--candidates', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--videos', type=int, default=2000)
+    parser.add_argument('--top-k', type=int, default=100)
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    video_ids = [f'L{i // 100:02d}_V{i % 100:03d}' for i in range(args.videos)]
+    video_scores = {video_id: float(rng.random()) for video_id in video_ids if rng.random() < 0.5}
+
+    for n in args.candidates:
+        videos = rng.choice(video_ids, size=n)
+        results = [
+            {"video": video_id, "frame": f'{i:03d}.jpg', "frame_index": i, "similarity_score": float(score)}
+            for i, (video_id, score) in enumerate(zip(videos.tolist(), rng.random(n)))
+        ]
+        inputs = [results] * args.repeats
+        print(f"candidates={n}")
+        _, latencies = time_calls(lambda r: loop_rerank(r, video_scores, args.top_k), inputs)
+        print(f"  {'loop':10s} {describe_latency(latencies)}")
+        for strategy in FUSION_STRATEGIES:
+            _, latencies = time_calls(lambda r: fuse_results(r, video_scores, 'similarity_score', args.top_k, strategy), inputs)
+            print(f"  {strategy:10s} {describe_latency(latencies)}")
+
+
+if __name__ == '__main__':
+    main()
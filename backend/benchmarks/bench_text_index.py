@@ -0,0 +1,81 @@
+"""
+Build time and query latency of the in-process LocalTextIndex (BM25 + dense)
+used for the Vietnamese metadata filter instead of a Weaviate round-trip.
+
+Documents come from make_metadata with a few topic words mixed in, and a
+hashed bag-of-words projection stands in for MiniLM so the benchmark needs
+no model. Latency is measured per query for candidate sets of several sizes,
+which is how /api/search calls it (the videos of the CLIP results).
+
+    python benchmarks/bench_text_index.py --videos 5000 --queries 200
+"""
+import argparse
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.synthetic import make_metadata, describe_latency
+from app.builder.text_index import LocalTextIndex
+from app.utils.text_processing import tokenize
+
+TOPICS = ['bão lũ', 'giá vàng', 'bóng đá', 'giao thông', 'y tế', 'giáo dục', 'du lịch', 'nông nghiệp', 'chứng khoán', 'công nghệ']
+
+
+def make_encoder(dim: int = 384, seed: int = 0):
+    projection = np.random.default_rng(seed).normal(size=(1 << 14, dim)).astype(np.float32)
+
+    def encode(texts):
+        out = np.zeros((len(texts), dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for token in tokenize(text):
+                out[i] += projection[zlib.crc32(token.encode('utf-8')) & ((1 << 14) - 1)]
+        return out
+    return encode
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--videos', type=int, default=5000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--candidates', type=int, nargs='+', default=[50, 500, 0], help='Candidate videos per query (0 = all).')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    video_metadata, _ = make_metadata(args.videos, frames_per_video=1)
+    for metadata in video_metadata.values():
+        topics = rng.choice(TOPICS, size=2, replace=False)
+        metadata['title'] += f' {topics[0]}'
+        metadata['keywords'] = metadata['keywords'] + list(topics)
+    encode = make_encoder()
+    video_ids = sorted(video_metadata)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        index = LocalTextIndex.build(Path(tmp) / 'text_index', video_metadata, encode, 'hashed-bow')
+        build_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        LocalTextIndex.load_or_build(Path(tmp) / 'text_index', video_metadata, encode, 'hashed-bow')
+        reopen_seconds = time.perf_counter() - start
+        print(f"{args.videos} videos, {len(index.vocab)} terms, {index.manifest['postings']} postings")
+        print(f"build={build_seconds:.2f}s (incl. encoding)  reopen+fingerprint={reopen_seconds * 1000:.1f}ms")
+
+        queries = [f'{rng.choice(TOPICS)} {rng.choice(TOPICS)}' for _ in range(args.queries)]
+        query_vectors = encode(queries)
+        for n_candidates in args.candidates:
+            latencies = []
+            for query, query_vector in zip(queries, query_vectors):
+                candidates = None if not n_candidates else set(rng.choice(video_ids, size=min(n_candidates, len(video_ids)), replace=False).tolist())
+                start = time.perf_counter()
+                index.search(query, query_vector, video_ids=candidates)
+                latencies.append((time.perf_counter() - start) * 1000)
+            print(f"candidates={n_candidates or args.videos:6d}  {describe_latency(np.array(latencies))}")
+
+
+if __name__ == '__main__':
+    main()
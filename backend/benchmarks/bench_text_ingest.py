@@ -0,0 +1,87 @@
+"""
+Throughput and peak memory of indexing video metadata text: the former
+WeaviateIndexer loop (one encode per video, every object collected before
+the batch insert) against the streaming TextIndexingPipeline.
+
+The encoder is simulated with a fixed cost per forward pass plus a cost per
+text, which is how a sentence-transformer behaves on CPU, and returns
+random 384-d vectors. Inserts go to a CountingSink that sleeps per batch like
+a network round-trip. Peak memory is measured with tracemalloc, so compare
+runs with different --videos to see whether it grows with the corpus.
+
+    python benchmarks/bench_text_ingest.py --videos 2000 20000
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.synthetic import make_metadata
+from app.builder.indexing_pipeline import CountingSink, DocumentBatch, TextIndexingPipeline
+from app.utils.text_processing import video_text_document
+
+
+def make_encoder(call_ms: float, per_text_ms: float, dim: int = 384):
+    rng = np.random.default_rng(0)
+
+    def encode(texts):
+        time.sleep((call_ms + per_text_ms * len(texts)) / 1000)
+        return rng.random((len(texts), dim), dtype=np.float32)
+    return encode
+
+
+def loop_index(video_metadata, encode, sink, insert_batch):
+    objects = []
+    for video_id, metadata in video_metadata.items():
+        document = video_text_document(metadata)
+        objects.append((video_id, document, encode([document['content']])[0].tolist()))
+    for start in range(0, len(objects), insert_batch):
+        chunk = objects[start:start + insert_batch]
+        sink(DocumentBatch([o[0] for o in chunk], [o[1] for o in chunk], np.array([o[2] for o in chunk])))
+    return len(objects)
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    documents = fn()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return documents, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--videos', type=int, nargs='+', default=[2000, 20000])
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--call-ms', type=float, default=5.0, help='Simulated fixed cost of one forward pass.')
+    parser.add_argument('--per-text-ms', type=float, default=0.2, help='Simulated cost per encoded text.')
+    parser.add_argument('--insert-ms', type=float, default=50.0, help='Simulated latency of one batch insert.')
+    parser.add_argument('--skip-loop-above', type=int, default=5000, help='Only time the per-video loop on corpora up to this size.')
+    args = parser.parse_args()
+
+    encode = make_encoder(args.call_ms, args.per_text_ms)
+    for n_videos in args.videos:
+        video_metadata, _ = make_metadata(n_videos, frames_per_video=1)
+        print(f"videos={n_videos}")
+        if n_videos <= args.skip_loop_above:
+            sink = CountingSink(args.insert_ms / 1000)
+            documents, seconds, peak = measure(lambda: loop_index(video_metadata, encode, sink, args.batch_size))
+            print(f"  {'loop':9s} {documents / seconds:9.1f} docs/s  peak={peak / 1e6:7.1f} MB")
+
+        sink = CountingSink(args.insert_ms / 1000)
+        pipeline = TextIndexingPipeline(encode, sink, batch_size=args.batch_size, normalize_workers=args.workers, report_every_seconds=3600)
+        documents, seconds, peak = measure(lambda: pipeline.run(video_metadata.items()).documents)
+        print(f"  {'pipeline':9s} {documents / seconds:9.1f} docs/s  peak={peak / 1e6:7.1f} MB  "
+              f"(encode {pipeline.stats.encode_seconds:.1f}s, insert {pipeline.stats.insert_seconds:.1f}s, max queue {pipeline.stats.max_queue_depth})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Result-grid page weight and thumbnail latency of ThumbnailCache.
+
+Writes synthetic 1280x720 keyframes, then compares the bytes a grid of
+`--results` images downloads at full resolution with the bytes at each
+thumbnail width, and times cold (encode) and warm (cache hit) lookups and a
+bulk pre-generation pass.
+
+    python benchmarks/bench_thumbnails.py --videos 20 --frames 50 --results 100
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.synthetic import describe_latency
+
+
+def write_keyframes(root: Path, n_videos: int, frames_per_video: int, seed: int = 0) -> list:
+    """Smooth gradients plus sensor-like noise, so JPEG sizes resemble real frames."""
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:720, 0:1280].astype(np.float32)
+    keyframes = []
+    for v in range(n_videos):
+        video_id = f"L01_V{v + 1:03d}"
+        (root / video_id).mkdir(parents=True)
+        for f in range(frames_per_video):
+            base = rng.uniform(0, 255, size=3)
+            slope = rng.uniform(-0.1, 0.1, size=(2, 3))
+            image = base + xx[..., None] * slope[0] + yy[..., None] * slope[1] + rng.normal(0, 12, size=(720, 1280, 3))
+            Image.fromarray(np.clip(image, 0, 255).astype(np.uint8)).save(root / video_id / f"{f + 1:03d}.jpg", quality=90)
+            keyframes.append((video_id, f"{f + 1:03d}"))
+    return keyframes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--videos', type=int, default=20)
+    parser.add_argument('--frames', type=int, default=50)
+    parser.add_argument('--results', type=int, default=100, help='Images in one result grid.')
+    parser.add_argument('--widths', type=int, nargs='+', default=[160, 320, 640])
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    from app.utils.thumbnails import ThumbnailCache
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source_dir, cache_dir = Path(tmp) / 'keyframes', Path(tmp) / 'thumbnails'
+        keyframes = write_keyframes(source_dir, args.videos, args.frames)
+        grid = [keyframes[i] for i in np.random.default_rng(1).choice(len(keyframes), size=min(args.results, len(keyframes)), replace=False)]
+        full_bytes = sum((source_dir / video_id / f"{keyframe}.jpg").stat().st_size for video_id, keyframe in grid)
+        print(f"{len(keyframes)} keyframes; grid of {len(grid)} results at full resolution: {full_bytes / 1e6:7.2f} MB")
+
+        cache = ThumbnailCache(source_dir, cache_dir, args.widths, max_bytes=10 * 1024 ** 3)
+        for width in args.widths:
+            cold, warm, grid_bytes = [], [], 0
+            for video_id, keyframe in grid:
+                start = time.perf_counter()
+                path = cache.get(video_id, keyframe, width)
+                cold.append((time.perf_counter() - start) * 1000)
+                grid_bytes += path.stat().st_size
+            for video_id, keyframe in grid:
+                start = time.perf_counter()
+                cache.get(video_id, keyframe, width)
+                warm.append((time.perf_counter() - start) * 1000)
+            print(f"w={width:4d}  grid={grid_bytes / 1e6:6.2f} MB ({full_bytes / grid_bytes:5.1f}x smaller)  "
+                  f"encode {describe_latency(np.array(cold))}  hit {describe_latency(np.array(warm))}")
+
+        cache = ThumbnailCache(source_dir, Path(tmp) / 'pregenerated', args.widths, max_bytes=10 * 1024 ** 3)
+        start = time.perf_counter()
+        report = cache.pregenerate(sorted({video_id for video_id, _ in keyframes}), num_workers=args.workers)
+        seconds = time.perf_counter() - start
+        print(f"pregenerate: {report.generated} thumbnails ({report.bytes / 1e6:.1f} MB) in {seconds:.2f}s "
+              f"= {report.generated / seconds:.0f}/s with {args.workers} workers")
+
+
+if __name__ == '__main__':
+    main()
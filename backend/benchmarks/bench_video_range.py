@@ -0,0 +1,174 @@
+"""
+Throughput and server CPU of /api/video-style range serving under many
+concurrent seeking clients.
+
+Compares the previous endpoint (a StreamingResponse generator reading 8 KB
+chunks) with RangeFileResponse. Each mode runs uvicorn in a subprocess over
+the same synthetic video file; clients repeatedly request a random
+`bytes=start-end` window, like a player scrubbing through a video. Server CPU
+is read from /proc/<pid>/stat, so the CPU figures include the event loop and
+the worker threads.
+
+    python benchmarks/bench_video_range.py --clients 64 --seconds 10 --range-kb 1024
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+
+def build_app(mode: str, video_path: Path):
+    from fastapi import FastAPI, Request
+    from fastapi.responses import StreamingResponse
+    from app.utils.file_response import RangeFileResponse
+
+    app = FastAPI()
+
+    @app.get('/video')
+    async def video(request: Request):
+        if mode == 'range':
+            return RangeFileResponse(video_path, request.headers, media_type='video/mp4', method=request.method)
+
+        # The endpoint as it was before RangeFileResponse.
+        file_size = video_path.stat().st_size
+        range_match = request.headers.get('range').replace('bytes=', '').split('-')
+        start = int(range_match[0]) if range_match[0] else 0
+        end = min(file_size - 1, int(range_match[1]) if range_match[1] else file_size - 1)
+        content_length = end - start + 1
+
+        def iter_file_range():
+            with open(video_path, 'rb') as f:
+                f.seek(start)
+                remaining = content_length
+                while remaining:
+                    chunk = f.read(min(8192, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    yield chunk
+
+        headers = {
+            'Content-Range': f'bytes {start}-{end}/{file_size}',
+            'Accept-Ranges': 'bytes',
+            'Content-Length': str(content_length),
+            'Content-Type': 'video/mp4',
+        }
+        return StreamingResponse(iter_file_range(), status_code=206, headers=headers)
+
+    return app
+
+
+def serve(mode: str, video_path: Path, port: int):
+    """Runs inside the child process."""
+    import uvicorn
+    uvicorn.run(build_app(mode, video_path), host='127.0.0.1', port=port, log_level='warning', access_log=False)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def cpu_seconds(pid: int) -> float:
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    # utime and stime are fields 14 and 15; the split drops the first two.
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+async def wait_until_up(url: str, timeout: float = 30.0):
+    import httpx
+    deadline = time.time() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.time() < deadline:
+            try:
+                await client.get(url, headers={'Range': 'bytes=0-0'})
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError(f'server at {url} did not start')
+
+
+async def run_clients(url: str, file_size: int, clients: int, seconds: float, range_bytes: int) -> dict:
+    import httpx
+
+    stats = {'requests': 0, 'bytes': 0, 'errors': 0}
+    deadline = time.perf_counter() + seconds
+
+    async def seeker(seed: int, client):
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            start = rng.randrange(0, file_size - range_bytes)
+            try:
+                r = await client.get(url, headers={'Range': f'bytes={start}-{start + range_bytes - 1}'})
+                if r.status_code != 206 or len(r.content) != range_bytes:
+                    stats['errors'] += 1
+                    continue
+            except httpx.HTTPError:
+                stats['errors'] += 1
+                continue
+            stats['requests'] += 1
+            stats['bytes'] += range_bytes
+
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(seeker(i, client) for i in range(clients)))
+        stats['seconds'] = time.perf_counter() - start
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--file-mb', type=int, default=512)
+    parser.add_argument('--clients', type=int, default=64)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--range-kb', type=int, default=1024, help='Bytes fetched per seek.')
+    parser.add_argument('--serve', choices=['stream', 'range'], help=argparse.SUPPRESS)
+    parser.add_argument('--video', type=Path, help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.video, args.port)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video_path = Path(tmp) / 'video.mp4'
+        with open(video_path, 'wb') as f:
+            for _ in range(args.file_mb):
+                f.write(os.urandom(1024 * 1024))
+        file_size = video_path.stat().st_size
+        range_bytes = args.range_kb * 1024
+
+        print(f"{args.file_mb} MB file, {args.clients} clients seeking {args.range_kb} KB windows for {args.seconds:.0f}s")
+        for mode in ('stream', 'range'):
+            port = free_port()
+            server = subprocess.Popen([sys.executable, __file__, '--serve', mode, '--video', str(video_path), '--port', str(port)])
+            try:
+                url = f'http://127.0.0.1:{port}/video'
+                asyncio.run(wait_until_up(url))
+                cpu_before = cpu_seconds(server.pid)
+                stats = asyncio.run(run_clients(url, file_size, args.clients, args.seconds, range_bytes))
+                cpu = cpu_seconds(server.pid) - cpu_before
+            finally:
+                server.terminate()
+                server.wait()
+
+            mb = stats['bytes'] / 1024 / 1024
+            print(f"{mode:7s} {mb / stats['seconds']:8.1f} MB/s  {stats['requests'] / stats['seconds']:8.1f} req/s  "
+                  f"server cpu={cpu / stats['seconds'] * 100:6.1f}%  cpu/stream={cpu / stats['seconds'] / args.clients * 1000:6.2f}ms/s  "
+                  f"cpu/GB={cpu / max(mb / 1024, 1e-9):6.2f}s  errors={stats['errors']}")
+
+
+if __name__ == '__main__':
+    main()
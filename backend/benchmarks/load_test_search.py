@@ -0,0 +1,91 @@
+"""
+Concurrent /api/search load test against a running backend.
+
+For each concurrency level, N clients issue searches back to back for a fixed
+duration while a probe polls /api/health. Throughput should scale with
+concurrency, and the health probe latency should stay flat, because blocking
+model and database calls no longer run on the event loop.
+
+    python benchmarks/load_test_search.py --url http://localhost:8000 --concurrency 1 2 4 8 16
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+import numpy as np
+
+QUERIES = [
+    "a man riding a motorbike on a busy street",
+    "firefighters spraying water on a burning house",
+    "a news anchor sitting at a desk",
+    "children playing football in a schoolyard",
+    "a boat on a river at sunset",
+    "people wearing masks in a hospital",
+    "a crowd at a concert with stage lights",
+    "an aerial view of rice fields",
+]
+
+
+def make_payload(top_k: int, unique: bool) -> dict:
+    query = random.choice(QUERIES)
+    if unique:
+        # Defeat the result and embedding caches so every request does real work.
+        query = f"{query} {random.randint(0, 10**9)}"
+    return {"queries": [query], "retriever": "clip", "filters": {}, "top_k": top_k}
+
+
+async def client_loop(client: httpx.AsyncClient, url: str, deadline: float, top_k: int, unique: bool, latencies: list, errors: list):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.post(f"{url}/api/search", json=make_payload(top_k, unique), headers={"X-Cache-Bypass": "1"} if unique else None)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+        except httpx.HTTPError as e:
+            errors.append(str(e))
+
+
+async def health_probe(client: httpx.AsyncClient, url: str, deadline: float, latencies: list):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            await client.get(f"{url}/api/health")
+            latencies.append(time.perf_counter() - start)
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.05)
+
+
+async def run_level(url: str, concurrency: int, duration: float, top_k: int, unique: bool):
+    latencies, errors, probe_latencies = [], [], []
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(
+            health_probe(client, url, deadline, probe_latencies),
+            *(client_loop(client, url, deadline, top_k, unique, latencies, errors) for _ in range(concurrency))
+        )
+    latencies_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    probe_ms = np.array(probe_latencies) * 1000 if probe_latencies else np.zeros(1)
+    print(f"concurrency={concurrency:3d}  throughput={len(latencies) / duration:7.2f} req/s  "
+          f"p50={np.percentile(latencies_ms, 50):8.1f}ms  p95={np.percentile(latencies_ms, 95):8.1f}ms  "
+          f"health p95={np.percentile(probe_ms, 95):7.1f}ms  errors={len(errors)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--duration', type=float, default=15.0, help='Seconds per concurrency level.')
+    parser.add_argument('--top-k', type=int, default=100)
+    parser.add_argument('--cached', action='store_true', help='Allow cache hits instead of forcing unique queries.')
+    args = parser.parse_args()
+
+    for concurrency in args.concurrency:
+        asyncio.run(run_level(args.url, concurrency, args.duration, args.top_k, unique=not args.cached))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Synthetic CLIP-like corpora shared by the benchmark scripts."""
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+PACKS = [f"K{i:02d}" for i in range(1, 21)] + [f"L{i:02d}" for i in range(21, 33)]
+
+
+def make_corpus(n_videos: int = 200, frames_per_video: int = 250, dim: int = 512, n_topics: int = 64, seed: int = 0) -> Tuple[Dict[str, np.ndarray], Dict[str, pd.DataFrame]]:
+    """
+    Clustered unit vectors grouped into videos, mimicking clip-features-32.
+
+    Each video drifts around a few topic centroids so that nearest neighbours
+    are concentrated in a handful of videos, like real keyframe features.
+    """
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((n_topics, dim)).astype(np.float32)
+    features, mappings = {}, {}
+    for i in range(n_videos):
+        video_id = f"{PACKS[i % len(PACKS)]}_V{i // len(PACKS) + 1:03d}"
+        video_topics = topics[rng.integers(0, n_topics, size=3)]
+        weights = rng.dirichlet(np.ones(3), size=frames_per_video).astype(np.float32)
+        vectors = weights @ video_topics + 0.6 * rng.standard_normal((frames_per_video, dim)).astype(np.float32)
+        features[video_id] = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        frame_idx = np.sort(rng.choice(frames_per_video * 40, size=frames_per_video, replace=False))
+        mappings[video_id] = pd.DataFrame({
+            'n': np.arange(1, frames_per_video + 1),
+            'pts_time': frame_idx / 25.0,
+            'fps': 25.0,
+            'frame_idx': frame_idx,
+        })
+    return features, mappings
+
+
+def make_queries(features: Dict[str, np.ndarray], n_queries: int = 100, noise: float = 0.8, seed: int = 1) -> np.ndarray:
+    """Noisy copies of random corpus vectors, normalised."""
+    rng = np.random.default_rng(seed)
+    matrix = np.concatenate(list(features.values()))
+    picks = matrix[rng.integers(0, len(matrix), size=n_queries)]
+    queries = picks + noise * rng.standard_normal(picks.shape).astype(np.float32) / np.sqrt(picks.shape[1])
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def exact_top_k(features: Dict[str, np.ndarray], queries: np.ndarray, k: int) -> List[set]:
+    """Ground-truth (video_id, keyframe_n) sets per query using float32 brute force."""
+    video_ids = sorted(features)
+    matrix = np.concatenate([features[v] for v in video_ids])
+    keys = [(v, n + 1) for v in video_ids for n in range(len(features[v]))]
+    scores = queries @ matrix.T
+    top = np.argsort(-scores, axis=1)[:, :k]
+    return [{keys[row] for row in rows} for rows in top]
+
+
+def recall(results: List[set], truth: List[set]) -> float:
+    return float(np.mean([len(r & t) / max(len(t), 1) for r, t in zip(results, truth)]))
+
+
+def time_calls(fn, inputs) -> Tuple[list, np.ndarray]:
+    """Run fn over inputs, returning outputs and per-call latencies in ms."""
+    outputs, latencies = [], []
+    for item in inputs:
+        start = time.perf_counter()
+        outputs.append(fn(item))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return outputs, np.array(latencies)
+
+
+def describe_latency(latencies: np.ndarray) -> str:
+    return f"p50={np.percentile(latencies, 50):7.2f}ms  p95={np.percentile(latencies, 95):7.2f}ms  mean={latencies.mean():7.2f}ms"
+
+
+def make_metadata(n_videos: int = 1000, frames_per_video: int = 250, seed: int = 0) -> Tuple[Dict[str, dict], Dict[str, pd.DataFrame]]:
+    """media-info documents and map-keyframes tables shaped like the dataset's."""
+    rng = np.random.default_rng(seed)
+    video_metadata, mappings = {}, {}
+    for i in range(n_videos):
+        video_id = f"{PACKS[i % len(PACKS)]}_V{i // len(PACKS) + 1:03d}"
+        video_metadata[video_id] = {
+            'author': f'Channel {i % 17}',
+            'channel_id': f'UC{i:022d}',
+            'channel_url': f'https://www.youtube.com/channel/UC{i:022d}',
+            'description': 'Tin tức thời sự ' * 20,
+            'keywords': ['tin tức', 'thời sự', f'kênh {i % 17}'],
+            'length': int(rng.integers(300, 1800)),
+            'publish_date': '01/08/2024',
+            'thumbnail_url': f'https://i.ytimg.com/vi/{i:011d}/hqdefault.jpg',
+            'title': f'Bản tin {i}',
+            'watch_url': f'https://youtube.com/watch?v={i:011d}',
+        }
+        frame_idx = np.sort(rng.choice(frames_per_video * 40, size=frames_per_video, replace=False))
+        mappings[video_id] = pd.DataFrame({
+            'n': np.arange(1, frames_per_video + 1),
+            'pts_time': frame_idx / 25.0,
+            'fps': 25.0,
+            'frame_idx': frame_idx,
+        })
+    return video_metadata, mappings
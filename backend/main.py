@@ -1,12 +1,52 @@
+import argparse
+import time
+
 import uvicorn
 from app.config import settings
-from app.web_server import app
+
+
+def profile_startup():
+    """Runs the server's startup stages in-process and prints a per-phase timing breakdown."""
+    t0 = time.time()
+    from app import web_server
+    from app.utils.startup import StartupStages
+    import_seconds = time.time() - t0
+
+    stages = StartupStages(web_server.STARTUP_STAGES)
+    web_server.load_stages(web_server.DataLoader(settings), stages)
+    total_seconds = time.time() - t0
+
+    print(f"\n{'phase':<16}{'start':>9}{'end':>9}{'took':>9}  state")
+    print(f"{'import':<16}{0.0:>8.2f}s{import_seconds:>8.2f}s{import_seconds:>8.2f}s  ready")
+    ready_at = import_seconds
+    for name, stage in sorted(stages.snapshot().items(), key=lambda item: item[1].get("started_at", float("inf"))):
+        start = stage.get("started_at", t0) - t0
+        took = stage.get("seconds", 0.0)
+        if name == "metadata":
+            ready_at = start + took
+        print(f"{name:<16}{start:>8.2f}s{start + took:>8.2f}s{took:>8.2f}s  {stage['state']}{'  ' + stage['error'] if stage.get('error') else ''}")
+    print(f"\ntime to ready (FAST_START): {ready_at:.2f}s")
+    print(f"all stages settled:         {total_seconds:.2f}s")
+
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "app.web_server:app",  # Pass the app as an import string for reload/workers
-        host=settings.HOST,
-        port=settings.PORT,
-        reload=settings.RELOAD,
-        workers=settings.WORKERS,
-    )
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the video search backend.")
+    parser.add_argument("--profile-startup", action="store_true", help="Load everything once, print how long each startup phase took, and exit.")
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        profile_startup()
+    else:
+        server_options = {}
+        if settings.ZERO_COPY_SEND:
+            from app.utils.zerocopy import ZeroCopyHttpToolsProtocol
+
+            server_options = {"http": ZeroCopyHttpToolsProtocol, "loop": "asyncio"}
+        uvicorn.run(
+            "app.web_server:app",  # Pass the app as an import string for reload/workers
+            host=settings.HOST,
+            port=settings.PORT,
+            reload=settings.RELOAD,
+            workers=settings.WORKERS,
+            **server_options
+        )
@@ -0,0 +1,59 @@
+import sqlite3
+
+import numpy as np
+
+from app.embedding import embedding_store
+from app.embedding.embedding_store import EmbeddingStore
+
+
+def vector(value):
+    return np.full(4, value, dtype=np.float32)
+
+
+def test_max_rows_drops_least_recently_used(tmp_path, monkeypatch):
+    clock = iter(range(100))
+    monkeypatch.setattr(embedding_store.time, 'time', lambda: float(next(clock)))
+    store = EmbeddingStore(tmp_path / 'e.sqlite3', max_rows=2)
+    store.put_many([('a', vector(1))])
+    store.put_many([('b', vector(2))])
+    assert set(store.get_many(['a'])) == {'a'}  # 'a' is now more recent than 'b'
+    store.put_many([('c', vector(3))])
+    assert len(store) == 2
+    assert set(store.get_many(['a', 'b', 'c'])) == {'a', 'c'}
+
+
+def test_ttl_expires_rows(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(embedding_store.time, 'time', lambda: now[0])
+    store = EmbeddingStore(tmp_path / 'e.sqlite3', ttl_seconds=60)
+    store.put_many([('a', vector(1))])
+    now[0] += 30
+    assert 'a' in store.get_many(['a'])
+    now[0] += 61
+    assert store.get_many(['a']) == {}
+    store.put_many([('b', vector(2))])
+    assert len(store) == 1
+
+
+def test_tables_are_independent(tmp_path):
+    queries = EmbeddingStore(tmp_path / 'e.sqlite3', max_rows=1)
+    documents = EmbeddingStore(tmp_path / 'e.sqlite3', table='document_embeddings')
+    documents.put_many([(f'd{i}', vector(i)) for i in range(5)])
+    queries.put_many([('q', vector(9))])
+    assert len(documents) == 5 and len(queries) == 1
+    assert np.array_equal(queries.get_many(['q'])['q'], vector(9))
+
+
+def test_legacy_file_is_migrated_and_pruned_first(tmp_path):
+    path = tmp_path / 'e.sqlite3'
+    conn = sqlite3.connect(str(path))
+    conn.execute('CREATE TABLE embeddings (key TEXT PRIMARY KEY, dim INTEGER NOT NULL, vector BLOB NOT NULL)')
+    conn.executemany('INSERT INTO embeddings VALUES (?, 4, ?)', [(f'old{i}', vector(i).tobytes()) for i in range(3)])
+    conn.commit()
+    conn.close()
+
+    store = EmbeddingStore(path, max_rows=3)
+    assert len(store) == 3
+    store.put_many([('new', vector(7))])
+    assert len(store) == 3
+    assert 'new' in store.get_many(['new'])
@@ -0,0 +1,185 @@
+import asyncio
+import os
+import socket
+import threading
+import time
+
+import httpx
+import pytest
+import uvicorn
+from starlette.applications import Starlette
+from starlette.routing import Route
+
+from app.utils import zerocopy
+from app.utils.file_response import RangeFileResponse, parse_range_header
+from app.utils.zerocopy import ZeroCopyHttpToolsProtocol
+
+CONTENT = bytes(range(256)) * 40  # 10240 bytes
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('bytes=0-99', [(0, 99)]),
+    ('bytes=100-', [(100, 10239)]),
+    ('bytes=-100', [(10140, 10239)]),
+    ('bytes=-20000', [(0, 10239)]),
+    ('bytes=0-99999', [(0, 10239)]),
+    ('bytes=0-9, 5-19, 30-39', [(0, 19), (30, 39)]),
+    ('bytes=20-29,10-19', [(10, 29)]),
+    ('bytes=20000-', []),
+    ('bytes=-0', []),
+    ('bytes=10-5', None),
+    ('bytes=abc', None),
+    ('items=0-9', None),
+    ('bytes=', None),
+])
+def test_parse_range_header(header, expected):
+    assert parse_range_header(header, len(CONTENT)) == expected
+
+
+def test_parse_range_header_on_empty_file():
+    assert parse_range_header('bytes=-5', 0) == []
+    assert parse_range_header('bytes=0-', 0) == []
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / 'video.mp4'
+    path.write_bytes(CONTENT)
+    return path
+
+
+def serve(response, extensions):
+    """Run a response against a fake server advertising `extensions`; returns the messages sent."""
+    messages = []
+
+    async def receive():
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.zerocopysend':
+            file = message['file']
+            message = {**message, 'bytes': os.pread(file.fileno(), message['count'], message['offset'])}
+        messages.append(message)
+
+    scope = {'type': 'http', 'method': 'GET', 'headers': [], 'extensions': extensions}
+    asyncio.run(response(scope, receive, send))
+    return messages
+
+
+def body_of(messages):
+    return b''.join(message.get('body', message.get('bytes', b'')) for message in messages[1:])
+
+
+def make_response(path, range_header=None):
+    headers = {'range': range_header} if range_header else {}
+    return asyncio.run(RangeFileResponse.create(path, headers, media_type='video/mp4'))
+
+
+def test_pathsend_branch_sends_whole_files_by_path(video):
+    messages = serve(make_response(video), {'http.response.pathsend': {}, 'http.response.zerocopysend': {}})
+    assert messages[0]['status'] == 200
+    assert messages[1:] == [{'type': 'http.response.pathsend', 'path': str(video)}]
+
+
+def test_pathsend_is_not_used_for_ranges(video):
+    messages = serve(make_response(video, 'bytes=10-19'), {'http.response.pathsend': {}})
+    assert messages[0]['status'] == 206
+    assert body_of(messages) == CONTENT[10:20]
+    assert all(message['type'] != 'http.response.pathsend' for message in messages)
+
+
+def test_zerocopysend_branch(video):
+    messages = serve(make_response(video, 'bytes=0-9,100-199'), {'http.response.zerocopysend': {}})
+    sends = [message for message in messages if message['type'] == 'http.response.zerocopysend']
+    assert [(m['offset'], m['count'], m['more_body']) for m in sends] == [(0, 10, True), (100, 100, True)]
+    assert messages[-1] == {'type': 'http.response.body', 'body': messages[-1]['body'], 'more_body': False}
+    body = body_of(messages)
+    assert CONTENT[0:10] in body and CONTENT[100:200] in body
+    assert len(body) == int(dict(messages[0]['headers'])[b'content-length'])
+
+
+def test_pread_branch_streams_in_chunks(video):
+    messages = serve(make_response(video, 'bytes=-5000'), {})
+    assert messages[0]['status'] == 206
+    assert all(message['type'] == 'http.response.body' for message in messages[1:])
+    assert body_of(messages) == CONTENT[-5000:]
+    assert messages[-1]['more_body'] is False
+
+
+def test_unsatisfiable_and_empty_files(tmp_path, video):
+    messages = serve(make_response(video, 'bytes=20000-'), {})
+    assert messages[0]['status'] == 416
+    empty = tmp_path / 'empty.mp4'
+    empty.write_bytes(b'')
+    messages = serve(make_response(empty, 'bytes=-5'), {})
+    assert messages[0]['status'] == 416
+    assert (b'content-range', b'bytes */0') in messages[0]['headers']
+
+
+def test_create_rejects_missing_files_and_directories(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        make_response(tmp_path / 'missing.mp4')
+    with pytest.raises(FileNotFoundError):
+        make_response(tmp_path)
+
+
+@pytest.fixture
+def zerocopy_server(video, monkeypatch):
+    """A real uvicorn server running ZeroCopyHttpToolsProtocol, counting sendfile(2) calls."""
+    calls = []
+    real_sendfile = os.sendfile
+
+    def counting_sendfile(*args):
+        calls.append(args)
+        return real_sendfile(*args)
+
+    monkeypatch.setattr(os, 'sendfile', counting_sendfile)
+
+    async def endpoint(request):
+        return await RangeFileResponse.create(video, request.headers, media_type='video/mp4', method=request.method)
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    config = uvicorn.Config(Starlette(routes=[Route('/video', endpoint, methods=['GET', 'HEAD'])]), host='127.0.0.1', port=port,
+                            http=ZeroCopyHttpToolsProtocol, loop='asyncio', lifespan='off', log_level='warning')
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started and time.monotonic() < deadline:
+        time.sleep(0.01)
+    yield f'http://127.0.0.1:{port}/video', calls
+    server.should_exit = True
+    thread.join(timeout=10)
+
+
+def test_uvicorn_protocol_serves_ranges_with_sendfile(zerocopy_server):
+    url, calls = zerocopy_server
+    with httpx.Client() as client:
+        whole = client.get(url)
+        assert whole.status_code == 200 and whole.content == CONTENT
+        assert len(calls) >= 1
+
+        calls.clear()
+        single = client.get(url, headers={'range': 'bytes=1000-1999'})
+        assert single.status_code == 206 and single.content == CONTENT[1000:2000]
+        assert calls
+
+        multi = client.get(url, headers={'range': 'bytes=0-9,5000-5009'})
+        assert multi.status_code == 206
+        assert CONTENT[0:10] in multi.content and CONTENT[5000:5010] in multi.content
+
+        head = client.head(url)
+        assert head.status_code == 200 and head.headers['content-length'] == str(len(CONTENT))
+
+        # Keep-alive still works after sendfile responses.
+        assert client.get(url, headers={'range': 'bytes=-3'}).content == CONTENT[-3:]
+
+
+def test_extension_is_not_advertised_without_loop_sendfile():
+    import uvloop
+
+    for loop, supported in ((asyncio.new_event_loop(), True), (uvloop.new_event_loop(), False)):
+        assert zerocopy.loop_supports_sendfile(loop) is supported
+        loop.close()
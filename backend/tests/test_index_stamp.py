@@ -0,0 +1,30 @@
+from app.utils.index_stamp import IndexStamp, bump_index_stamp
+
+
+def test_refresh_reports_each_bump_once(tmp_path):
+    path = tmp_path / 'index_stamp.json'
+    stamp = IndexStamp(path, check_every_seconds=0)
+    assert stamp.version == ''
+    assert not stamp.refresh()
+
+    version = bump_index_stamp('test', path)
+    assert stamp.refresh()
+    assert stamp.version == version
+    assert not stamp.refresh()
+
+
+def test_refresh_is_rate_limited(tmp_path):
+    path = tmp_path / 'index_stamp.json'
+    stamp = IndexStamp(path, check_every_seconds=3600)
+    bump_index_stamp('test', path)
+    assert not stamp.refresh()
+    assert stamp.version == ''
+
+
+def test_damaged_stamp_keeps_the_last_version(tmp_path):
+    path = tmp_path / 'index_stamp.json'
+    version = bump_index_stamp('test', path)
+    stamp = IndexStamp(path, check_every_seconds=0)
+    path.write_text('{not json')
+    assert not stamp.refresh()
+    assert stamp.version == version
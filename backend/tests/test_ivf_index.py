@@ -0,0 +1,37 @@
+import numpy as np
+
+from app.builder.ivf_index import IVFIndex
+from app.utils.vectors import l2_normalize
+
+
+def make_vectors(n=600, dim=16, clusters=8, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    return l2_normalize(centers[rng.integers(clusters, size=n)] + 0.05 * rng.normal(size=(n, dim)))
+
+
+def test_every_row_lands_in_exactly_one_list(tmp_path):
+    vectors = make_vectors()
+    index = IVFIndex.build(tmp_path, vectors, nlist=8)
+    assert index.list_offsets[-1] == len(vectors)
+    assert np.sort(np.asarray(index.list_rows)).tolist() == list(range(len(vectors)))
+    assert np.array_equal(index.probe(vectors[0], index.nlist), np.arange(len(vectors)))
+
+
+def test_probe_finds_the_exact_neighbour(tmp_path):
+    vectors = make_vectors()
+    index = IVFIndex.build(tmp_path, vectors, nlist=8)
+    for row in (0, 123, 599):
+        rows = index.probe(vectors[row], nprobe=2)
+        assert np.all(np.diff(rows) > 0)
+        assert rows[np.argmax(vectors[rows] @ vectors[row])] == row
+        assert len(rows) < len(vectors)
+
+
+def test_reopen_reads_the_same_lists(tmp_path):
+    vectors = make_vectors()
+    built = IVFIndex.build(tmp_path, vectors, nlist=8, built_for='v1')
+    assert IVFIndex.exists(tmp_path)
+    opened = IVFIndex.open(tmp_path)
+    assert opened.manifest['built_for'] == 'v1'
+    assert np.array_equal(opened.probe(vectors[5], 3), built.probe(vectors[5], 3))
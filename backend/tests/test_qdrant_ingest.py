@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient
+
+from app.builder import qdrant_ingest
+from app.builder.qdrant_ingest import QdrantIngestor
+
+
+@pytest.fixture
+def features(tmp_path):
+    rng = np.random.default_rng(0)
+    paths = {}
+    for video_id, rows in (('L01_V001', 5), ('L01_V002', 0), ('L01_V003', 3)):
+        paths[video_id] = tmp_path / f'{video_id}.npy'
+        np.save(paths[video_id], rng.standard_normal((rows, 8)).astype(np.float32))
+    return paths
+
+
+@pytest.fixture
+def ingestor(tmp_path, monkeypatch):
+    monkeypatch.setattr(qdrant_ingest, 'bump_index_stamp', lambda source: None)
+    return QdrantIngestor(QdrantClient(':memory:'), 'keyframes', tmp_path / 'checkpoint.json', batch_size=2, parallel=2)
+
+
+def test_empty_feature_files_are_marked_done(ingestor, features):
+    stats = ingestor.ingest(features)
+    assert (stats.videos, stats.points, stats.skipped_videos, stats.failed_videos) == (3, 8, 0, 0)
+    assert ingestor.client.count('keyframes').count == 8
+
+    stats = ingestor.ingest(features)
+    assert (stats.videos, stats.points, stats.skipped_videos) == (0, 0, 3)
+
+
+def test_changed_files_are_ingested_again(ingestor, features):
+    ingestor.ingest(features)
+    np.save(features['L01_V002'], np.ones((2, 8), dtype=np.float32))
+    stats = ingestor.ingest(features)
+    assert (stats.videos, stats.points, stats.skipped_videos) == (1, 2, 2)
+    assert ingestor.client.count('keyframes').count == 10
@@ -0,0 +1,67 @@
+import numpy as np
+
+from app.retrievers.temporal_alignment import RangeArgmax, align_sequence
+
+NO = -np.inf
+
+
+def test_picks_best_ordered_sequence():
+    frames = np.array([0, 10, 20, 30])
+    scores = np.array([
+        [0.1, 0.9, 0.2, 0.3],
+        [0.8, 0.1, 0.3, 0.7],
+    ])
+    aligned = align_sequence(frames, scores)
+    # 0.8 at frame 0 comes before every match of the first query, so it cannot be used.
+    assert aligned.positions.tolist() == [1, 3]
+    assert np.isclose(aligned.score, (0.9 + 0.7) / 2)
+
+
+def test_matches_must_be_strictly_later():
+    frames = np.array([0, 10])
+    scores = np.array([[0.9, 0.1], [0.9, 0.1]])
+    assert align_sequence(frames, scores).positions.tolist() == [0, 1]
+
+
+def test_max_gap_excludes_distant_predecessors():
+    frames = np.array([0, 10, 100])
+    scores = np.array([
+        [0.9, 0.5, NO],
+        [NO, 0.1, 0.9],
+    ])
+    assert align_sequence(frames, scores).positions.tolist() == [0, 2]
+    # Frame 100 is more than 50 frames after every first-query match; 0 -> 10 is the only option.
+    aligned = align_sequence(frames, scores, max_gap_frames=50)
+    assert aligned.positions.tolist() == [0, 1]
+    assert np.isclose(aligned.score, 0.5)
+
+
+def test_gap_bound_is_inclusive():
+    frames = np.array([0, 25])
+    scores = np.array([[0.9, NO], [NO, 0.9]])
+    assert align_sequence(frames, scores, max_gap_frames=25).positions.tolist() == [0, 1]
+    assert align_sequence(frames, scores, max_gap_frames=24) is None
+
+
+def test_infeasible_alignments_return_none():
+    frames = np.array([0, 10, 20])
+    # The second query only matches before the first query's only match.
+    assert align_sequence(frames, np.array([[NO, NO, 0.9], [0.9, NO, NO]])) is None
+    # More sub-queries than keyframes.
+    assert align_sequence(np.array([0, 10]), np.full((3, 2), 0.5)) is None
+    # A zero gap leaves no strictly later keyframe in range.
+    assert align_sequence(frames, np.full((2, 3), 0.5), max_gap_frames=0) is None
+    assert align_sequence(np.empty(0), np.empty((2, 0))) is None
+
+
+def test_range_argmax_matches_brute_force():
+    rng = np.random.default_rng(0)
+    values = rng.random(37)
+    lo = rng.integers(0, 37, size=200)
+    hi = np.minimum(lo + rng.integers(0, 20, size=200), 37)
+    best_value, best_arg = RangeArgmax(values).query(lo, hi)
+    for l, h, value, arg in zip(lo, hi, best_value, best_arg):
+        if h <= l:
+            assert value == -np.inf and arg == -1
+        else:
+            assert arg == l + np.argmax(values[l:h]) and value == values[arg]
@@ -0,0 +1,47 @@
+from PIL import Image
+
+from app.utils.thumbnails import ThumbnailCache
+
+
+def make_cache(tmp_path, max_bytes=10 * 1024 * 1024):
+    return ThumbnailCache(tmp_path / 'keyframes', tmp_path / 'thumbnails', widths=[160, 320], max_bytes=max_bytes)
+
+
+def write_keyframe(tmp_path, video_id, keyframe):
+    path = tmp_path / 'keyframes' / video_id / f'{keyframe}.jpg'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new('RGB', (640, 360), (200, 80, 40)).save(path, 'JPEG')
+
+
+def test_serves_thumbnail_written_by_another_instance(tmp_path, monkeypatch):
+    write_keyframe(tmp_path, 'L01_V001', '001')
+    server = make_cache(tmp_path)
+    server.get('L01_V001', 'missing', 160)  # loads the (empty) index
+    assert server.stats()['files'] == 0
+
+    builder = make_cache(tmp_path)
+    path = builder.get('L01_V001', '001', 160)
+    assert path.is_file()
+
+    def fail_encode(*args):
+        raise AssertionError('thumbnail on disk was encoded again')
+
+    monkeypatch.setattr(server, '_encode', fail_encode)
+    assert server.get('L01_V001', '001', 160) == path
+    assert server.stats()['files'] == 1
+    assert server.stats()['bytes'] == path.stat().st_size
+
+
+def test_adopted_thumbnails_count_toward_max_bytes(tmp_path):
+    for keyframe in ('001', '002'):
+        write_keyframe(tmp_path, 'L01_V001', keyframe)
+    builder = make_cache(tmp_path)
+    first = builder.get('L01_V001', '001', 160)
+    server = make_cache(tmp_path, max_bytes=first.stat().st_size)
+    server.get('L01_V001', 'missing', 160)
+
+    second = builder.get('L01_V001', '002', 160)
+    assert server.get('L01_V001', '002', 160) == second
+    # Adopting the second file pushed the first, older one out of the budget.
+    assert not first.exists()
+    assert server.stats()['bytes'] == second.stat().st_size
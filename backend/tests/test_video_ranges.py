@@ -0,0 +1,83 @@
+import numpy as np
+
+from app.builder.video_ranges import RowRanges, VideoRangeIndex, group_videos_by_pack
+
+# Rows per video, in the sorted, video-contiguous order of the local index.
+VIDEO_ROWS = [('L01_V001', 3), ('L01_V002', 2), ('L01_V003', 4), ('L02_V001', 1), ('L02_V002', 5)]
+
+
+def make_index():
+    packs = np.array([video_id.split('_')[0] for video_id, n in VIDEO_ROWS for _ in range(n)])
+    videos = np.array([video_id.split('_')[1] for video_id, n in VIDEO_ROWS for _ in range(n)])
+    return VideoRangeIndex(VideoRangeIndex.table_from_payload(packs, videos), total_rows=len(packs))
+
+
+def rows_of(*video_ids):
+    rows, start = [], 0
+    for video_id, n in VIDEO_ROWS:
+        if video_id in video_ids:
+            rows.extend(range(start, start + n))
+        start += n
+    return rows
+
+
+def test_table_from_payload():
+    index = make_index()
+    assert list(index.video_ids) == [video_id for video_id, _ in VIDEO_ROWS]
+    assert index.rows_for_video('L01_V003') == slice(5, 9)
+    assert index.rows_for_video('L09_V001') is None
+
+
+def test_no_filter_compiles_to_none():
+    assert make_index().compile() is None
+
+
+def test_pack_filter_merges_into_one_range():
+    ranges = make_index().compile(packs=['L01'])
+    assert ranges.starts.tolist() == [0] and ranges.stops.tolist() == [9]
+    assert ranges.row_ids().tolist() == rows_of('L01_V001', 'L01_V002', 'L01_V003')
+
+
+def test_video_filter_keeps_gaps_and_merges_neighbours():
+    ranges = make_index().compile(videos=['L01_V001', 'L01_V002', 'L02_V001', 'L09_V009'])
+    assert list(zip(ranges.starts.tolist(), ranges.stops.tolist())) == [(0, 5), (9, 10)]
+    assert ranges.count == 6
+
+
+def test_videos_are_intersected_with_packs():
+    ranges = make_index().compile(packs=['L02'], videos=['L01_V001', 'L02_V002'])
+    assert ranges.row_ids().tolist() == rows_of('L02_V002')
+
+
+def test_exclusions_apply_to_packs_and_to_everything():
+    index = make_index()
+    assert index.compile(packs=['L01'], excluded_videos=['L01_V002']).row_ids().tolist() == rows_of('L01_V001', 'L01_V003')
+    everything_but = index.compile(excluded_videos=['L01_V003'])
+    assert everything_but.row_ids().tolist() == rows_of('L01_V001', 'L01_V002', 'L02_V001', 'L02_V002')
+    assert len(everything_but.starts) == 2
+
+
+def test_unknown_pack_selects_nothing():
+    ranges = make_index().compile(packs=['L09'])
+    assert ranges.count == 0
+    assert ranges.row_ids().tolist() == []
+    assert not ranges.to_mask().any()
+
+
+def test_mask_row_ids_and_contains_agree():
+    ranges = RowRanges(starts=np.array([1, 4, 10]), stops=np.array([3, 8, 12]), total_rows=15)
+    expected = [1, 2, 4, 5, 6, 7, 10, 11]
+    assert np.flatnonzero(ranges.to_mask()).tolist() == expected
+    assert ranges.row_ids().tolist() == expected
+    assert ranges.contains(np.arange(15)).tolist() == [row in expected for row in range(15)]
+
+
+def test_row_ids_limit_cuts_inside_a_range():
+    ranges = RowRanges(starts=np.array([1, 4, 10]), stops=np.array([3, 8, 12]), total_rows=15)
+    assert ranges.row_ids(limit=2).tolist() == [1, 2]
+    assert ranges.row_ids(limit=4).tolist() == [1, 2, 4, 5]
+    assert ranges.row_ids(limit=100).tolist() == [1, 2, 4, 5, 6, 7, 10, 11]
+
+
+def test_group_videos_by_pack():
+    assert group_videos_by_pack(['L01_V001', 'L01_V002', 'L02_V001', 'bad']) == {'L01': ['V001', 'V002'], 'L02': ['V001']}
@@ -13,6 +13,7 @@ export interface SearchResultItem {
   frame: string;
   frame_index: number;
   image_url: string;
+  thumbnail_url: string;
   video_url: string;
 }
 
@@ -25,6 +26,7 @@ export interface TemporalQueryResult {
       frame: string;
       frame_index: number;
       image_url: string;
+      thumbnail_url: string;
     }[];
   }[];
 }
@@ -50,6 +52,8 @@ const App: Component = () => {
   const [temporalResults, setTemporalResults] = createSignal<TemporalQueryResult[]>([]);
   const [isTemporalResult, setIsTemporalResult] = createSignal(false);
   const [isLoading, setIsLoading] = createSignal(false);
+  const [nextCursor, setNextCursor] = createSignal<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = createSignal(false);
   const [displayVideoId, setDisplayVideoId] = createSignal('');
   const [displayKeyframeId, setDisplayKeyframeId] = createSignal('');
   const [keyframeNote, setKeyframeNote] = createSignal('');
@@ -72,6 +76,31 @@ const App: Component = () => {
   const API_BASE_URL = "";
   const KEYFRAME_BASE_URL = "https://huggingface.co/datasets/ChungDat/hcm-aic2025-keyframes/resolve/main";
 
+  // Results arrive a page at a time; later pages come from the server's stored ranking.
+  const PAGE_SIZE = 100;
+
+  const toTemporalResults = (results: any[]): TemporalQueryResult[] => results.map((videoResult: any) => ({
+    ...videoResult,
+    video_url: `${API_BASE_URL}/api/video/${videoResult.video}`,
+    query_results: videoResult.query_results.map((qr: any) => ({
+      ...qr,
+      keyframes: qr.keyframes.map((kf: any) => ({
+        ...kf,
+        image_url: `${KEYFRAME_BASE_URL}/${videoResult.video}/${kf.frame}?download=true`,
+        thumbnail_url: `${API_BASE_URL}/api/thumbnail/${videoResult.video}/${kf.frame}`,
+      }))
+    }))
+  }));
+
+  const toResultItems = (results: { video: string; frame: string; frame_index: number; }[]): SearchResultItem[] => results.map(item => ({
+    video: item.video,
+    frame: item.frame,
+    frame_index: item.frame_index,
+    image_url: `${KEYFRAME_BASE_URL}/${item.video}/${item.frame}?download=true`,
+    thumbnail_url: `${API_BASE_URL}/api/thumbnail/${item.video}/${item.frame}`,
+    video_url: `${API_BASE_URL}/api/video/${item.video}`,
+  }));
+
   const addQuery = () => setQueries(queries.length, { id: queryIdCounter++, text: '' });
   const removeQuery = (id: number) => setQueries(q => q.filter(item => item.id !== id));
   const updateQuery = (id: number, text: string) => setQueries(q => q.id === id, 'text', text);
@@ -145,6 +174,7 @@ const App: Component = () => {
 
   const handleSearch = async () => {
     setIsLoading(true);
+    setNextCursor(null);
     const filteredQueries = queries.map(q => q.text).filter(q => q.trim() !== '');
     
     const hasFilters = keywordFilter() || selectedObjects().length > 0 || selectedPacks().length > 0 || selectedVideos().length > 0 || vietnameseQuery();
@@ -173,6 +203,7 @@ const App: Component = () => {
         },
         top_k_per_query: topKPerQuery(),
         top_k: totalResults(),
+        page_size: PAGE_SIZE,
       };
       const response = await fetch(`${API_BASE_URL}/api/search`, {
         method: 'POST', headers: { 'Content-Type': 'application/json' },
@@ -182,30 +213,13 @@ const App: Component = () => {
       const data = await response.json();
 
       if (isTemporal) {
-        const processedTemporal: TemporalQueryResult[] = data.results.map((videoResult: any) => ({
-          ...videoResult,
-          video_url: `${API_BASE_URL}/api/video/${videoResult.video}`,
-          query_results: videoResult.query_results.map((qr: any) => ({
-            ...qr,
-            keyframes: qr.keyframes.map((kf: any) => ({
-              ...kf,
-              image_url: `${KEYFRAME_BASE_URL}/${videoResult.video}/${kf.frame}?download=true`,
-            }))
-          }))
-        }));
-        setTemporalResults(processedTemporal);
+        setTemporalResults(toTemporalResults(data.results));
         setResults([]);
       } else {
-        const processedResults: SearchResultItem[] = data.results.map((item: { video: string; frame: string; frame_index: number; }) => ({
-          video: item.video,
-          frame: item.frame,
-          frame_index: item.frame_index,
-          image_url: `${KEYFRAME_BASE_URL}/${item.video}/${item.frame}?download=true`,
-          video_url: `${API_BASE_URL}/api/video/${item.video}`,
-        }));
-        setResults(processedResults || []);
+        setResults(toResultItems(data.results || []));
         setTemporalResults([]);
       }
+      setNextCursor(data.next_cursor ?? null);
     } catch (error) {
       console.error("Failed to perform search:", error);
       setResults([]);
@@ -215,6 +229,32 @@ const App: Component = () => {
     }
   };
 
+  const handleLoadMore = async () => {
+    const cursor = nextCursor();
+    if (!cursor || isLoadingMore()) return;
+    setIsLoadingMore(true);
+    try {
+      const response = await fetch(`${API_BASE_URL}/api/search/page?cursor=${encodeURIComponent(cursor)}&page_size=${PAGE_SIZE}`);
+      if (response.status === 410) {
+        // The stored ranking expired; run the search again from the top.
+        await handleSearch();
+        return;
+      }
+      if (!response.ok) throw new Error('Failed to load more results');
+      const data = await response.json();
+      if (isTemporalResult()) {
+        setTemporalResults([...temporalResults(), ...toTemporalResults(data.results)]);
+      } else {
+        setResults([...results(), ...toResultItems(data.results)]);
+      }
+      setNextCursor(data.next_cursor ?? null);
+    } catch (error) {
+      console.error("Failed to load more results:", error);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const populateIdFields = (video: string, frame_index: string) => {
     if (isTemporalMode() && video === displayVideoId()) {
       const currentKeyframes = displayKeyframeId().split(',').filter(Boolean);
@@ -412,6 +452,9 @@ const App: Component = () => {
             excludedVideos={excludedVideos}
             isTemporalResult={isTemporalResult}
             isLoading={isLoading} 
+            hasMore={() => nextCursor() !== null}
+            isLoadingMore={isLoadingMore}
+            onLoadMore={handleLoadMore}
             onVideoView={(_videoUrl, video, _frame, frame_index) => openVideoModal(video, frame_index)} 
             onKeyframeView={openKeyframeModal} 
             onPopulateIdFields={populateIdFields}
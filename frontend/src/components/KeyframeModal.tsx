@@ -9,14 +9,68 @@ interface KeyframeModalProps {
   }
 }
 
+interface SpriteTile {
+  sheet_url: string;
+  columns: number;
+  rows: number;
+  column: number;
+  row: number;
+  aspect_ratio: number;
+}
+
+interface Keyframe {
+  id: string;
+  url: string;
+  thumbnail_url: string;
+  index: number;
+  sprite?: SpriteTile;
+}
+
+// Scales one tile of a sprite sheet to fill its element.
+const spriteStyle = (tile: SpriteTile) => ({
+  "background-image": `url(${tile.sheet_url})`,
+  "background-size": `${tile.columns * 100}% ${tile.rows * 100}%`,
+  "background-position": `${tile.columns > 1 ? (tile.column / (tile.columns - 1)) * 100 : 0}% ${tile.rows > 1 ? (tile.row / (tile.rows - 1)) * 100 : 0}%`,
+  "aspect-ratio": `${tile.aspect_ratio}`,
+});
+
 const KeyframeModal: Component<KeyframeModalProps> = (props) => {
-  const [keyframes, setKeyframes] = createSignal<{ id: string; url: string; index: number }[]>([]);
+  const [keyframes, setKeyframes] = createSignal<Keyframe[]>([]);
   const [isLoading, setIsLoading] = createSignal(true);
   const [error, setError] = createSignal<string | null>(null);
   const KEYFRAME_BASE_URL = "https://huggingface.co/datasets/ChungDat/hcm-aic2025-keyframes/resolve/main";
 
+  // One index request plus one image per sheet, instead of one request per keyframe.
+  const loadFromSprites = async (): Promise<Keyframe[] | null> => {
+    const response = await fetch(`/api/sprites/${props.video}`);
+    if (!response.ok) return null;
+    const index = await response.json();
+    return index.tiles.map((tile: { keyframe_id: string; frame_index: number; sheet: number; x: number; y: number; }) => {
+      const sheet = index.sheets[tile.sheet];
+      return {
+        id: tile.keyframe_id,
+        url: `${KEYFRAME_BASE_URL}/${props.video}/${tile.keyframe_id}.jpg?download=true`,
+        thumbnail_url: `/api/thumbnail/${props.video}/${tile.keyframe_id}?w=160`,
+        index: tile.frame_index,
+        sprite: {
+          sheet_url: `/api/sprites/${props.video}/${sheet.name}`,
+          columns: sheet.columns,
+          rows: sheet.rows,
+          column: tile.x / index.tile_width,
+          row: tile.y / index.tile_height,
+          aspect_ratio: index.tile_width / index.tile_height,
+        },
+      };
+    });
+  };
+
   onMount(async () => {
     try {
+      const spriteKeyframes = await loadFromSprites().catch(() => null);
+      if (spriteKeyframes) {
+        setKeyframes(spriteKeyframes);
+        return;
+      }
       const response = await fetch(`/api/video_keyframes/${props.video}`);
       if (!response.ok) {
         throw new Error('Failed to fetch keyframes for video');
@@ -25,6 +79,7 @@ const KeyframeModal: Component<KeyframeModalProps> = (props) => {
       const processedKeyframes = data.keyframes.map((keyframe: { keyframe_id: string; frame_index: number; }) => ({
         id: keyframe.keyframe_id,
         url: `${KEYFRAME_BASE_URL}/${props.video}/${keyframe.keyframe_id}.jpg?download=true`,
+        thumbnail_url: `/api/thumbnail/${props.video}/${keyframe.keyframe_id}?w=160`,
         index: keyframe.frame_index,
       }));
       setKeyframes(processedKeyframes);
@@ -51,12 +106,29 @@ const KeyframeModal: Component<KeyframeModalProps> = (props) => {
             <For each={keyframes()}>
               {(keyframe) => (
                 <div class="overflow-hidden rounded-lg shadow-lg bg-gray-100 flex flex-col">
-                  <img 
-                    src={keyframe.url} 
-                    alt={`Keyframe ${keyframe.id}`} 
-                    class="w-full h-32 object-cover cursor-pointer" 
-                    onClick={() => props.handlers.onImageZoom(keyframe.url)}
-                  />
+                  <Show
+                    when={keyframe.sprite}
+                    fallback={
+                      <img 
+                        src={keyframe.thumbnail_url} 
+                        alt={`Keyframe ${keyframe.id}`} 
+                        loading="lazy"
+                        onError={(e) => { if (e.currentTarget.src !== keyframe.url) e.currentTarget.src = keyframe.url; }}
+                        class="w-full h-32 object-cover cursor-pointer" 
+                        onClick={() => props.handlers.onImageZoom(keyframe.url)}
+                      />
+                    }
+                  >
+                    {(tile) => (
+                      <div
+                        role="img"
+                        aria-label={`Keyframe ${keyframe.id}`}
+                        class="w-full cursor-pointer"
+                        style={spriteStyle(tile())}
+                        onClick={() => props.handlers.onImageZoom(keyframe.url)}
+                      />
+                    )}
+                  </Show>
                   <div class="p-2 flex flex-col gap-2">
                     <p class="text-sm font-medium text-gray-700 truncate text-center">{keyframe.index}</p>
                     <div class="flex flex-row gap-1">
@@ -20,8 +20,10 @@ const ResultCard: Component<ResultCardProps> = (props) => {
   return (
     <div class="overflow-hidden rounded-lg shadow-lg hover:shadow-xl transition-shadow duration-300 ease-in-out bg-white">
       <img
-        src={props.item.image_url}
+        src={props.item.thumbnail_url}
         alt={altText}
+        loading="lazy"
+        onError={(e) => { if (e.currentTarget.src !== props.item.image_url) e.currentTarget.src = props.item.image_url; }}
         class="w-full h-48 object-cover cursor-pointer"
         onClick={() => props.handlers.onImageZoom(props.item.image_url)}
       />
@@ -10,6 +10,9 @@ interface RightPanelProps {
   excludedVideos: Accessor<string[]>;
   isTemporalResult: Accessor<boolean>;
   isLoading: Accessor<boolean>;
+  hasMore: Accessor<boolean>;
+  isLoadingMore: Accessor<boolean>;
+  onLoadMore: () => void;
   onVideoView: (videoUrl: string, video: string, frame: string, frame_index: number) => void;
   onKeyframeView: (video: string) => void;
   onPopulateIdFields: (video: string, frame_index: string) => void;
@@ -100,6 +103,18 @@ const RightPanel: Component<RightPanelProps> = (props) => {
             </div>
           </Show>
         </Show>
+
+        <Show when={props.hasMore()}>
+          <div class="flex justify-center my-6">
+            <button
+              class="px-4 py-2 text-sm bg-blue-500 text-white rounded hover:bg-blue-600 disabled:opacity-50"
+              disabled={props.isLoadingMore()}
+              onClick={() => props.onLoadMore()}
+            >
+              {props.isLoadingMore() ? 'Loading...' : 'Load more'}
+            </button>
+          </div>
+        </Show>
       </Show>
     </div>
   );
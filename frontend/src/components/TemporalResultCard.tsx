@@ -39,6 +39,7 @@ const TemporalResultCard: Component<TemporalResultCardProps> = (props) => {
                       frame: keyframe.frame,
                       frame_index: keyframe.frame_index,
                       image_url: keyframe.image_url,
+                      thumbnail_url: keyframe.thumbnail_url,
                     };
                     return <ResultCard item={item} handlers={props.handlers} />;
                   }}
@@ -17,11 +17,9 @@ const VideoFilter: Component<VideoFilterProps> = (props) => {
     if (packs.length > 0) {
       setIsLoading(true);
       try {
-        const response = await fetch(`${props.API_BASE_URL}/api/videos_in_packs`, {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({ packs }),
-        });
+        const params = new URLSearchParams();
+        packs.forEach(pack => params.append('packs', pack));
+        const response = await fetch(`${props.API_BASE_URL}/api/videos_in_packs?${params}`);
         if (response.ok) {
           const data = await response.json();
           setAvailableVideos(data);